@@ -1,25 +1,49 @@
 from typing import Optional, Dict, Any
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 from app.services.auth_service import auth_service
 from app.services.user_service import user_service
 from app.core.exceptions import AuthenticationException, UserNotFoundException
+from app.core.security import (
+    SESSION_TOKEN_USE, decode_access_token, is_session_token, session_tokens_enabled
+)
 
 security = HTTPBearer()
 
 
 async def get_current_user_token(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ) -> Dict[str, Any]:
     """
     Dependency to get and verify current user's token.
     
+    Accepts both Cognito access tokens (RS256, verified against JWKS) and
+    locally issued session tokens (HMAC, verified in-process). Batch
+    sub-requests reuse the payload the batch call already verified.
+    
     Returns:
         Decoded token payload
     """
+    shared = request.scope.get("state", {}).get("token_payload")
+    if shared is not None:
+        return shared
+    
+    token = credentials.credentials
+    if is_session_token(token):
+        # Without a real secret any HMAC token could be forged; and other
+        # HMAC tokens (e.g. from create_access_token) are not credentials
+        payload = decode_access_token(token) if session_tokens_enabled() else {}
+        if payload.get("token_use") != SESSION_TOKEN_USE:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        return payload
+    
     try:
-        token = credentials.credentials
         payload = await auth_service.verify_token(token)
         return payload
     except AuthenticationException as e:
@@ -31,6 +55,7 @@ async def get_current_user_token(
 
 
 async def get_current_user(
+    request: Request,
     token_payload: Dict[str, Any] = Depends(get_current_user_token)
 ) -> Dict[str, Any]:
     """
@@ -39,6 +64,10 @@ async def get_current_user(
     Returns:
         Current user data
     """
+    shared = request.scope.get("state", {}).get("current_user")
+    if shared is not None:
+        return shared
+    
     try:
         user_id = token_payload.get("sub")
         if not user_id:
@@ -104,6 +133,7 @@ async def get_current_verified_user(
 
 
 async def get_optional_current_user(
+    request: Request,
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False))
 ) -> Optional[Dict[str, Any]]:
     """
@@ -116,8 +146,8 @@ async def get_optional_current_user(
         return None
     
     try:
-        token_payload = await get_current_user_token(credentials)
-        user = await get_current_user(token_payload)
+        token_payload = await get_current_user_token(request, credentials)
+        user = await get_current_user(request, token_payload)
         return user
     except HTTPException:
         return None
\ No newline at end of file
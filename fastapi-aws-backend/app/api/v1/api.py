@@ -1,8 +1,9 @@
 # app/api/v1/api.py
 from fastapi import APIRouter
-from app.api.v1 import auth, users
+from app.api.v1 import auth, batch, users
 
 api_router = APIRouter()
 
 api_router.include_router(auth.router, prefix="/auth", tags=["authentication"])
-api_router.include_router(users.router, prefix="/users", tags=["users"])
\ No newline at end of file
+api_router.include_router(users.router, prefix="/users", tags=["users"])
+api_router.include_router(batch.router, prefix="/batch", tags=["batch"])
\ No newline at end of file
@@ -1,12 +1,16 @@
 # app/api/v1/auth.py
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials
 from app.models.user import (
     UserSignUp, UserLogin, TokenResponse, EmailConfirmation,
-    PasswordReset, PasswordResetConfirm, RefreshTokenRequest
+    PasswordReset, PasswordResetConfirm, RefreshTokenRequest,
+    SessionTokenResponse
 )
 from app.services.user_service import user_service
-from app.api.deps import get_current_user
+from app.services.auth_service import auth_service
+from app.api.deps import get_current_user, security
 from app.core.exceptions import AuthenticationException
+from app.core.security import create_session_token, is_session_token, session_tokens_enabled
 
 router = APIRouter()
 
@@ -78,6 +82,40 @@ async def refresh_token(token_request: RefreshTokenRequest):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
 
 
+@router.post("/session", response_model=SessionTokenResponse)
+async def create_session(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Exchange a Cognito access token for a short-lived session token."""
+    if not session_tokens_enabled():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Session tokens are not configured"
+        )
+    
+    token = credentials.credentials
+    if is_session_token(token):
+        # Session tokens must not be able to renew themselves
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A Cognito access token is required"
+        )
+    
+    try:
+        payload = await auth_service.verify_token(token)
+    except AuthenticationException as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e),
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    user = await user_service.get_user_by_id(payload.get("sub"))
+    if not user or not user.get("is_active", False):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Inactive or unknown user")
+    
+    session_token, expires_in = create_session_token(payload, user)
+    return SessionTokenResponse(access_token=session_token, expires_in=expires_in)
+
+
 @router.post("/logout", response_model=dict)
 async def logout(current_user: dict = Depends(get_current_user)):
     """Sign out current user."""
@@ -0,0 +1,249 @@
+# app/api/v1/batch.py
+import asyncio
+import base64
+import json
+from typing import Any, Callable, Dict, List
+from urllib.parse import urlsplit
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.routing import APIRoute
+
+from app.models.batch import BatchOperation, BatchOperationResult, BatchRequest, BatchResponse
+from app.api.deps import get_current_user_token, get_current_verified_user
+from app.core.config import settings
+from app.services.user_service import user_service
+
+
+def _payload_too_large() -> HTTPException:
+    """413 for a batch body over BATCH_MAX_PAYLOAD_BYTES."""
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Batch payload exceeds {settings.BATCH_MAX_PAYLOAD_BYTES} bytes"
+    )
+
+
+class PayloadLimitedRoute(APIRoute):
+    """Route that rejects oversized bodies before FastAPI decodes the JSON."""
+    
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        
+        async def limited_handler(request: Request) -> Response:
+            length = request.headers.get("content-length", "")
+            if length.isdigit() and int(length) > settings.BATCH_MAX_PAYLOAD_BYTES:
+                raise _payload_too_large()
+            # Cached on the request, so the handler parses these same bytes
+            if len(await request.body()) > settings.BATCH_MAX_PAYLOAD_BYTES:
+                raise _payload_too_large()
+            return await handler(request)
+        
+        return limited_handler
+
+
+router = APIRouter(route_class=PayloadLimitedRoute)
+
+# Reads can run side by side; any other method is a barrier between them
+SAFE_METHODS = {"GET", "HEAD"}
+
+# Connection-level scope keys a sub-request inherits from the batch call
+INHERITED_SCOPE_KEYS = ("asgi", "http_version", "scheme", "server", "client", "root_path",
+                        "aws.event", "aws.context")
+
+# Sub-responses are embedded in the batch body, so they must stay unencoded
+OVERRIDE_PROTECTED_HEADERS = {"host", "content-length", "accept-encoding"}
+
+
+class _ResponseBudget:
+    """Sub-response bytes the batch may still buffer, shared by its sub-requests."""
+    __slots__ = ("remaining",)
+
+    def __init__(self, remaining: int):
+        self.remaining = remaining
+
+
+class _ResponseTooLarge(Exception):
+    """Raised from a sub-request's send once its body overruns the budget."""
+
+
+def _sub_scope(parent: Dict[str, Any], operation: BatchOperation, body: bytes,
+               state: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the ASGI scope for one sub-request."""
+    url = urlsplit(operation.path)
+    headers = {"host": "localhost"}
+    for name, value in parent["headers"]:
+        if name in (b"host", b"authorization"):
+            headers[name.decode("latin-1")] = value.decode("latin-1")
+    if body:
+        headers["content-type"] = "application/json"
+        headers["content-length"] = str(len(body))
+    headers.update({
+        name.lower(): value for name, value in operation.headers.items()
+        if name.lower() not in OVERRIDE_PROTECTED_HEADERS
+    })
+
+    scope = {key: parent[key] for key in INHERITED_SCOPE_KEYS if key in parent}
+    scope.update({
+        "type": "http",
+        "method": operation.method,
+        "path": url.path,
+        "raw_path": url.path.encode(),
+        "query_string": url.query.encode(),
+        "headers": [(name.encode("latin-1"), value.encode("latin-1")) for name, value in headers.items()],
+        # A fresh dict per sub-request so one can't see another's request.state writes
+        "state": dict(state),
+    })
+    return scope
+
+
+async def _dispatch(app, scope: Dict[str, Any], body: bytes,
+                    budget: _ResponseBudget) -> BatchOperationResult:
+    """Run one sub-request through the ASGI app and capture its response."""
+    received = False
+    too_large = False
+    start: Dict[str, Any] = {}
+    chunks: List[bytes] = []
+
+    async def receive() -> Dict[str, Any]:
+        nonlocal received
+        if received:
+            return {"type": "http.disconnect"}
+        received = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message: Dict[str, Any]) -> None:
+        if message["type"] == "http.response.start":
+            start.update(message)
+        elif message["type"] == "http.response.body":
+            nonlocal too_large
+            chunk = message.get("body", b"")
+            # Abort the sub-request as soon as it overruns, rather than
+            # buffering the whole body only to drop it afterwards
+            if too_large or len(chunk) > budget.remaining:
+                too_large = True
+                raise _ResponseTooLarge()
+            budget.remaining -= len(chunk)
+            chunks.append(chunk)
+
+    try:
+        await app(scope, receive, send)
+    except Exception as e:
+        if not too_large:
+            # The server error middleware has usually sent a 500 before re-raising
+            print(f"Batch sub-request {scope['method']} {scope['path']} failed: {e}")
+            if not start:
+                return BatchOperationResult(status_code=500, body={"detail": "Internal server error"})
+
+    if too_large:
+        budget.remaining += sum(len(chunk) for chunk in chunks)
+        return BatchOperationResult(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            body={"detail": "Batch response size limit reached"}
+        )
+
+    headers = {
+        name.decode("latin-1"): value.decode("latin-1")
+        for name, value in start.get("headers", [])
+        if name not in (b"content-length",)
+    }
+    content = b"".join(chunks)
+    content_type = headers.get("content-type", "")
+    if not content:
+        payload, is_base64 = None, False
+    elif content_type.startswith("application/json"):
+        payload, is_base64 = json.loads(content), False
+    elif content_type.startswith("text/"):
+        payload, is_base64 = content.decode("utf-8", errors="replace"), False
+    else:
+        payload, is_base64 = base64.b64encode(content).decode("ascii"), True
+    return BatchOperationResult(
+        status_code=start["status"], headers=headers, body=payload, is_base64_encoded=is_base64
+    )
+
+
+def _body_size(result: BatchOperationResult) -> int:
+    """Approximate serialized size of a result's body."""
+    if result.body is None:
+        return 0
+    if isinstance(result.body, str):
+        return len(result.body)
+    return len(json.dumps(result.body, separators=(",", ":")))
+
+
+@router.post("", response_model=BatchResponse)
+async def run_batch(
+    request: Request,
+    batch: BatchRequest,
+    token_payload: dict = Depends(get_current_user_token),
+    current_user: dict = Depends(get_current_verified_user)
+):
+    """
+    Run several API calls in one request.
+
+    The caller is authenticated once and every sub-request runs in-process
+    as that user. Operations keep their order: consecutive reads (GET/HEAD)
+    run concurrently and each write runs on its own, after everything
+    before it, so a read never overtakes an earlier write. If a write
+    leaves the caller inactive, the remaining operations get 401.
+    """
+    if len(batch.operations) > settings.BATCH_MAX_OPERATIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.BATCH_MAX_OPERATIONS} operations per batch"
+        )
+
+    batch_path = request.url.path
+    for operation in batch.operations:
+        path = urlsplit(operation.path).path
+        if not path.startswith(f"{settings.API_V1_STR}/") or path.rstrip("/") == batch_path.rstrip("/"):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid batch operation path: {operation.path}"
+            )
+
+    state = {"token_payload": token_payload, "current_user": current_user}
+    budget = _ResponseBudget(settings.BATCH_MAX_RESPONSE_BYTES)
+
+    def run(operation: BatchOperation):
+        body = json.dumps(operation.body).encode() if operation.body is not None else b""
+        return _dispatch(request.app, _sub_scope(request.scope, operation, body, state), body, budget)
+
+    results: List[BatchOperationResult] = []
+    reads: List[BatchOperation] = []
+    for index, operation in enumerate(batch.operations):
+        if operation.method in SAFE_METHODS:
+            reads.append(operation)
+            continue
+        results.extend(await asyncio.gather(*(run(read) for read in reads)))
+        reads = []
+        results.append(await run(operation))
+        # A write may have changed the caller (e.g. PUT /users/me); later
+        # sub-requests must see the fresh record, not the pre-batch one
+        user = await user_service.get_user_by_id(current_user["user_id"])
+        if not user or not user.get("is_active", False):
+            # e.g. DELETE /users/me: the shared principal skips the auth
+            # dependencies' checks, so stop here rather than act as a deleted user
+            results.extend(
+                BatchOperationResult(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    body={"detail": "Inactive or unknown user"}
+                )
+                for _ in batch.operations[index + 1:]
+            )
+            break
+        state["current_user"] = user
+    else:
+        results.extend(await asyncio.gather(*(run(read) for read in reads)))
+
+    # Keep the combined response under the Lambda payload limit; the budget
+    # above counts raw bytes, this counts them as serialized (e.g. base64)
+    total = 0
+    for index, result in enumerate(results):
+        size = _body_size(result)
+        if total + size > settings.BATCH_MAX_RESPONSE_BYTES:
+            results[index] = BatchOperationResult(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                body={"detail": "Batch response size limit reached"}
+            )
+        else:
+            total += size
+
+    return BatchResponse(results=results)
@@ -1,20 +1,50 @@
 # app/api/v1/users.py
+import hashlib
+import tempfile
+import time
+import uuid
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from app.models.user import UserResponse, UserUpdate
-from app.models.file import FileUploadResponse, PresignedUrlRequest, PresignedUrlResponse
+from fastapi import (
+    APIRouter, Depends, Header, HTTPException, Query, status, UploadFile, File, Response
+)
+from fastapi.responses import StreamingResponse
+from app.models.user import BatchUserItem, BatchUserResponse, UserResponse, UserUpdate
+from app.models.file import (
+    FileUploadResponse, FileMetadata, PresignedUrlRequest, PresignedUrlResponse,
+    PresignedPostRequest, PresignedPostResponse, UploadCompleteRequest,
+    BatchPresignedUrlRequest, BatchPresignedUrlItem, BatchPresignedUrlResponse,
+    FileAccessCookiesResponse, FileListItem, FileListResponse
+)
 from app.services.user_service import user_service
 from app.services.s3_service import s3_service
+from app.services.cloudfront_service import cloudfront_service
+from app.services.image_service import image_service
 from app.api.deps import get_current_user, get_current_verified_user
+from app.core.config import settings
 from app.core.exceptions import UserNotFoundException
+from app.utils.etag import etag_matches, file_metadata_etag, not_modified, set_etag, user_etag
+from app.utils.files import iter_upload, sniff_content_type
+from app.utils.orchestration import Saga
+from app.utils.serialization import construct_trusted, model_response, parse_fields, trusted_response
 
 router = APIRouter()
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_profile(current_user: dict = Depends(get_current_user)):
-    """Get current user profile."""
-    return UserResponse(**current_user)
+async def get_current_user_profile(
+    fields: str = Query(None, description="Comma-separated fields to return, e.g. first_name,avatar_key"),
+    if_none_match: str = Header(None),
+    current_user: dict = Depends(get_current_user)
+):
+    """Get current user profile, or 304 if the client's copy is current."""
+    selected = parse_fields(UserResponse, fields)
+    etag = user_etag(current_user, selected)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    
+    response = trusted_response(UserResponse, current_user, fields=selected)
+    set_etag(response, etag)
+    return response
 
 
 @router.put("/me", response_model=UserResponse)
@@ -28,32 +58,126 @@ async def update_current_user(
             current_user["user_id"],
             user_update.dict(exclude_unset=True)
         )
-        return UserResponse(**updated_user)
+        return trusted_response(UserResponse, updated_user)
     except UserNotFoundException:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
 
 @router.delete("/me", response_model=dict)
 async def delete_current_user(current_user: dict = Depends(get_current_user)):
-    """Delete current user account."""
+    """Delete current user account; its files are purged by the scheduled job."""
     try:
+        # No background purge: under Mangum it would run before the invocation returns
         await user_service.delete_user(current_user["user_id"])
         return {"message": "Account deleted successfully"}
     except UserNotFoundException:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
 
+@router.post("/me/file-cookies", response_model=FileAccessCookiesResponse)
+async def issue_file_cookies(
+    response: Response,
+    current_user: dict = Depends(get_current_user)
+):
+    """Issue CloudFront signed cookies covering all of the user's files."""
+    if not cloudfront_service.enabled:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="CloudFront file access is not configured"
+        )
+    
+    cookie_sets = await cloudfront_service.get_user_cookies(current_user["user_id"])
+    for cookie_set in cookie_sets:
+        for name, value in cookie_set["cookies"].items():
+            response.set_cookie(
+                name,
+                value,
+                expires=cookie_set["expires_at"] - int(time.time()),
+                path=cookie_set["path"],
+                domain=settings.CLOUDFRONT_COOKIE_DOMAIN,
+                secure=True,
+                httponly=True,
+                samesite="none"
+            )
+    
+    return FileAccessCookiesResponse(domain=cloudfront_service.domain, cookie_sets=cookie_sets)
+
+
+@router.get("/me/files", response_model=FileListResponse)
+async def list_my_files(
+    start_after: str = Query(None, description="Resume after this key (from next_start_after)"),
+    limit: int = Query(100, ge=1, le=1000),
+    current_user: dict = Depends(get_current_user)
+):
+    """List the current user's uploads a page at a time."""
+    prefix = f"uploads/{current_user['user_id']}/"
+    if start_after and not start_after.startswith(prefix):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid start_after")
+    
+    files = []
+    page_size = min(limit + 1, settings.S3_LIST_PAGE_SIZE)
+    async for obj in s3_service.iter_files(prefix, start_after=start_after, page_size=page_size):
+        if len(files) == limit:
+            # One more key exists, so hand back a resume token
+            return FileListResponse(files=files, next_start_after=files[-1].key)
+        files.append(FileListItem(**obj._asdict()))
+    
+    return FileListResponse(files=files)
+
+
+@router.get("", response_model=BatchUserResponse)
+async def get_users_by_ids(
+    ids: str = Query(..., description="Comma-separated user IDs"),
+    fields: str = Query(None, description="Comma-separated fields to return, e.g. first_name,avatar_key"),
+    current_user: dict = Depends(get_current_verified_user)
+):
+    """Look up several users by ID (requires verified user), in request order."""
+    user_ids = [user_id.strip() for user_id in ids.split(",") if user_id.strip()]
+    if not user_ids:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No user IDs given")
+    if len(user_ids) > settings.USER_BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.USER_BATCH_MAX_IDS} IDs per request"
+        )
+    
+    selected = parse_fields(UserResponse, fields)
+    users = await user_service.get_users_by_ids(user_ids, fields=selected)
+    items = [
+        BatchUserItem.model_construct(
+            user_id=user_id,
+            found=users[user_id] is not None,
+            user=construct_trusted(UserResponse, users[user_id]) if users[user_id] else None
+        )
+        for user_id in user_ids
+    ]
+    include = None
+    if selected:
+        include = {"users": {"__all__": {"user_id": True, "found": True, "user": set(selected)}}}
+    return model_response(BatchUserResponse.model_construct(users=items), include=include)
+
+
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user_by_id(
     user_id: str,
+    fields: str = Query(None, description="Comma-separated fields to return, e.g. first_name,avatar_key"),
+    if_none_match: str = Header(None),
     current_user: dict = Depends(get_current_verified_user)
 ):
-    """Get user by ID (requires verified user)."""
+    """Get user by ID (requires verified user), or 304 if unchanged."""
+    selected = parse_fields(UserResponse, fields)
     try:
-        user = await user_service.get_user_by_id(user_id)
+        user = await user_service.get_user_by_id(user_id, fields=selected)
         if not user:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-        return UserResponse(**user)
+        
+        etag = user_etag(user, selected)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        
+        response = trusted_response(UserResponse, user, fields=selected)
+        set_etag(response, etag)
+        return response
     except UserNotFoundException:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
@@ -71,40 +195,83 @@ async def upload_avatar(
             detail="Only image files are allowed"
         )
     
-    # Validate file size (5MB max)
-    max_size = 5 * 1024 * 1024  # 5MB
-    file_content = await file.read()
-    if len(file_content) > max_size:
+    # Stream in chunks; aborts with 413 as soon as the size limit is crossed
+    chunks = iter_upload(file, settings.AVATAR_MAX_SIZE)
+    first_chunk = await anext(chunks, b"")
+    
+    # Trust the file's magic bytes rather than the client-declared type
+    content_type = sniff_content_type(first_chunk)
+    if content_type is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="File size exceeds 5MB limit"
+            detail="Unsupported image format"
         )
     
-    # Reset file pointer
-    await file.seek(0)
-    
-    # Upload to S3
-    file_key = f"avatars/{current_user['user_id']}/{file.filename}"
-    uploaded_key = await s3_service.upload_file(
-        file.file,
-        key=file_key,
-        content_type=file.content_type,
-        metadata={"user_id": current_user["user_id"]}
-    )
-    
-    # Update user profile with avatar URL
-    await user_service.update_user(
-        current_user["user_id"],
-        {"avatar_key": uploaded_key}
-    )
+    # Spool once to disk: S3 streams the original from the file and the render
+    # worker opens it by path, so the image is never held in memory here
+    digest = hashlib.sha256(first_chunk)
+    size = len(first_chunk)
+    with tempfile.NamedTemporaryFile() as spool:
+        spool.write(first_chunk)
+        async for chunk in chunks:
+            digest.update(chunk)
+            size += len(chunk)
+            spool.write(chunk)
+        spool.flush()
+        
+        # A failed render or profile update must not leave orphaned objects behind
+        async with Saga() as saga:
+            # Upload to S3 from its own handle; the transfer closes the file
+            # it reads, which would delete the spool before the render
+            file_key = f"avatars/{current_user['user_id']}/{file.filename}"
+            with open(spool.name, "rb") as original:
+                await s3_service.upload_file(
+                    original,
+                    key=file_key,
+                    content_type=content_type,
+                    metadata={"user_id": current_user["user_id"]}
+                )
+            saga.add_compensation(s3_service.delete_file, file_key)
+            
+            # Resized, EXIF-free derivatives for the frontend to use instead
+            variants = await image_service.create_avatar_derivatives(
+                current_user["user_id"], spool.name, digest.hexdigest()
+            )
+            new_keys = {key for formats in variants.values() for key in formats.values()}
+            saga.add_compensation(s3_service.delete_files, sorted(new_keys))
+            
+            # Update user profile with avatar URL
+            await user_service.update_user(
+                current_user["user_id"],
+                {"avatar_key": file_key, "avatar_variants": variants}
+            )
+            
+            # The profile now points at the new version, so the previous one's
+            # objects are garbage; a failure here must not undo the new avatar
+            old_keys = {current_user.get("avatar_key")} | {
+                key for formats in (current_user.get("avatar_variants") or {}).values()
+                for key in formats.values()
+            }
+            old_keys -= new_keys | {file_key, None}
+            if old_keys:
+                try:
+                    await s3_service.delete_files(sorted(old_keys))
+                except Exception as e:
+                    print(f"Error deleting previous avatar of {current_user['user_id']}: {e}")
     
     return FileUploadResponse(
-        file_key=uploaded_key,
-        file_size=len(file_content),
-        content_type=file.content_type
+        file_key=file_key,
+        file_size=size,
+        content_type=content_type,
+        variants=variants
     )
 
 
+def _owns_file(user: dict, file_key: str) -> bool:
+    """Check a file key lives under the user's upload prefix."""
+    return file_key.startswith(f"uploads/{user['user_id']}/")
+
+
 @router.post("/presigned-url", response_model=PresignedUrlResponse)
 async def get_presigned_url(
     request: PresignedUrlRequest,
@@ -112,13 +279,13 @@ async def get_presigned_url(
 ):
     """Generate presigned URL for file access."""
     # Ensure user can only access their own files
-    if not request.file_key.startswith(f"uploads/{current_user['user_id']}/"):
+    if not _owns_file(current_user, request.file_key):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Access denied to this file"
         )
     
-    url = await s3_service.generate_presigned_url(
+    url, expires_in = await s3_service.get_presigned_url(
         request.file_key,
         expiration=request.expiration,
         method=request.operation
@@ -126,5 +293,156 @@ async def get_presigned_url(
     
     return PresignedUrlResponse(
         url=url,
-        expires_in=request.expiration
-    )
\ No newline at end of file
+        expires_in=expires_in
+    )
+
+
+@router.post("/presigned-urls", response_model=BatchPresignedUrlResponse)
+async def get_presigned_urls(
+    request: BatchPresignedUrlRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """Generate presigned URLs for several files in one call."""
+    if len(request.file_keys) > settings.PRESIGNED_URL_BATCH_MAX_KEYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.PRESIGNED_URL_BATCH_MAX_KEYS} keys per request"
+        )
+    
+    items = []
+    for file_key in request.file_keys:
+        # Per-key ownership check; one foreign key doesn't fail the batch
+        if not _owns_file(current_user, file_key):
+            items.append(BatchPresignedUrlItem(file_key=file_key, error="Access denied to this file"))
+            continue
+        
+        url, expires_in = await s3_service.get_presigned_url(
+            file_key,
+            expiration=request.expiration,
+            method=request.operation
+        )
+        items.append(BatchPresignedUrlItem(file_key=file_key, url=url, expires_in=expires_in))
+    
+    return BatchPresignedUrlResponse(urls=items)
+
+
+@router.get("/files/{file_key:path}")
+async def download_file(
+    file_key: str,
+    range: str = Header(None),
+    if_none_match: str = Header(None),
+    if_modified_since: str = Header(None),
+    current_user: dict = Depends(get_current_user)
+):
+    """Stream one of the user's files, honouring Range and conditional headers."""
+    if not _owns_file(current_user, file_key):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
+    
+    download = await s3_service.open_download(
+        file_key,
+        range_header=range,
+        if_none_match=if_none_match,
+        if_modified_since=if_modified_since
+    )
+    if download is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found")
+    
+    if download.body is None:
+        return Response(status_code=download.status_code, headers=download.headers)
+    return StreamingResponse(download.body, status_code=download.status_code, headers=download.headers)
+
+
+@router.get("/file-metadata/{file_key:path}", response_model=FileMetadata)
+async def get_file_metadata(
+    file_key: str,
+    if_none_match: str = Header(None),
+    current_user: dict = Depends(get_current_user)
+):
+    """Get metadata for one of the user's files, or 304 if unchanged."""
+    if not _owns_file(current_user, file_key):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
+    
+    metadata = await s3_service.get_file_metadata(file_key)
+    if metadata is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found")
+    
+    etag = file_metadata_etag(metadata)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    
+    response = trusted_response(FileMetadata, {"key": file_key, **metadata})
+    set_etag(response, etag)
+    return response
+
+
+@router.post("/uploads/presigned-post", response_model=PresignedPostResponse)
+async def create_presigned_post(
+    request: PresignedPostRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """Generate a presigned POST so the browser uploads straight to S3."""
+    if request.content_type not in settings.UPLOAD_ALLOWED_CONTENT_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Content type not allowed"
+        )
+    
+    max_size = min(request.file_size or settings.PRESIGNED_POST_MAX_SIZE,
+                   settings.PRESIGNED_POST_MAX_SIZE)
+    expiration = min(request.expiration, settings.PRESIGNED_POST_EXPIRATION)
+    
+    # One prefix per upload so concurrent uploads never collide
+    key_prefix = f"uploads/{current_user['user_id']}/{uuid.uuid4()}/"
+    post = await s3_service.generate_presigned_post(
+        key_prefix,
+        content_type=request.content_type,
+        max_size=max_size,
+        expiration=expiration
+    )
+    
+    return PresignedPostResponse(
+        url=post["url"],
+        fields=post["fields"],
+        key_prefix=key_prefix,
+        max_size=max_size,
+        expires_in=expiration
+    )
+
+
+@router.post("/uploads/complete", response_model=FileMetadata)
+async def complete_upload(
+    request: UploadCompleteRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """Verify a direct-to-S3 upload and record it for the user."""
+    if not _owns_file(current_user, request.file_key):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to this file"
+        )
+    
+    metadata = await s3_service.get_file_metadata(request.file_key)
+    if metadata is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Upload not found")
+    
+    # S3 enforced the policy, but re-check in case settings changed since signing
+    if (metadata["size"] > settings.PRESIGNED_POST_MAX_SIZE
+            or metadata["content_type"] not in settings.UPLOAD_ALLOWED_CONTENT_TYPES):
+        await s3_service.delete_file(request.file_key)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Upload violates size or content type limits"
+        )
+    
+    file_metadata = FileMetadata(key=request.file_key, **metadata)
+    
+    # Keyed by file, so completing the same upload twice keeps one record
+    await user_service.record_user_upload(current_user["user_id"], {
+        "key": file_metadata.key,
+        "size": file_metadata.size,
+        "content_type": file_metadata.content_type,
+        "etag": file_metadata.etag,
+        "uploaded_at": file_metadata.last_modified.isoformat()
+    })
+    
+    return file_metadata
@@ -0,0 +1,205 @@
+import threading
+from functools import cached_property
+from typing import Any, Dict, List, Optional, Tuple
+
+import boto3
+from botocore.config import Config
+
+from app.core.config import settings
+from app.utils.deadline import get_remaining
+
+
+class AWSClientFactory:
+    """
+    Builds every boto3 client and resource the app uses.
+
+    All of them come from one shared session, so botocore's loader parses
+    each service model once per process, and each gets a botocore Config
+    tuned from Settings: connection pool size, connect/read timeouts,
+    retry mode and TCP keepalive.
+
+    Services look their clients up here on each use (see within_deadline),
+    so nothing is built at import and cold starts stay short.
+    """
+
+    # Read timeouts (seconds) of the clients used once the request deadline
+    # leaves less than the configured one; a few tiers keep the pools few
+    TIMEOUT_TIERS = (0.5, 1.0, 2.0, 4.0, 8.0, 16.0)
+
+    def __init__(self):
+        # boto3 sessions aren't safe for concurrent client creation, and
+        # clients may first be touched from bulkhead worker threads
+        self._lock = threading.RLock()
+        self._clients: List[Tuple[str, Any]] = []
+        self._bounded: Dict[Tuple[str, str, Optional[str], Optional[float]], Any] = {}
+
+    @cached_property
+    def session(self) -> boto3.Session:
+        """Process-wide boto3 session."""
+        return boto3.Session(
+            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+            region_name=settings.AWS_REGION
+        )
+
+    @staticmethod
+    def _settings_prefix(service_name: str) -> str:
+        """Prefix of a service's pool and timeout settings."""
+        return {"cognito-idp": "COGNITO"}.get(service_name, service_name.upper())
+
+    def config_for(self, service_name: str, timeout: float = None) -> Config:
+        """
+        botocore Config for a service.
+
+        Args:
+            service_name: AWS service, e.g. 's3'
+            timeout: Cap on the connect and read timeouts; also turns off
+                retries, as there is no time left for another attempt
+
+        Returns:
+            Config with the service's pool size and read timeout
+        """
+        prefix = self._settings_prefix(service_name)
+        read_timeout = getattr(settings, f"{prefix}_READ_TIMEOUT")
+        connect_timeout = settings.AWS_CONNECT_TIMEOUT
+        max_attempts = settings.AWS_MAX_ATTEMPTS
+        if timeout is not None:
+            read_timeout = min(read_timeout, timeout)
+            connect_timeout = min(connect_timeout, timeout)
+            max_attempts = 0  # botocore counts retries here, not attempts
+        return Config(
+            max_pool_connections=getattr(settings, f"{prefix}_MAX_POOL_CONNECTIONS"),
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+            retries={'mode': settings.AWS_RETRY_MODE, 'max_attempts': max_attempts},
+            tcp_keepalive=settings.AWS_TCP_KEEPALIVE
+        )
+
+    def client(self, service_name: str, region_name: str = None, timeout: float = None) -> Any:
+        """
+        Create a low-level client.
+
+        Args:
+            service_name: AWS service, e.g. 's3'
+            region_name: Region override; the session's region otherwise
+            timeout: Cap on the client's timeouts (see config_for)
+
+        Returns:
+            boto3 client
+        """
+        with self._lock:
+            client = self.session.client(
+                service_name, region_name=region_name, config=self.config_for(service_name, timeout)
+            )
+            self._clients.append((service_name, client))
+            return client
+
+    def resource(self, service_name: str, region_name: str = None, timeout: float = None) -> Any:
+        """
+        Create a service resource; use resource.meta.client to share its pool.
+
+        Args:
+            service_name: AWS service, e.g. 'dynamodb'
+            region_name: Region override; the session's region otherwise
+            timeout: Cap on the resource's timeouts (see config_for)
+
+        Returns:
+            boto3 service resource
+        """
+        with self._lock:
+            resource = self.session.resource(
+                service_name, region_name=region_name, config=self.config_for(service_name, timeout)
+            )
+            self._clients.append((service_name, resource.meta.client))
+            return resource
+
+    def timeout_tier(self, service_name: str) -> Optional[float]:
+        """
+        Timeout tier that fits the current request deadline.
+
+        Returns:
+            None while the configured read timeout still fits (or no deadline
+            is set), else the largest tier within the remaining budget
+        """
+        remaining = get_remaining()
+        read_timeout = getattr(settings, f"{self._settings_prefix(service_name)}_READ_TIMEOUT")
+        if remaining is None or remaining >= read_timeout:
+            return None
+        return max((tier for tier in self.TIMEOUT_TIERS if tier <= remaining),
+                   default=self.TIMEOUT_TIERS[0])
+
+    def within_deadline(self, kind: str, service_name: str, region_name: str = None) -> Any:
+        """
+        Shared client or resource whose timeouts fit the request deadline.
+
+        A bulkhead stops waiting at the deadline, but it cannot stop the
+        worker thread. Near the deadline, callers therefore get a client
+        whose own timeouts end the call about then, so the thread doesn't
+        hold its slot and connection for a full read timeout. One instance
+        is built per tier and shared, so the connection pools are reused.
+
+        Args:
+            kind: 'client' or 'resource'
+            service_name: AWS service, e.g. 's3'
+            region_name: Region override; the session's region otherwise
+
+        Returns:
+            boto3 client or service resource
+        """
+        key = (kind, service_name, region_name, self.timeout_tier(service_name))
+        built = self._bounded.get(key)
+        if built is None:
+            with self._lock:
+                built = self._bounded.get(key)
+                if built is None:
+                    build = self.client if kind == 'client' else self.resource
+                    built = self._bounded[key] = build(service_name, region_name, timeout=key[3])
+        return built
+
+    def get_pool_stats(self) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Connection pool utilization of every client created so far.
+
+        Reads botocore's urllib3 pool manager, which has no public API
+        for this. Every private attribute is read with a default, so after
+        a library upgrade a client whose internals don't match reports
+        no pools (or None counts) instead of failing.
+
+        Returns:
+            Per service, one entry per client with its per-host pools
+        """
+        stats: Dict[str, List[Dict[str, Any]]] = {}
+        for service_name, client in list(self._clients):
+            max_pool = client.meta.config.max_pool_connections
+            endpoint = getattr(client, '_endpoint', None)
+            http_session = getattr(endpoint, 'http_session', None)
+            manager = getattr(http_session, '_manager', None)
+            pool_map = getattr(manager, 'pools', None)
+
+            pools = []
+            keys = getattr(pool_map, 'keys', None)
+            for key in list(keys()) if callable(keys) else []:
+                pool = pool_map.get(key)
+                if pool is None:
+                    continue
+                queue = getattr(pool, 'pool', None)
+                maxsize = getattr(queue, 'maxsize', 0)
+                qsize = getattr(queue, 'qsize', None)
+                # The queue holds idle connections plus None for never-opened slots
+                in_use = maxsize - qsize() if maxsize and callable(qsize) else None
+                pools.append({
+                    'host': getattr(pool, 'host', None),
+                    'connections_opened': getattr(pool, 'num_connections', None),
+                    'requests': getattr(pool, 'num_requests', None),
+                    'in_use': in_use,
+                    'utilization': in_use / maxsize if in_use is not None else None
+                })
+            stats.setdefault(service_name, []).append({
+                'max_pool_connections': max_pool,
+                'pools': pools
+            })
+        return stats
+
+
+# Global client factory
+aws_clients = AWSClientFactory()
@@ -1,5 +1,5 @@
 import os
-from typing import List, Optional, Union
+from typing import Dict, List, Optional, Union
 from pydantic import field_validator
 from pydantic_settings import BaseSettings
 
@@ -11,10 +11,20 @@ class Settings(BaseSettings):
     DESCRIPTION: str = "FastAPI application with AWS services"
     API_V1_STR: str = "v1"
     ENVIRONMENT: str = "development"
+    # Serve /health/* saturation metrics; they help time an overload, so keep them off publicly
+    HEALTH_DIAGNOSTICS_ENABLED: bool = False
     
     # CORS - Change the type to handle both string and list
     ALLOWED_HOSTS: Union[List[str], str] = ["*"]
     
+    # Response compression
+    COMPRESSION_MINIMUM_SIZE: int = 1024  # smaller bodies gain less than the header overhead
+    COMPRESSION_CONTENT_TYPES: List[str] = [
+        "application/json", "text/", "application/javascript", "application/xml", "image/svg+xml"
+    ]
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4  # higher qualities cost too much CPU per request
+    
     # AWS Settings
     AWS_REGION: str = "us-east-1"
     AWS_ACCESS_KEY_ID: Optional[str] = None
@@ -23,6 +33,10 @@ class Settings(BaseSettings):
     # DynamoDB
     DYNAMODB_TABLE_PREFIX: str = "fastapi-app"
     USERS_TABLE_NAME: str = f"{DYNAMODB_TABLE_PREFIX}-users"
+    BLOBS_TABLE_NAME: str = f"{DYNAMODB_TABLE_PREFIX}-blobs"  # content-addressed upload index
+    UPLOADS_TABLE_NAME: str = f"{DYNAMODB_TABLE_PREFIX}-uploads"  # verified uploads, one item per file
+    USER_RETENTION_DAYS: int = 30  # soft-deleted users expire via DynamoDB TTL after this
+    USER_BATCH_MAX_IDS: int = 100  # IDs per GET /users?ids= lookup
     
     # Cognito - Make these optional with defaults for development
     COGNITO_USER_POOL_ID: str = "us-east-1_XXXXXXXXX"
@@ -33,15 +47,99 @@ class Settings(BaseSettings):
     # S3
     S3_BUCKET_NAME: str = "your-s3-bucket-name"
     S3_REGION: str = AWS_REGION
+    S3_MULTIPART_PART_SIZE: int = 8 * 1024 * 1024  # S3 minimum is 5MB
+    S3_MULTIPART_CONCURRENCY: int = 4  # parts in flight per upload
+    S3_LIST_PAGE_SIZE: int = 1000  # list_objects_v2 maximum
+    S3_LIST_CONCURRENCY: int = 8  # prefixes listed in parallel when fanning out
+    S3_DELETE_BATCH_SIZE: int = 1000  # DeleteObjects maximum
+    S3_DELETE_CONCURRENCY: int = 4  # DeleteObjects calls in flight
+    S3_DOWNLOAD_CHUNK_SIZE: int = 64 * 1024  # bytes read per streamed chunk
+    S3_COPY_MULTIPART_THRESHOLD: int = 256 * 1024 * 1024  # CopyObject fails past 5GB
+    S3_COPY_PART_SIZE: int = 64 * 1024 * 1024
+    S3_COPY_CONCURRENCY: int = 8  # UploadPartCopy calls in flight per copy
+    S3_BLOB_PREFIX: str = "blobs/sha256"  # content-addressed uploads
+    S3_DEDUP_SPOOL_SIZE: int = 8 * 1024 * 1024  # spool non-seekable uploads to disk past this
+    
+    # Uploads
+    UPLOAD_CHUNK_SIZE: int = 64 * 1024
+    AVATAR_MAX_SIZE: int = 5 * 1024 * 1024  # 5MB
+    AVATAR_SIZES: List[int] = [40, 128, 512]  # square derivative edge lengths
+    AVATAR_QUALITY: int = 82
+    # CloudFront signed cookies for user files
+    CLOUDFRONT_DOMAIN: Optional[str] = None
+    CLOUDFRONT_KEY_PAIR_ID: Optional[str] = None
+    CLOUDFRONT_PRIVATE_KEY: Optional[str] = None  # PEM, "\n" escapes allowed
+    CLOUDFRONT_PRIVATE_KEY_PATH: Optional[str] = None
+    CLOUDFRONT_COOKIE_DOMAIN: Optional[str] = None  # e.g. ".example.com"
+    CLOUDFRONT_COOKIE_TTL: int = 3600
+    
+    # Presigned URLs - reuse a signed URL while this fraction of its lifetime remains
+    PRESIGNED_URL_REUSE_FRACTION: float = 0.5
+    PRESIGNED_URL_BATCH_MAX_KEYS: int = 50
+    
+    # Direct-to-S3 (presigned POST) uploads
+    PRESIGNED_POST_MAX_SIZE: int = 100 * 1024 * 1024  # 100MB
+    PRESIGNED_POST_EXPIRATION: int = 900  # 15 minutes
+    UPLOAD_ALLOWED_CONTENT_TYPES: List[str] = [
+        "image/jpeg", "image/png", "image/gif", "image/webp",
+        "application/pdf", "text/plain"
+    ]
+    
+    # Batch API - sub-requests per POST /batch and size caps (Lambda responses max out at 6MB)
+    BATCH_MAX_OPERATIONS: int = 20
+    BATCH_MAX_PAYLOAD_BYTES: int = 1024 * 1024  # 1MB request body
+    BATCH_MAX_RESPONSE_BYTES: int = 5 * 1024 * 1024  # 5MB of sub-response bodies
     
     # JWT
     JWT_SECRET_KEY: str = "your-secret-key-change-this"
     JWT_ALGORITHM: str = "HS256"
+    JWT_KEY_ID: str = "primary"
+    # Retired signing keys (kid -> secret) still accepted during rotation
+    JWT_PREVIOUS_SECRET_KEYS: Dict[str, str] = {}
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    SESSION_TOKEN_EXPIRE_MINUTES: int = 15
+    
+    # Password hashing - changing the cost rehashes passwords on next verify
+    PASSWORD_HASH_ROUNDS: int = 12
+    PROCESS_POOL_WORKERS: int = 0  # 0 = one worker per CPU
+    
+    # AWS clients (botocore Config). Pools should cover the bulkhead's
+    # concurrency; S3 needs more because streamed downloads hold a
+    # connection between chunk reads.
+    AWS_CONNECT_TIMEOUT: float = 2.0
+    AWS_RETRY_MODE: str = "adaptive"  # client-side rate limiting on throttles
+    AWS_MAX_ATTEMPTS: int = 3
+    AWS_TCP_KEEPALIVE: bool = True
+    DYNAMODB_MAX_POOL_CONNECTIONS: int = 16
+    DYNAMODB_READ_TIMEOUT: float = 5.0
+    S3_MAX_POOL_CONNECTIONS: int = 32
+    S3_READ_TIMEOUT: float = 30.0
+    COGNITO_MAX_POOL_CONNECTIONS: int = 8
+    COGNITO_READ_TIMEOUT: float = 5.0
+    
+    # Bulkheads - per-dependency concurrency limit and bounded wait queue
+    COGNITO_MAX_CONCURRENCY: int = 4
+    COGNITO_MAX_QUEUE: int = 16
+    DYNAMODB_MAX_CONCURRENCY: int = 10
+    DYNAMODB_MAX_QUEUE: int = 50
+    S3_MAX_CONCURRENCY: int = 8
+    S3_MAX_QUEUE: int = 32
+    BULKHEAD_QUEUE_TIMEOUT: float = 2.0  # seconds a call may wait for a slot
+    BULKHEAD_RETRY_AFTER: int = 1  # Retry-After seconds on rejection
+    
+    # Request deadlines - Lambda uses the invocation's remaining time instead of the budget
+    REQUEST_DEADLINE_BUDGET: float = 29.0  # container mode; API Gateway gives up at 29s, 0 disables
+    DEADLINE_SAFETY_MARGIN: float = 1.0  # seconds held back to return a clean 503
     
     # Cache settings
     CACHE_TTL: int = 300  # 5 minutes
     
+    # Warm-up at Lambda init / container startup
+    WARMUP_ENABLED: bool = True
+    WARMUP_CONNECTIONS: int = 2  # pooled connections opened per endpoint
+    WARMUP_TIMEOUT: float = 5.0  # seconds per warm-up step
+    WARMUP_USER_IDS: List[str] = []  # hot user records to pre-load into the cache
+    
     @field_validator("ALLOWED_HOSTS", mode="before")
     @classmethod
     def assemble_cors_origins(cls, v):
@@ -2,6 +2,7 @@ from fastapi import FastAPI, Request, HTTPException
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
+from typing import Dict, Optional
 import logging
 
 logger = logging.getLogger(__name__)
@@ -9,9 +10,11 @@ logger = logging.getLogger(__name__)
 
 class CustomException(Exception):
     """Base custom exception."""
-    def __init__(self, message: str, status_code: int = 500):
+    def __init__(self, message: str, status_code: int = 500,
+                 headers: Optional[Dict[str, str]] = None):
         self.message = message
         self.status_code = status_code
+        self.headers = headers
         super().__init__(self.message)
 
 
@@ -33,6 +36,57 @@ class AuthorizationException(CustomException):
         super().__init__(message, 403)
 
 
+class FileTooLargeException(CustomException):
+    """Upload exceeds size limit exception."""
+    def __init__(self, max_size: int):
+        super().__init__(f"File size exceeds {max_size // (1024 * 1024)}MB limit", 413)
+
+
+class InvalidFileException(CustomException):
+    """Uploaded file cannot be processed exception."""
+    def __init__(self, message: str = "Invalid file"):
+        super().__init__(message, 400)
+
+
+class InvalidFieldsException(CustomException):
+    """Unknown fields requested in a sparse fieldset exception."""
+    def __init__(self, fields):
+        super().__init__(f"Unknown fields: {', '.join(sorted(fields))}", 400)
+
+
+class InvalidCursorException(CustomException):
+    """Malformed or tampered pagination cursor exception."""
+    def __init__(self):
+        super().__init__("Invalid pagination cursor", 400)
+
+
+class RangeNotSatisfiableException(CustomException):
+    """Requested byte range outside the object exception."""
+    def __init__(self, size: Optional[int] = None):
+        headers = {"Content-Range": f"bytes */{size}"} if size is not None else None
+        super().__init__("Requested range not satisfiable", 416, headers=headers)
+
+
+class ServiceUnavailableException(CustomException):
+    """Downstream dependency unavailable exception."""
+    def __init__(self, message: str = "Service temporarily unavailable", retry_after: int = 1):
+        super().__init__(message, 503, headers={"Retry-After": str(retry_after)})
+
+
+class BulkheadFullException(ServiceUnavailableException):
+    """Dependency bulkhead at capacity exception."""
+    def __init__(self, name: str, retry_after: int = 1):
+        self.bulkhead = name
+        super().__init__(f"{name} is at capacity, please retry", retry_after)
+
+
+class DeadlineExceededException(ServiceUnavailableException):
+    """Request ran out of its time budget exception."""
+    def __init__(self, dependency: str, retry_after: int = 1):
+        self.dependency = dependency
+        super().__init__(f"Request deadline exceeded waiting for {dependency}", retry_after)
+
+
 def setup_exception_handlers(app: FastAPI):
     """Setup global exception handlers."""
     
@@ -41,7 +95,8 @@ def setup_exception_handlers(app: FastAPI):
         logger.error(f"Custom exception: {exc.message}")
         return JSONResponse(
             status_code=exc.status_code,
-            content={"detail": exc.message, "type": type(exc).__name__}
+            content={"detail": exc.message, "type": type(exc).__name__},
+            headers=exc.headers
         )
     
     @app.exception_handler(StarletteHTTPException)
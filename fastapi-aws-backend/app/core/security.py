@@ -1,14 +1,34 @@
-import jwt
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from functools import lru_cache
+from typing import Optional, Dict, Any, Tuple
 from fastapi import HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from passlib.context import CryptContext
 
 from app.core.config import settings
+from app.utils.executors import run_in_process
+
+# jwt and passlib are imported where used: routes like /health never need
+# them, and they add noticeably to Lambda cold-start import time.
+
+
+@lru_cache(maxsize=None)
+def pwd_context():
+    """
+    Password hashing context, built on first use.
+    
+    min/max pin the accepted cost so hashes made with a different
+    PASSWORD_HASH_ROUNDS are flagged for rehash on verify.
+    """
+    from passlib.context import CryptContext
+    
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__rounds=settings.PASSWORD_HASH_ROUNDS,
+        bcrypt__min_rounds=settings.PASSWORD_HASH_ROUNDS,
+        bcrypt__max_rounds=settings.PASSWORD_HASH_ROUNDS,
+    )
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 # JWT Bearer token
 security = HTTPBearer()
@@ -16,31 +36,108 @@ security = HTTPBearer()
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    return pwd_context().verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
     """Generate password hash."""
-    return pwd_context.hash(password)
+    return pwd_context().hash(password)
+
+
+def verify_and_update_password(plain_password: str,
+                               hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password, returning a replacement hash if the cost changed."""
+    return pwd_context().verify_and_update(plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Generate password hash on the process pool."""
+    return await run_in_process(get_password_hash, password)
+
+
+async def verify_password_async(plain_password: str,
+                                hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password on the process pool.
+    
+    Args:
+        plain_password: Candidate password
+        hashed_password: Stored bcrypt hash
+        
+    Returns:
+        Tuple of (valid, new_hash). new_hash is set when the stored hash
+        used a different cost and should be persisted by the caller.
+    """
+    return await run_in_process(verify_and_update_password, plain_password, hashed_password)
+
+
+# Marks tokens minted by create_session_token
+SESSION_TOKEN_USE = "session"
+
+# Placeholder secrets shipped in config.py and .env.example; anyone can sign with them
+INSECURE_JWT_SECRETS = {
+    "",
+    "your-secret-key-change-this",
+    "your-super-secret-jwt-key-change-this-in-production",
+}
+
+
+def session_tokens_enabled() -> bool:
+    """
+    Check whether locally issued session tokens may be minted and accepted.
+    
+    The session path stays off until JWT_SECRET_KEY is set to a real secret,
+    otherwise any HMAC token signed with the public default would verify.
+    """
+    return (settings.JWT_SECRET_KEY or "") not in INSECURE_JWT_SECRETS
+
 
+def _signing_keys() -> Dict[str, str]:
+    """Return all accepted HMAC secrets keyed by kid (active key last wins)."""
+    keys = dict(settings.JWT_PREVIOUS_SECRET_KEYS)
+    keys[settings.JWT_KEY_ID] = settings.JWT_SECRET_KEY
+    return keys
 
-def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
-    """Create JWT access token."""
+
+def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None,
+                        expires_at: Optional[datetime] = None) -> str:
+    """Create JWT access token signed with the active key, expiring at expires_at if given."""
+    import jwt
+    
     to_encode = data.copy()
-    if expires_delta:
+    if expires_at is not None:
+        expire = expires_at
+    elif expires_delta is not None:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+    to_encode.update({"exp": expire, "iat": datetime.utcnow()})
+    encoded_jwt = jwt.encode(
+        to_encode,
+        settings.JWT_SECRET_KEY,
+        algorithm=settings.JWT_ALGORITHM,
+        headers={"kid": settings.JWT_KEY_ID}
+    )
     return encoded_jwt
 
 
 def decode_access_token(token: str) -> Dict[str, Any]:
-    """Decode JWT access token."""
+    """Decode JWT access token, selecting the verification key by kid."""
+    import jwt
+    
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
     try:
-        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+        header = jwt.get_unverified_header(token)
+        secret = _signing_keys().get(header.get("kid", settings.JWT_KEY_ID))
+        if secret is None:
+            raise credentials_exception
+        
+        payload = jwt.decode(token, secret, algorithms=[settings.JWT_ALGORITHM])
         return payload
     except jwt.ExpiredSignatureError:
         raise HTTPException(
@@ -48,12 +145,62 @@ def decode_access_token(token: str) -> Dict[str, Any]:
             detail="Token has expired",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    except jwt.JWTError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    except jwt.InvalidTokenError:
+        raise credentials_exception
+
+
+def is_session_token(token: str) -> bool:
+    """
+    Check whether a bearer token is a locally issued session token.
+    
+    Only the unverified header is inspected: Cognito tokens are RS256 while
+    session tokens use the configured HMAC algorithm.
+    """
+    import jwt
+    
+    try:
+        header = jwt.get_unverified_header(token)
+    except jwt.InvalidTokenError:
+        return False
+    return header.get("alg") == settings.JWT_ALGORITHM
+
+
+def create_session_token(cognito_payload: Dict[str, Any], user: Dict[str, Any]) -> Tuple[str, int]:
+    """
+    Exchange a verified Cognito token for a short-lived session token.
+    
+    Args:
+        cognito_payload: Verified Cognito token claims
+        user: User record the token belongs to
+        
+    Returns:
+        Encoded session token and its lifetime in seconds
+        
+    Raises:
+        RuntimeError: If session tokens are disabled
+    """
+    if not session_tokens_enabled():
+        raise RuntimeError("Session tokens are disabled until JWT_SECRET_KEY is set")
+    
+    now = datetime.utcnow()
+    expire = now + timedelta(minutes=settings.SESSION_TOKEN_EXPIRE_MINUTES)
+    
+    # Never outlive the Cognito token the session was derived from
+    cognito_exp = cognito_payload.get("exp")
+    if cognito_exp:
+        expire = min(expire, datetime.utcfromtimestamp(cognito_exp))
+    
+    token = create_access_token(
+        {
+            "sub": user["user_id"],
+            "email": user.get("email"),
+            "token_use": SESSION_TOKEN_USE,
+            "is_active": bool(user.get("is_active", False)),
+            "email_verified": bool(user.get("email_verified", False)),
+        },
+        expires_at=expire
+    )
+    return token, max(int((expire - now).total_seconds()), 0)
 
 
 def get_current_user_from_token(credentials: HTTPAuthorizationCredentials) -> Dict[str, Any]:
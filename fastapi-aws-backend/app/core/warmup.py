@@ -0,0 +1,78 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Input of the scheduled keep-warm rule in template.yaml
+WARMUP_EVENT_KEY = "warmup"
+
+
+def is_warmup_event(event: Any) -> bool:
+    """
+    Check whether a Lambda event is a keep-warm ping.
+
+    Recognizes our own scheduled {"warmup": true} input and pings from
+    serverless-plugin-warmup.
+    """
+    if not isinstance(event, dict):
+        return False
+    return bool(event.get(WARMUP_EVENT_KEY)) or event.get("source") == "serverless-plugin-warmup"
+
+
+async def warm_up(hot_user_ids: List[str] = None, connections: int = None,
+                  timeout: float = None) -> Dict[str, Any]:
+    """
+    Prime connections, the JWKS and caches before the first request.
+
+    Each step runs concurrently under its own timeout; a failing step is
+    logged and reported but never raised, so warm-up can't break startup.
+
+    Args:
+        hot_user_ids: User records to pre-load into the cache
+            (WARMUP_USER_IDS by default)
+        connections: Pooled connections to open per endpoint
+        timeout: Seconds each step may take
+
+    Returns:
+        Per-step status ('ok' or the error) and the elapsed time in ms
+    """
+    # Imported here so importing this module never builds the services
+    from app.services.auth_service import auth_service
+    from app.services.dynamodb_service import dynamodb_service
+    from app.services.s3_service import s3_service
+    from app.services.user_service import user_service
+
+    connections = connections or settings.WARMUP_CONNECTIONS
+    timeout = timeout or settings.WARMUP_TIMEOUT
+    hot_user_ids = settings.WARMUP_USER_IDS if hot_user_ids is None else hot_user_ids
+
+    steps = {
+        "dynamodb": dynamodb_service.warm_up(
+            [settings.USERS_TABLE_NAME, settings.BLOBS_TABLE_NAME], connections
+        ),
+        "s3": s3_service.warm_up(connections),
+        "cognito": auth_service.warm_up(connections),
+    }
+    if hot_user_ids:
+        steps["hot_users"] = user_service.get_users_by_ids(hot_user_ids)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(asyncio.wait_for(step, timeout) for step in steps.values()),
+        return_exceptions=True
+    )
+
+    report: Dict[str, Any] = {}
+    for name, result in zip(steps, results):
+        if isinstance(result, BaseException):
+            logger.warning(f"Warm-up step {name} failed: {result!r}")
+            report[name] = repr(result)
+        else:
+            report[name] = "ok"
+    report["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    logger.info(f"Warm-up finished: {report}")
+    return report
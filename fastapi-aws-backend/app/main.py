@@ -1,10 +1,25 @@
+import asyncio
+import os
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from mangum import Mangum
 
 from app.api.v1.api import api_router
+from app.core.aws import aws_clients
 from app.core.config import settings
 from app.core.exceptions import setup_exception_handlers
+from app.core.warmup import is_warmup_event, warm_up
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.deadline import DeadlineMiddleware
+from app.services.user_service import user_service
+from app.utils.bulkhead import get_bulkhead_stats
+from app.utils.executors import shutdown_process_pool
+
+# Set by the Lambda runtime; absent when running in a container
+IN_LAMBDA = "AWS_LAMBDA_FUNCTION_NAME" in os.environ
+
 
 def create_app() -> FastAPI:
     app = FastAPI(
@@ -14,6 +29,7 @@ def create_app() -> FastAPI:
         openapi_url=f"/openapi.json" if settings.ENVIRONMENT != "production" else None,
         docs_url=f"/docs" if settings.ENVIRONMENT != "production" else None,
         redoc_url=f"/redoc" if settings.ENVIRONMENT != "production" else None,
+        default_response_class=ORJSONResponse,
     )
 
     # CORS middleware
@@ -25,19 +41,66 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    # Compress JSON/text responses before they leave API Gateway
+    app.add_middleware(CompressionMiddleware)
+
+    # Outermost: per-request deadline from the Lambda context (or a budget)
+    app.add_middleware(DeadlineMiddleware)
+
     # Include routers
     app.include_router(api_router, prefix=settings.API_V1_STR)
 
     # Setup exception handlers
     setup_exception_handlers(app)
 
+    app.add_event_handler("shutdown", shutdown_process_pool)
+
+    if settings.WARMUP_ENABLED and not IN_LAMBDA:
+        # Container mode: warm up once on lifespan startup
+        app.add_event_handler("startup", warm_up)
+
     @app.get("/health")
     async def health_check():
         return {"status": "healthy", "version": settings.VERSION}
 
+    if settings.HEALTH_DIAGNOSTICS_ENABLED:
+        @app.get("/health/bulkheads")
+        async def bulkhead_health():
+            """Per-dependency bulkhead saturation metrics."""
+            return get_bulkhead_stats()
+
+        @app.get("/health/aws-pools")
+        async def aws_pool_health():
+            """Connection pool utilization of the AWS clients."""
+            return aws_clients.get_pool_stats()
+
     return app
 
 app = create_app()
 
-# Lambda handler
-lambda_handler = Mangum(app)
\ No newline at end of file
+# Lambda handler. Mangum would run the lifespan on every invocation, so it
+# is off; one-time setup happens during Lambda init instead.
+asgi_handler = Mangum(app, lifespan="off")
+
+if settings.WARMUP_ENABLED and IN_LAMBDA:
+    # Init phase: prime connections and JWKS before the first invocation.
+    # Mangum drives requests on this same loop.
+    asyncio.get_event_loop().run_until_complete(warm_up())
+
+# Scheduled jobs, invoked by EventBridge with {"job": "<name>"} as input
+SCHEDULED_JOBS = {
+    "purge_deleted_users": user_service.purge_deleted_users,
+    "backfill_active_index": user_service.backfill_active_index,
+}
+
+
+def lambda_handler(event, context):
+    """Route scheduled job events to their job, everything else to the API."""
+    if is_warmup_event(event):
+        # Keep-warm ping: the environment was primed at init, nothing to run
+        return {"warm": True}
+    job = SCHEDULED_JOBS.get(event.get("job")) if isinstance(event, dict) else None
+    if job:
+        # Mangum drives the API on this same loop, so asyncio state is shared
+        return asyncio.get_event_loop().run_until_complete(job())
+    return asgi_handler(event, context)
@@ -0,0 +1,154 @@
+import gzip
+from typing import Iterable, List, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only without it
+    brotli = None
+
+
+def negotiate_encodings(accept_encoding: str, brotli_available: bool = True) -> List[str]:
+    """
+    List the content codings a client accepts, most preferred first.
+
+    Args:
+        accept_encoding: Raw Accept-Encoding header value
+        brotli_available: Whether 'br' can be produced
+
+    Returns:
+        Subset of ['br', 'gzip'] ordered by q-value, brotli first on ties
+    """
+    accepted = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+
+    wildcard = accepted.get("*", 0.0)
+    candidates = ["br", "gzip"] if brotli_available else ["gzip"]
+    scored = [(accepted.get(coding, wildcard), coding) for coding in candidates]
+    # sorted() is stable, so equal q-values keep brotli ahead of gzip
+    return [coding for quality, coding in sorted(scored, key=lambda item: -item[0]) if quality > 0]
+
+
+class CompressionMiddleware:
+    """
+    Pure ASGI gzip/brotli response compression.
+
+    Only complete, single-message responses are compressed: streaming
+    bodies (more_body), ranged and already-encoded responses pass through
+    untouched, as do bodies under the size threshold or outside the
+    content-type allowlist.
+
+    Mangum returns application/json and text/* bodies as text when they
+    decode as UTF-8 and base64-encodes them otherwise. Gzip output never
+    decodes (its header is invalid UTF-8), but brotli has no header, so a
+    brotli body that happens to decode falls back to gzip (or to no
+    compression) rather than being sent as mangled text.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = None,
+                 content_types: Iterable[str] = None, gzip_level: int = None,
+                 brotli_quality: int = None):
+        self.app = app
+        self.minimum_size = minimum_size if minimum_size is not None else settings.COMPRESSION_MINIMUM_SIZE
+        self.content_types: List[str] = list(content_types or settings.COMPRESSION_CONTENT_TYPES)
+        self.gzip_level = gzip_level if gzip_level is not None else settings.COMPRESSION_GZIP_LEVEL
+        self.brotli_quality = brotli_quality if brotli_quality is not None else settings.COMPRESSION_BROTLI_QUALITY
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encodings = negotiate_encodings(
+            Headers(scope=scope).get("accept-encoding", ""), brotli_available=brotli is not None
+        )
+        if not encodings:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, passthrough
+
+            if message["type"] == "http.response.start":
+                # Hold the headers until the first body message shows the size
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            if start_message is not None:
+                body = message.get("body", b"")
+                coding = None
+                if not message.get("more_body", False) and self._should_compress(start_message, body):
+                    coding, compressed = self._compress(body, encodings)
+                if coding is None:
+                    passthrough = True
+                    await send(start_message)
+                    start_message = None
+                    await send(message)
+                    return
+
+                headers = MutableHeaders(raw=start_message["headers"])
+                headers["Content-Encoding"] = coding
+                headers["Content-Length"] = str(len(compressed))
+                headers.add_vary_header("Accept-Encoding")
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    # The encoded bytes differ, so a strong validator no longer holds
+                    headers["ETag"] = f"W/{etag}"
+
+                await send(start_message)
+                start_message = None
+                await send({"type": "http.response.body", "body": compressed})
+                return
+
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
+
+    def _should_compress(self, start_message: Message, body: bytes) -> bool:
+        """Check a complete response is worth and safe to compress."""
+        if len(body) < self.minimum_size or start_message["status"] in (204, 206, 304):
+            return False
+
+        headers = Headers(raw=start_message["headers"])
+        if "content-encoding" in headers or "content-range" in headers:
+            return False
+        content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        return any(content_type.startswith(allowed) for allowed in self.content_types)
+
+    def _compress(self, body: bytes, encodings: List[str]) -> Tuple[Optional[str], bytes]:
+        """
+        Compress a body with the first acceptable coding that is safe for Mangum.
+
+        Returns:
+            (coding, compressed bytes), or (None, body) if no coding applies
+        """
+        for encoding in encodings:
+            if encoding == "br":
+                compressed = brotli.compress(body, quality=self.brotli_quality)
+                try:
+                    compressed.decode("utf-8")
+                except UnicodeDecodeError:
+                    return "br", compressed
+            elif encoding == "gzip":
+                # mtime=0 keeps output deterministic for identical bodies
+                return "gzip", gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+        return None, body
@@ -0,0 +1,52 @@
+from typing import Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.utils.deadline import clear_deadline, get_remaining, reset_deadline, set_deadline
+
+
+class DeadlineMiddleware:
+    """
+    Pure ASGI middleware giving each request a deadline.
+
+    Under Lambda the budget is the invocation's remaining time, read from
+    the context Mangum puts in scope["aws.context"]; in a container it is
+    REQUEST_DEADLINE_BUDGET. A safety margin is held back so a request
+    that runs out of time still has room to return a clean 503 before the
+    function is killed. Requests dispatched while a deadline is already
+    running (batch sub-requests) keep the outer one.
+
+    The deadline only covers producing the response: it is lifted at
+    http.response.start, so streamed bodies (file downloads) and background
+    tasks are bounded by the platform timeout alone.
+    """
+
+    def __init__(self, app: ASGIApp, budget: float = None, safety_margin: float = None):
+        self.app = app
+        self.budget = budget if budget is not None else settings.REQUEST_DEADLINE_BUDGET
+        self.safety_margin = safety_margin if safety_margin is not None else settings.DEADLINE_SAFETY_MARGIN
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        budget = self._budget(scope) if scope["type"] == "http" and get_remaining() is None else None
+        if budget is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                clear_deadline()
+            await send(message)
+
+        token = set_deadline(budget)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            reset_deadline(token)
+
+    def _budget(self, scope: Scope) -> Optional[float]:
+        """Seconds the request may take, or None for no deadline."""
+        context = scope.get("aws.context")
+        if context is not None and hasattr(context, "get_remaining_time_in_millis"):
+            return context.get_remaining_time_in_millis() / 1000 - self.safety_margin
+        return self.budget - self.safety_margin if self.budget else None
@@ -0,0 +1,29 @@
+# app/models/batch.py
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, Field
+
+
+class BatchOperation(BaseModel):
+    """Single sub-request of a batch call."""
+    method: str = Field(..., pattern="^(GET|HEAD|POST|PUT|PATCH|DELETE)$")
+    path: str  # full API path including query string, e.g. "/api/v1/users/me"
+    body: Optional[Any] = None  # sent as JSON
+    headers: Dict[str, str] = Field(default_factory=dict)  # e.g. If-None-Match
+
+
+class BatchRequest(BaseModel):
+    """Batch request model; operations run in order, reads concurrently."""
+    operations: List[BatchOperation] = Field(..., min_length=1)
+
+
+class BatchOperationResult(BaseModel):
+    """Outcome of one sub-request."""
+    status_code: int
+    headers: Dict[str, str] = Field(default_factory=dict)
+    body: Optional[Any] = None  # parsed JSON, text, or base64 (see is_base64_encoded)
+    is_base64_encoded: bool = False
+
+
+class BatchResponse(BaseModel):
+    """Batch response model, results in request order."""
+    results: List[BatchOperationResult]
@@ -3,7 +3,7 @@ from typing import Optional
 from pydantic import BaseModel
 from datetime import datetime
 from pydantic import Field
-from typing import Dict
+from typing import Dict, List
 
 
 class FileUploadResponse(BaseModel):
@@ -12,6 +12,7 @@ class FileUploadResponse(BaseModel):
     file_size: int
     content_type: Optional[str] = None
     upload_url: Optional[str] = None
+    variants: Optional[Dict[str, Dict[str, str]]] = None
 
 
 class FileMetadata(BaseModel):
@@ -34,4 +35,71 @@ class PresignedUrlRequest(BaseModel):
 class PresignedUrlResponse(BaseModel):
     """Presigned URL response model."""
     url: str
-    expires_in: int
\ No newline at end of file
+    expires_in: int
+
+
+class BatchPresignedUrlRequest(BaseModel):
+    """Batch presigned URL request model."""
+    file_keys: List[str] = Field(..., min_length=1)
+    expiration: int = Field(default=3600, ge=1, le=604800)
+    operation: str = Field(default="get_object", pattern="^(get_object|put_object)$")
+
+
+class BatchPresignedUrlItem(BaseModel):
+    """Single entry of a batch presigned URL response."""
+    file_key: str
+    url: Optional[str] = None
+    expires_in: Optional[int] = None
+    error: Optional[str] = None
+
+
+class BatchPresignedUrlResponse(BaseModel):
+    """Batch presigned URL response model."""
+    urls: List[BatchPresignedUrlItem]
+
+
+class PresignedPostRequest(BaseModel):
+    """Presigned POST (direct browser upload) request model."""
+    content_type: str
+    file_size: Optional[int] = Field(default=None, gt=0)  # tightens the size limit
+    expiration: int = Field(default=900, ge=60, le=3600)
+
+
+class PresignedPostResponse(BaseModel):
+    """Presigned POST response model."""
+    url: str
+    fields: Dict[str, str]
+    key_prefix: str
+    max_size: int
+    expires_in: int
+
+
+class UploadCompleteRequest(BaseModel):
+    """Direct upload completion request model."""
+    file_key: str
+
+
+class FileAccessCookieSet(BaseModel):
+    """Path prefix and expiry of one set of signed cookies (values are httponly cookies only)."""
+    path: str
+    expires_at: int
+
+
+class FileAccessCookiesResponse(BaseModel):
+    """CloudFront signed cookie response model."""
+    domain: str
+    cookie_sets: List[FileAccessCookieSet]
+
+
+class FileListItem(BaseModel):
+    """Listed file model."""
+    key: str
+    size: int
+    last_modified: datetime
+    etag: str
+
+
+class FileListResponse(BaseModel):
+    """Paginated file listing response model."""
+    files: List[FileListItem]
+    next_start_after: Optional[str] = None
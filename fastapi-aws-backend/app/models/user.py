@@ -1,5 +1,5 @@
 # app/models/user.py
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from pydantic import BaseModel, EmailStr, Field
 from app.models.base import BaseModelWithTimestamp
 
@@ -35,11 +35,25 @@ class UserResponse(UserBase, BaseModelWithTimestamp):
     user_id: str
     is_active: bool = True
     email_verified: bool = False
+    avatar_key: Optional[str] = None
+    avatar_variants: Optional[Dict[str, Dict[str, str]]] = None  # size -> format -> key
     
     class Config:
         from_attributes = True
 
 
+class BatchUserItem(BaseModel):
+    """Single entry of a batch user lookup; user is None when not found."""
+    user_id: str
+    found: bool
+    user: Optional[UserResponse] = None
+
+
+class BatchUserResponse(BaseModel):
+    """Batch user lookup response, in request order."""
+    users: List[BatchUserItem]
+
+
 class UserLogin(BaseModel):
     """User login model."""
     email: EmailStr
@@ -83,6 +97,13 @@ class TokenResponse(BaseModel):
     expires_in: int
 
 
+class SessionTokenResponse(BaseModel):
+    """Session token response model."""
+    access_token: str
+    token_type: str = "bearer"
+    expires_in: int
+
+
 class RefreshTokenRequest(BaseModel):
     """Refresh token request model."""
     refresh_token: str
\ No newline at end of file
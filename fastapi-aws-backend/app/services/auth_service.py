@@ -1,35 +1,38 @@
-import boto3
+import asyncio
 import hmac
 import hashlib
 import base64
 from botocore.exceptions import ClientError
+from functools import cached_property
 from typing import Dict, Any, Optional
-import jwt
-from jwt import PyJWKClient
-import requests
 
+from app.core.aws import aws_clients
 from app.core.config import settings
 from app.core.exceptions import AuthenticationException, AuthorizationException
 from app.utils.cache import lru_ttl_cache
+from app.utils.bulkhead import cognito_bulkhead
 
 
 class CognitoAuthService:
     """AWS Cognito authentication service with caching."""
     
     def __init__(self):
-        session = boto3.Session(
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-            region_name=settings.COGNITO_REGION
-        )
-        self.client = session.client('cognito-idp')
         self.user_pool_id = settings.COGNITO_USER_POOL_ID
         self.client_id = settings.COGNITO_CLIENT_ID
         self.client_secret = settings.COGNITO_CLIENT_SECRET
+    
+    @property
+    def client(self):
+        """Cognito identity provider client, with timeouts that fit the request deadline."""
+        return aws_clients.within_deadline('client', 'cognito-idp', region_name=settings.COGNITO_REGION)
+    
+    @cached_property
+    def jwks_client(self):
+        """JWK client for token verification."""
+        from jwt import PyJWKClient
         
-        # JWK client for token verification
         jwks_url = f"https://cognito-idp.{settings.COGNITO_REGION}.amazonaws.com/{self.user_pool_id}/.well-known/jwks.json"
-        self.jwks_client = PyJWKClient(jwks_url)
+        return PyJWKClient(jwks_url, timeout=settings.COGNITO_READ_TIMEOUT)
     
     def _calculate_secret_hash(self, username: str) -> str:
         """Calculate secret hash for Cognito operations."""
@@ -76,7 +79,7 @@ class CognitoAuthService:
             if self.client_secret:
                 kwargs['SecretHash'] = self._calculate_secret_hash(email)
             
-            response = self.client.sign_up(**kwargs)
+            response = await cognito_bulkhead.run(self.client.sign_up, **kwargs)
             return response
             
         except ClientError as e:
@@ -90,6 +93,28 @@ class CognitoAuthService:
             else:
                 raise AuthenticationException(f"Sign up failed: {error_message}")
     
+    async def admin_delete_user(self, email: str) -> bool:
+        """
+        Delete a user from the pool (used to roll back a failed sign-up).
+        
+        Args:
+            email: User email
+            
+        Returns:
+            True if successful
+        """
+        try:
+            await cognito_bulkhead.run(
+                self.client.admin_delete_user,
+                UserPoolId=self.user_pool_id,
+                Username=email
+            )
+            return True
+            
+        except ClientError as e:
+            error_message = e.response['Error']['Message']
+            raise AuthenticationException(f"Delete user failed: {error_message}")
+    
     async def confirm_sign_up(self, email: str, confirmation_code: str) -> Dict[str, Any]:
         """
         Confirm user sign-up with verification code.
@@ -111,7 +136,7 @@ class CognitoAuthService:
             if self.client_secret:
                 kwargs['SecretHash'] = self._calculate_secret_hash(email)
             
-            response = self.client.confirm_sign_up(**kwargs)
+            response = await cognito_bulkhead.run(self.client.confirm_sign_up, **kwargs)
             return response
             
         except ClientError as e:
@@ -143,7 +168,7 @@ class CognitoAuthService:
             if self.client_secret:
                 kwargs['AuthParameters']['SECRET_HASH'] = self._calculate_secret_hash(email)
             
-            response = self.client.initiate_auth(**kwargs)
+            response = await cognito_bulkhead.run(self.client.initiate_auth, **kwargs)
             
             if 'ChallengeName' in response:
                 # Handle MFA or other challenges
@@ -183,7 +208,7 @@ class CognitoAuthService:
                 # For refresh token, we don't have username, so use a placeholder
                 kwargs['AuthParameters']['SECRET_HASH'] = self._calculate_secret_hash('')
             
-            response = self.client.initiate_auth(**kwargs)
+            response = await cognito_bulkhead.run(self.client.initiate_auth, **kwargs)
             return response['AuthenticationResult']
             
         except ClientError as e:
@@ -201,9 +226,11 @@ class CognitoAuthService:
         Returns:
             Decoded token payload
         """
+        import jwt  # deferred: only token verification needs it
+        
         try:
-            # Get signing key
-            signing_key = self.jwks_client.get_signing_key_from_jwt(token)
+            # Get signing key; a cold key cache fetches the JWKS over HTTP
+            signing_key = await cognito_bulkhead.run(self.jwks_client.get_signing_key_from_jwt, token)
             
             # Decode and verify token
             payload = jwt.decode(
@@ -221,6 +248,24 @@ class CognitoAuthService:
         except jwt.InvalidTokenError as e:
             raise AuthenticationException(f"Invalid token: {str(e)}")
     
+    async def warm_up(self, connections: int = 1) -> None:
+        """
+        Open pooled connections to Cognito and prefetch the JWKS.
+        
+        PyJWKClient caches the fetched key set, so the first token
+        verification afterwards needs no network round trip.
+        
+        Args:
+            connections: Concurrent DescribeUserPool calls, i.e. connections opened
+        """
+        await asyncio.gather(
+            asyncio.to_thread(self.jwks_client.get_signing_keys),
+            *(
+                cognito_bulkhead.run(self.client.describe_user_pool, UserPoolId=self.user_pool_id)
+                for _ in range(connections)
+            )
+        )
+    
     async def get_user(self, access_token: str) -> Dict[str, Any]:
         """
         Get user information using access token.
@@ -232,7 +277,7 @@ class CognitoAuthService:
             User information
         """
         try:
-            response = self.client.get_user(AccessToken=access_token)
+            response = await cognito_bulkhead.run(self.client.get_user, AccessToken=access_token)
             
             # Convert attributes to dict
             user_data = {
@@ -261,7 +306,7 @@ class CognitoAuthService:
             True if successful
         """
         try:
-            self.client.global_sign_out(AccessToken=access_token)
+            await cognito_bulkhead.run(self.client.global_sign_out, AccessToken=access_token)
             return True
             
         except ClientError as e:
@@ -287,7 +332,7 @@ class CognitoAuthService:
             if self.client_secret:
                 kwargs['SecretHash'] = self._calculate_secret_hash(email)
             
-            response = self.client.forgot_password(**kwargs)
+            response = await cognito_bulkhead.run(self.client.forgot_password, **kwargs)
             return response
             
         except ClientError as e:
@@ -318,7 +363,7 @@ class CognitoAuthService:
             if self.client_secret:
                 kwargs['SecretHash'] = self._calculate_secret_hash(email)
             
-            response = self.client.confirm_forgot_password(**kwargs)
+            response = await cognito_bulkhead.run(self.client.confirm_forgot_password, **kwargs)
             return response
             
         except ClientError as e:
@@ -0,0 +1,125 @@
+import base64
+import json
+import time
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+
+
+class CloudFrontCookieService:
+    """Issues CloudFront signed cookies for a user's private files."""
+    
+    # Prefixes a user may read through CloudFront
+    USER_PREFIXES = ("avatars", "uploads")
+    
+    def __init__(self, domain: str = None, key_pair_id: str = None,
+                 private_key_pem: str = None):
+        self.domain = domain or settings.CLOUDFRONT_DOMAIN
+        self.key_pair_id = key_pair_id or settings.CLOUDFRONT_KEY_PAIR_ID
+        self._private_key_pem = private_key_pem
+        self._private_key = None
+    
+    @property
+    def enabled(self) -> bool:
+        """Whether a distribution and key pair are configured."""
+        return bool(self.domain and self.key_pair_id and (
+            self._private_key_pem
+            or settings.CLOUDFRONT_PRIVATE_KEY
+            or settings.CLOUDFRONT_PRIVATE_KEY_PATH
+        ))
+    
+    @property
+    def private_key(self):
+        """RSA private key, loaded on first use."""
+        if self._private_key is None:
+            from cryptography.hazmat.primitives import serialization
+            
+            pem = self._private_key_pem or settings.CLOUDFRONT_PRIVATE_KEY
+            if not pem and settings.CLOUDFRONT_PRIVATE_KEY_PATH:
+                with open(settings.CLOUDFRONT_PRIVATE_KEY_PATH) as f:
+                    pem = f.read()
+            # Env vars usually carry the PEM with escaped newlines
+            pem = pem.replace("\\n", "\n")
+            self._private_key = serialization.load_pem_private_key(pem.encode(), password=None)
+        return self._private_key
+    
+    @staticmethod
+    def _url_safe_b64(data: bytes) -> str:
+        """CloudFront's base64 variant: '+' -> '-', '=' -> '_', '/' -> '~'."""
+        return base64.b64encode(data).decode().translate(str.maketrans("+=/", "-_~"))
+    
+    @staticmethod
+    def build_policy(resource: str, expires_at: int) -> str:
+        """
+        Build a custom policy document for a single resource pattern.
+        
+        Args:
+            resource: URL pattern, may end with '*'
+            expires_at: Epoch seconds after which access is denied
+        
+        Returns:
+            Compact JSON policy
+        """
+        policy = {
+            "Statement": [{
+                "Resource": resource,
+                "Condition": {"DateLessThan": {"AWS:EpochTime": expires_at}}
+            }]
+        }
+        return json.dumps(policy, separators=(",", ":"))
+    
+    def _sign(self, message: bytes) -> bytes:
+        """Sign with RSA-SHA1, the algorithm CloudFront verifies."""
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.asymmetric import padding
+        
+        return self.private_key.sign(message, padding.PKCS1v15(), hashes.SHA1())
+    
+    def get_signed_cookies(self, resource: str, expires_at: int) -> Dict[str, str]:
+        """
+        Get the three CloudFront cookies granting access to a resource pattern.
+        
+        Args:
+            resource: URL pattern, may end with '*'
+            expires_at: Epoch seconds after which access is denied
+        
+        Returns:
+            Cookie name to value mapping
+        """
+        policy = self.build_policy(resource, expires_at)
+        return {
+            "CloudFront-Policy": self._url_safe_b64(policy.encode()),
+            "CloudFront-Signature": self._url_safe_b64(self._sign(policy.encode())),
+            "CloudFront-Key-Pair-Id": self.key_pair_id,
+        }
+    
+    async def get_user_cookies(self, user_id: str, ttl: int = None) -> List[Dict[str, Any]]:
+        """
+        Get signed cookie sets covering all of a user's files.
+        
+        CloudFront custom policies hold a single statement, so each prefix
+        gets its own policy and the cookies are scoped to that prefix's path;
+        browsers then send the matching set for every object underneath.
+        
+        Args:
+            user_id: User ID
+            ttl: Cookie lifetime in seconds (defaults to CLOUDFRONT_COOKIE_TTL)
+        
+        Returns:
+            List of {'path', 'expires_at', 'cookies'} entries
+        """
+        expires_at = int(time.time()) + (ttl or settings.CLOUDFRONT_COOKIE_TTL)
+        
+        cookie_sets = []
+        for prefix in self.USER_PREFIXES:
+            path = f"/{prefix}/{user_id}/"
+            cookie_sets.append({
+                "path": path,
+                "expires_at": expires_at,
+                "cookies": self.get_signed_cookies(f"https://{self.domain}{path}*", expires_at)
+            })
+        return cookie_sets
+
+
+# Global CloudFront cookie service instance
+cloudfront_service = CloudFrontCookieService()
@@ -1,12 +1,17 @@
-import boto3
+import asyncio
+import base64
+import binascii
 from boto3.dynamodb.conditions import Key, Attr
 from botocore.exceptions import ClientError
-from typing import Dict, List, Optional, Any
+from typing import Any, AsyncIterator, Dict, List, Optional
 import json
 from decimal import Decimal
 
+from app.core.aws import aws_clients
 from app.core.config import settings
-from app.utils.cache import lru_ttl_cache
+from app.core.exceptions import InvalidCursorException
+from app.utils.cache import lru_ttl_cache, invalidate_cache_pattern
+from app.utils.bulkhead import dynamodb_bulkhead
 
 
 class DecimalEncoder(json.JSONEncoder):
@@ -17,37 +22,95 @@ class DecimalEncoder(json.JSONEncoder):
         return super(DecimalEncoder, self).default(obj)
 
 
+def item_cache_key(table_name: str, key: Dict[str, Any], projection: List[str] = None) -> str:
+    """
+    Cache key for a single item, shared by get_item and the write paths.
+    
+    Projected reads get their own suffixed entry so a partial item is never
+    served to a full-record lookup; the unsuffixed key is a prefix of all of
+    them, so writes invalidate every variant with one pattern.
+    """
+    base = f"item:{table_name}:{json.dumps(key, sort_keys=True, cls=DecimalEncoder)}"
+    return f"{base}|{','.join(sorted(projection))}" if projection else base
+
+
+def projection_kwargs(projection: List[str] = None) -> Dict[str, Any]:
+    """Build ProjectionExpression arguments, aliasing names so reserved words are safe."""
+    if not projection:
+        return {}
+    names = {f"#p{i}": attribute for i, attribute in enumerate(projection)}
+    return {
+        'ProjectionExpression': ", ".join(names),
+        'ExpressionAttributeNames': names
+    }
+
+
+def encode_cursor(last_evaluated_key: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Encode a LastEvaluatedKey as an opaque, URL-safe pagination cursor."""
+    if not last_evaluated_key:
+        return None
+    raw = json.dumps(last_evaluated_key, sort_keys=True, separators=(",", ":"), cls=DecimalEncoder)
+    return base64.urlsafe_b64encode(raw.encode()).decode("ascii")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    Decode a cursor from encode_cursor back into an ExclusiveStartKey.
+    
+    Raises:
+        InvalidCursorException: If the cursor is not one we issued
+    """
+    if not cursor:
+        return None
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, binascii.Error):
+        raise InvalidCursorException()
+    if not isinstance(key, dict) or not all(
+        isinstance(value, (str, int, float)) for value in key.values()
+    ):
+        raise InvalidCursorException()
+    return {name: Decimal(str(value)) if isinstance(value, float) else value
+            for name, value in key.items()}
+
+
 class DynamoDBService:
     """DynamoDB service with caching and best practices."""
     
-    def __init__(self):
-        session = boto3.Session(
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-            region_name=settings.AWS_REGION
-        )
-        self.dynamodb = session.resource('dynamodb')
-        self.client = session.client('dynamodb')
+    @property
+    def dynamodb(self):
+        """DynamoDB service resource, with timeouts that fit the request deadline."""
+        return aws_clients.within_deadline('resource', 'dynamodb')
+    
+    @property
+    def client(self):
+        """Low-level DynamoDB client, sharing the resource's connection pool."""
+        return self.dynamodb.meta.client
     
     def get_table(self, table_name: str):
         """Get DynamoDB table resource."""
         return self.dynamodb.Table(table_name)
     
-    @lru_ttl_cache(ttl=300)  # Cache for 5 minutes
-    async def get_item(self, table_name: str, key: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    @lru_ttl_cache(ttl=300, key_func=lambda self, table_name, key, projection=None:
+                   item_cache_key(table_name, key, projection))
+    async def get_item(self, table_name: str, key: Dict[str, Any],
+                       projection: List[str] = None) -> Optional[Dict[str, Any]]:
         """
         Get item from DynamoDB table with caching.
         
         Args:
             table_name: Name of the DynamoDB table
             key: Primary key of the item
+            projection: Attributes to fetch; all when omitted
             
         Returns:
             Item if found, None otherwise
         """
         try:
             table = self.get_table(table_name)
-            response = table.get_item(Key=key)
+            response = await dynamodb_bulkhead.run(
+                table.get_item, Key=key, **projection_kwargs(projection)
+            )
             
             if 'Item' in response:
                 # Convert Decimals to floats for JSON serialization
@@ -59,6 +122,56 @@ class DynamoDBService:
             print(f"Error getting item from {table_name}: {e}")
             raise
     
+    async def batch_get_items(self, table_name: str, keys: List[Dict[str, Any]],
+                              projection: List[str] = None,
+                              max_attempts: int = 5) -> List[Dict[str, Any]]:
+        """
+        Get many items by primary key with BatchGetItem.
+        
+        Keys are sent in chunks of 100 (the BatchGetItem limit) concurrently;
+        UnprocessedKeys from throttled chunks are retried with exponential
+        backoff. Results come back in no particular order and missing keys
+        are simply absent, so callers match items back by key.
+        
+        Args:
+            table_name: Name of the DynamoDB table
+            keys: Primary keys of the items
+            projection: Attributes to fetch (include the key attributes to
+                match items back); all when omitted
+            max_attempts: BatchGetItem calls per chunk before giving up on
+                still-unprocessed keys
+            
+        Returns:
+            Items that were found
+        """
+        async def get_chunk(chunk: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            items = []
+            request = {table_name: {'Keys': chunk, **projection_kwargs(projection)}}
+            for attempt in range(max_attempts):
+                response = await dynamodb_bulkhead.run(
+                    self.dynamodb.batch_get_item, RequestItems=request
+                )
+                items.extend(response.get('Responses', {}).get(table_name, []))
+                request = response.get('UnprocessedKeys')
+                if not request:
+                    return items
+                await asyncio.sleep(min(0.05 * 2 ** attempt, 1.0))
+            raise RuntimeError(
+                f"{len(request[table_name]['Keys'])} keys still unprocessed after {max_attempts} attempts"
+            )
+        
+        try:
+            chunks = [keys[i:i + 100] for i in range(0, len(keys), 100)]
+            results = await asyncio.gather(*(get_chunk(chunk) for chunk in chunks))
+            # Convert Decimals to floats for JSON serialization
+            return json.loads(json.dumps(
+                [item for chunk_items in results for item in chunk_items], cls=DecimalEncoder
+            ))
+            
+        except ClientError as e:
+            print(f"Error batch getting items from {table_name}: {e}")
+            raise
+    
     async def put_item(self, table_name: str, item: Dict[str, Any]) -> bool:
         """
         Put item into DynamoDB table.
@@ -72,7 +185,9 @@ class DynamoDBService:
         """
         try:
             table = self.get_table(table_name)
-            table.put_item(Item=item)
+            await dynamodb_bulkhead.run(table.put_item, Item=item)
+            # The key schema isn't known here, so drop every cached item of the table
+            await invalidate_cache_pattern(f"item:{table_name}:")
             return True
             
         except ClientError as e:
@@ -81,7 +196,8 @@ class DynamoDBService:
     
     async def update_item(self, table_name: str, key: Dict[str, Any], 
                          update_expression: str, expression_attribute_values: Dict[str, Any],
-                         expression_attribute_names: Dict[str, str] = None) -> Dict[str, Any]:
+                         expression_attribute_names: Dict[str, str] = None,
+                         condition_expression: str = None) -> Dict[str, Any]:
         """
         Update item in DynamoDB table.
         
@@ -91,6 +207,7 @@ class DynamoDBService:
             update_expression: DynamoDB update expression
             expression_attribute_values: Values for the update expression
             expression_attribute_names: Names for the update expression
+            condition_expression: Optional condition the item must satisfy
             
         Returns:
             Updated item attributes
@@ -107,28 +224,41 @@ class DynamoDBService:
             
             if expression_attribute_names:
                 kwargs['ExpressionAttributeNames'] = expression_attribute_names
+            if condition_expression:
+                kwargs['ConditionExpression'] = condition_expression
             
-            response = table.update_item(**kwargs)
+            response = await dynamodb_bulkhead.run(table.update_item, **kwargs)
+            await invalidate_cache_pattern(item_cache_key(table_name, key))
             return json.loads(json.dumps(response['Attributes'], cls=DecimalEncoder))
             
         except ClientError as e:
             print(f"Error updating item in {table_name}: {e}")
             raise
     
-    async def delete_item(self, table_name: str, key: Dict[str, Any]) -> bool:
+    async def delete_item(self, table_name: str, key: Dict[str, Any],
+                         condition_expression: str = None,
+                         expression_attribute_values: Dict[str, Any] = None) -> bool:
         """
         Delete item from DynamoDB table.
         
         Args:
             table_name: Name of the DynamoDB table
             key: Primary key of the item to delete
+            condition_expression: Optional condition the item must satisfy
+            expression_attribute_values: Values for the condition expression
             
         Returns:
             True if successful
         """
         try:
             table = self.get_table(table_name)
-            table.delete_item(Key=key)
+            kwargs = {'Key': key}
+            if condition_expression:
+                kwargs['ConditionExpression'] = condition_expression
+            if expression_attribute_values:
+                kwargs['ExpressionAttributeValues'] = expression_attribute_values
+            await dynamodb_bulkhead.run(table.delete_item, **kwargs)
+            await invalidate_cache_pattern(item_cache_key(table_name, key))
             return True
             
         except ClientError as e:
@@ -137,7 +267,8 @@ class DynamoDBService:
     
     @lru_ttl_cache(ttl=60)  # Cache for 1 minute
     async def query_items(self, table_name: str, key_condition_expression,
-                         filter_expression=None, limit: int = None) -> List[Dict[str, Any]]:
+                         filter_expression=None, limit: int = None,
+                         index_name: str = None) -> List[Dict[str, Any]]:
         """
         Query items from DynamoDB table with caching.
         
@@ -146,6 +277,7 @@ class DynamoDBService:
             key_condition_expression: Query condition
             filter_expression: Optional filter expression
             limit: Maximum number of items to return
+            index_name: Secondary index to query instead of the table
             
         Returns:
             List of items
@@ -155,12 +287,14 @@ class DynamoDBService:
             
             kwargs = {'KeyConditionExpression': key_condition_expression}
             
+            if index_name:
+                kwargs['IndexName'] = index_name
             if filter_expression:
                 kwargs['FilterExpression'] = filter_expression
             if limit:
                 kwargs['Limit'] = limit
             
-            response = table.query(**kwargs)
+            response = await dynamodb_bulkhead.run(table.query, **kwargs)
             items = response.get('Items', [])
             
             # Convert Decimals to floats
@@ -170,6 +304,149 @@ class DynamoDBService:
             print(f"Error querying {table_name}: {e}")
             raise
     
+    async def query_page(self, table_name: str, key_condition_expression, limit: int,
+                         exclusive_start_key: Dict[str, Any] = None,
+                         index_name: str = None) -> Dict[str, Any]:
+        """
+        Query one page of items, uncached so cursors always line up with the table.
+        
+        Args:
+            table_name: Name of the DynamoDB table
+            key_condition_expression: Query condition
+            limit: Maximum number of items to read
+            exclusive_start_key: LastEvaluatedKey of the previous page
+            index_name: Secondary index to query instead of the table
+            
+        Returns:
+            {'items': [...], 'last_evaluated_key': key of the next page or None}
+        """
+        table = self.get_table(table_name)
+        
+        kwargs = {'KeyConditionExpression': key_condition_expression, 'Limit': limit}
+        if index_name:
+            kwargs['IndexName'] = index_name
+        if exclusive_start_key:
+            kwargs['ExclusiveStartKey'] = exclusive_start_key
+        
+        try:
+            response = await dynamodb_bulkhead.run(table.query, **kwargs)
+        except ClientError as e:
+            print(f"Error querying {table_name}: {e}")
+            raise
+        
+        return {
+            'items': [json.loads(json.dumps(item, cls=DecimalEncoder)) for item in response.get('Items', [])],
+            'last_evaluated_key': response.get('LastEvaluatedKey')
+        }
+    
+    async def count_items(self, table_name: str, key_condition_expression,
+                          filter_expression=None, index_name: str = None) -> int:
+        """
+        Count items matching a query without returning them.
+        
+        Args:
+            table_name: Name of the DynamoDB table
+            key_condition_expression: Query condition
+            filter_expression: Optional filter expression
+            index_name: Secondary index to query instead of the table
+            
+        Returns:
+            Number of matching items
+        """
+        try:
+            table = self.get_table(table_name)
+            
+            kwargs = {'KeyConditionExpression': key_condition_expression, 'Select': 'COUNT'}
+            if index_name:
+                kwargs['IndexName'] = index_name
+            if filter_expression:
+                kwargs['FilterExpression'] = filter_expression
+            
+            count = 0
+            while True:
+                response = await dynamodb_bulkhead.run(table.query, **kwargs)
+                count += response['Count']
+                if 'LastEvaluatedKey' not in response:
+                    return count
+                kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+            
+        except ClientError as e:
+            print(f"Error counting items in {table_name}: {e}")
+            raise
+    
+    async def get_item_count(self, table_name: str) -> int:
+        """
+        Get the approximate item count DynamoDB maintains for a table.
+        
+        The figure is refreshed roughly every six hours but costs no reads.
+        
+        Args:
+            table_name: Name of the DynamoDB table
+            
+        Returns:
+            Approximate number of items
+        """
+        try:
+            response = await dynamodb_bulkhead.run(self.client.describe_table, TableName=table_name)
+            return response['Table']['ItemCount']
+            
+        except ClientError as e:
+            print(f"Error describing {table_name}: {e}")
+            raise
+    
+    async def warm_up(self, table_names: List[str], connections: int = 1) -> None:
+        """
+        Open pooled connections to DynamoDB before the first request needs one.
+        
+        Args:
+            table_names: Tables to describe (also verifies they exist)
+            connections: Concurrent calls per table, i.e. connections opened
+        """
+        await asyncio.gather(*(
+            dynamodb_bulkhead.run(self.client.describe_table, TableName=table_name)
+            for table_name in table_names
+            for _ in range(connections)
+        ))
+    
+    async def iter_scan(self, table_name: str, filter_expression=None,
+                        projection_expression: str = None,
+                        expression_attribute_names: Dict[str, str] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Scan a whole table page by page, yielding items as they arrive.
+        
+        Args:
+            table_name: Name of the DynamoDB table
+            filter_expression: Optional filter expression
+            projection_expression: Optional attributes to return
+            expression_attribute_names: Names for the projection expression
+            
+        Yields:
+            Items
+        """
+        table = self.get_table(table_name)
+        
+        kwargs = {}
+        if filter_expression:
+            kwargs['FilterExpression'] = filter_expression
+        if projection_expression:
+            kwargs['ProjectionExpression'] = projection_expression
+        if expression_attribute_names:
+            kwargs['ExpressionAttributeNames'] = expression_attribute_names
+        
+        while True:
+            try:
+                response = await dynamodb_bulkhead.run(table.scan, **kwargs)
+            except ClientError as e:
+                print(f"Error scanning {table_name}: {e}")
+                raise
+            
+            for item in response.get('Items', []):
+                yield json.loads(json.dumps(item, cls=DecimalEncoder))
+            
+            if 'LastEvaluatedKey' not in response:
+                return
+            kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+    
     @lru_ttl_cache(ttl=300)  # Cache for 5 minutes
     async def scan_table(self, table_name: str, filter_expression=None, 
                         limit: int = None) -> List[Dict[str, Any]]:
@@ -193,7 +470,7 @@ class DynamoDBService:
             if limit:
                 kwargs['Limit'] = limit
             
-            response = table.scan(**kwargs)
+            response = await dynamodb_bulkhead.run(table.scan, **kwargs)
             items = response.get('Items', [])
             
             # Convert Decimals to floats
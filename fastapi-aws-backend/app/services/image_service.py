@@ -0,0 +1,113 @@
+import hashlib
+import io
+from typing import Dict, List, Union
+
+from app.core.config import settings
+from app.core.exceptions import InvalidFileException
+from app.services.s3_service import s3_service
+from app.utils.executors import run_in_process
+from app.utils.orchestration import run_concurrently
+
+# Derivative format name -> (Pillow format, MIME type, file extension)
+AVATAR_FORMATS = {
+    "webp": ("WEBP", "image/webp", "webp"),
+    "jpeg": ("JPEG", "image/jpeg", "jpg"),
+}
+
+
+def render_avatar_derivatives(source: Union[bytes, str], sizes: List[int],
+                              quality: int) -> Dict[int, Dict[str, bytes]]:
+    """
+    Decode an image once and render square avatars at each size.
+    
+    Runs in a worker process, so it must stay a picklable module-level
+    function. Output is re-encoded from pixels only, which strips EXIF
+    (after applying its orientation) and any other embedded metadata.
+    
+    Args:
+        source: Original image bytes, or the path of a file holding them
+        sizes: Edge lengths in pixels
+        quality: Encoder quality for lossy formats
+    
+    Returns:
+        Mapping of size -> format name -> encoded bytes
+    """
+    from PIL import Image, ImageOps
+    
+    largest = max(sizes)
+    with Image.open(io.BytesIO(source) if isinstance(source, bytes) else source) as image:
+        # Let the JPEG decoder downscale while decoding when it can
+        image.draft("RGB", (largest, largest))
+        image = ImageOps.exif_transpose(image).convert("RGB")
+    
+    # Crop to a centred square once, then downscale from it for each size
+    square = ImageOps.fit(image, (largest, largest), Image.LANCZOS)
+    
+    rendered: Dict[int, Dict[str, bytes]] = {}
+    for size in sizes:
+        resized = square if size == largest else square.resize((size, size), Image.LANCZOS)
+        rendered[size] = {}
+        for name, (pil_format, _, _) in AVATAR_FORMATS.items():
+            buffer = io.BytesIO()
+            resized.save(buffer, format=pil_format, quality=quality, optimize=True)
+            rendered[size][name] = buffer.getvalue()
+    
+    return rendered
+
+
+class ImageService:
+    """Image processing service for avatar derivatives."""
+    
+    async def create_avatar_derivatives(self, user_id: str, source: Union[bytes, str],
+                                        digest: str = None) -> Dict[str, Dict[str, str]]:
+        """
+        Render avatar derivatives off the event loop and upload them concurrently.
+        
+        Keys include a content hash of the original, so a new avatar never
+        reuses URLs that browsers and CDNs cached for the previous one.
+        
+        Args:
+            user_id: Owner of the avatar
+            source: Original image bytes, or the path of a spooled copy; a
+                path keeps the image out of this process's memory
+            digest: SHA-256 hex digest of the original (required for a path)
+        
+        Returns:
+            Mapping of size -> format name -> S3 key
+        """
+        try:
+            rendered = await run_in_process(
+                render_avatar_derivatives, source, settings.AVATAR_SIZES, settings.AVATAR_QUALITY
+            )
+        except Exception as e:
+            raise InvalidFileException(f"Could not process image: {e}")
+        
+        version = (digest or hashlib.sha256(source).hexdigest())[:12]
+        variants: Dict[str, Dict[str, str]] = {}
+        uploads = []
+        
+        for size, encoded in rendered.items():
+            for name, body in encoded.items():
+                _, content_type, extension = AVATAR_FORMATS[name]
+                key = f"avatars/{user_id}/{version}/{size}.{extension}"
+                variants.setdefault(str(size), {})[name] = key
+                uploads.append(s3_service.upload_file(
+                    io.BytesIO(body),
+                    key=key,
+                    content_type=content_type,
+                    metadata={"user_id": user_id}
+                ))
+        
+        try:
+            await run_concurrently(*uploads)
+        except Exception:
+            # Drop whichever derivatives made it before the failure
+            await s3_service.delete_files(
+                [key for formats in variants.values() for key in formats.values()]
+            )
+            raise
+        return variants
+
+
+# Global image service instance
+image_service = ImageService()
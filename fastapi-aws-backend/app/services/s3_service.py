@@ -1,43 +1,89 @@
-import boto3
+import asyncio
+import hashlib
+import tempfile
+import time
 from botocore.exceptions import ClientError, NoCredentialsError
-from typing import Optional, Dict, Any, BinaryIO
+from typing import Optional, Dict, Any, AsyncIterator, BinaryIO, NamedTuple, Tuple
 import uuid
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
 from typing import List
 from app.models.file import FileUploadResponse, FileMetadata, PresignedUrlRequest, PresignedUrlResponse
 from typing import Dict
 
+from app.core.aws import aws_clients
 from app.core.config import settings
-from app.utils.cache import lru_ttl_cache
+from app.core.exceptions import RangeNotSatisfiableException
+from app.utils.cache import cache, lru_ttl_cache, invalidate_cache_pattern, invalidate_cache_patterns
+from app.utils.bulkhead import s3_bulkhead
+from app.utils.orchestration import run_concurrently
+from app.services.dynamodb_service import dynamodb_service
+
+
+class S3Object(NamedTuple):
+    """Lightweight record for a listed S3 object."""
+    key: str
+    size: int
+    last_modified: datetime
+    etag: str
+    
+    @classmethod
+    def from_listing(cls, obj: Dict[str, Any]) -> "S3Object":
+        """Build a record from a list_objects_v2 ``Contents`` entry."""
+        return cls(obj['Key'], obj['Size'], obj['LastModified'], obj['ETag'].strip('"'))
+
+
+class S3Download(NamedTuple):
+    """Status, response headers and chunk stream for a proxied download."""
+    status_code: int
+    headers: Dict[str, str]
+    body: Optional[AsyncIterator[bytes]]
 
 
 class S3Service:
     """S3 service for file operations with caching and best practices."""
     
+    # Object headers a copy must re-send when it does not copy metadata as-is
+    COPIED_HEADERS = ('ContentType', 'CacheControl', 'ContentDisposition',
+                      'ContentEncoding', 'ContentLanguage', 'Expires',
+                      'WebsiteRedirectLocation', 'ServerSideEncryption',
+                      'SSEKMSKeyId', 'BucketKeyEnabled', 'StorageClass')
+    
+    # S3 rejects multipart uploads with more parts than this
+    MULTIPART_MAX_PARTS = 10000
+    
     def __init__(self):
-        session = boto3.Session(
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-            region_name=settings.S3_REGION
-        )
-        self.s3_client = session.client('s3')
-        self.s3_resource = session.resource('s3')
         self.bucket_name = settings.S3_BUCKET_NAME
     
+    @property
+    def s3_client(self):
+        """Low-level S3 client, with timeouts that fit the request deadline."""
+        return aws_clients.within_deadline('client', 's3', region_name=settings.S3_REGION)
+    
+    @property
+    def s3_resource(self):
+        """S3 service resource, with timeouts that fit the request deadline."""
+        return aws_clients.within_deadline('resource', 's3', region_name=settings.S3_REGION)
+    
     async def upload_file(self, file_obj: BinaryIO, key: str = None, 
-                         content_type: str = None, metadata: Dict[str, str] = None) -> str:
+                         content_type: str = None, metadata: Dict[str, str] = None,
+                         deduplicate: bool = False) -> str:
         """
         Upload file to S3.
         
         Args:
             file_obj: File object to upload
-            key: S3 object key (if None, generates UUID)
+            key: S3 object key (if None, generates UUID; ignored when deduplicating)
             content_type: MIME type of the file
             metadata: Additional metadata for the file
+            deduplicate: Store by content hash and skip the PUT if it already exists
             
         Returns:
             S3 object key
         """
+        if deduplicate:
+            return await self._upload_deduplicated(file_obj, content_type, metadata)
+        
         try:
             if key is None:
                 key = f"uploads/{uuid.uuid4()}"
@@ -51,7 +97,8 @@ class S3Service:
             # Add cache control headers
             extra_args['CacheControl'] = 'max-age=31536000'  # 1 year
             
-            self.s3_client.upload_fileobj(
+            await s3_bulkhead.run(
+                self.s3_client.upload_fileobj,
                 file_obj,
                 self.bucket_name,
                 key,
@@ -64,6 +111,292 @@ class S3Service:
             print(f"Error uploading file to S3: {e}")
             raise
     
+    def _hash_and_spool(self, file_obj: BinaryIO) -> Tuple[str, int, BinaryIO]:
+        """
+        SHA-256 a file in one pass, keeping a readable copy for the PUT.
+        
+        Seekable files are rewound rather than copied; anything else is
+        spooled to memory, then disk past S3_DEDUP_SPOOL_SIZE.
+        """
+        digest = hashlib.sha256()
+        size = 0
+        chunk_size = settings.UPLOAD_CHUNK_SIZE
+        
+        seekable = file_obj.seekable() if hasattr(file_obj, 'seekable') else False
+        start = file_obj.tell() if seekable else 0
+        spool = None if seekable else tempfile.SpooledTemporaryFile(max_size=settings.S3_DEDUP_SPOOL_SIZE)
+        
+        while True:
+            chunk = file_obj.read(chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+            size += len(chunk)
+            if spool is not None:
+                spool.write(chunk)
+        
+        body = file_obj if spool is None else spool
+        body.seek(start if spool is None else 0)
+        return digest.hexdigest(), size, body
+    
+    async def _upload_deduplicated(self, file_obj: BinaryIO, content_type: str = None,
+                                   metadata: Dict[str, str] = None) -> str:
+        """
+        Upload content-addressed, skipping the PUT when the content already exists.
+        
+        Each upload claims a reference on the digest's index entry. The PUT
+        is skipped only once a previous upload has marked the blob stored,
+        so racing first uploads both write (identical bytes) rather than
+        one returning a key that is not there yet.
+        
+        Args:
+            file_obj: File object to upload
+            content_type: MIME type of the file
+            metadata: Additional metadata for the file
+            
+        Returns:
+            Content-addressed S3 object key
+        """
+        digest, size, body = await asyncio.to_thread(self._hash_and_spool, file_obj)
+        key = f"{settings.S3_BLOB_PREFIX}/{digest}"
+        
+        try:
+            blob = await dynamodb_service.update_item(
+                settings.BLOBS_TABLE_NAME,
+                {'digest': digest},
+                "ADD ref_count :one SET #size = :size, content_type = if_not_exists(content_type, :ct), "
+                "created_at = if_not_exists(created_at, :now)",
+                {
+                    ':one': 1,
+                    ':size': size,
+                    ':ct': content_type or 'application/octet-stream',
+                    ':now': datetime.utcnow().isoformat()
+                },
+                {'#size': 'size'}
+            )
+            
+            if blob.get('is_stored'):
+                return key
+            
+            try:
+                await self.upload_file(body, key=key, content_type=content_type, metadata=metadata)
+            except Exception:
+                await self._release_blob(digest)
+                raise
+            
+            await dynamodb_service.update_item(
+                settings.BLOBS_TABLE_NAME,
+                {'digest': digest},
+                "SET is_stored = :true",
+                {':true': True}
+            )
+            return key
+        finally:
+            if body is not file_obj:
+                body.close()
+    
+    async def _release_blob(self, digest: str) -> None:
+        """
+        Drop one reference to a blob, deleting it with the last one.
+        
+        Args:
+            digest: SHA-256 hex digest of the content
+        """
+        try:
+            blob = await dynamodb_service.update_item(
+                settings.BLOBS_TABLE_NAME,
+                {'digest': digest},
+                "ADD ref_count :minus_one",
+                {':minus_one': -1, ':zero': 0},
+                condition_expression="ref_count > :zero"
+            )
+        except ClientError as e:
+            # Already released (a retry or double delete): nothing left to drop
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                return
+            raise
+        if blob['ref_count'] > 0:
+            return
+        
+        # Remove the index entry first, and only if nobody re-referenced it,
+        # so later uploads of the same content re-create it and PUT again.
+        # An upload landing between the two deletes below can still lose its
+        # object; the window is a single DeleteObject call.
+        try:
+            await dynamodb_service.delete_item(
+                settings.BLOBS_TABLE_NAME,
+                {'digest': digest},
+                condition_expression="ref_count = :zero",
+                expression_attribute_values={':zero': 0}
+            )
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                return
+            raise
+        
+        await s3_bulkhead.run(
+            self.s3_client.delete_object,
+            Bucket=self.bucket_name,
+            Key=f"{settings.S3_BLOB_PREFIX}/{digest}"
+        )
+    
+    async def warm_up(self, connections: int = 1) -> None:
+        """
+        Open pooled connections to S3 before the first request needs one.
+        
+        Args:
+            connections: Concurrent HeadBucket calls, i.e. connections opened
+        """
+        await asyncio.gather(*(
+            s3_bulkhead.run(self.s3_client.head_bucket, Bucket=self.bucket_name)
+            for _ in range(connections)
+        ))
+    
+    async def get_dedup_stats(self) -> Dict[str, Any]:
+        """
+        Get content-addressed storage statistics.
+        
+        Reads the whole blob index uncached, page by page, so the numbers
+        reflect every upload up to the call.
+        
+        Returns:
+            Blob count, stored and logical bytes, and bytes saved by deduplication
+        """
+        blobs = references = stored_bytes = logical_bytes = 0
+        async for blob in dynamodb_service.iter_scan(settings.BLOBS_TABLE_NAME):
+            blobs += 1
+            references += blob['ref_count']
+            if blob.get('is_stored'):
+                stored_bytes += blob['size']
+                logical_bytes += blob['size'] * blob['ref_count']
+        
+        return {
+            'blobs': blobs,
+            'references': int(references),
+            'stored_bytes': int(stored_bytes),
+            'logical_bytes': int(logical_bytes),
+            'bytes_saved': int(logical_bytes - stored_bytes)
+        }
+    
+    async def upload_stream(self, chunks: AsyncIterator[bytes], key: str,
+                            content_type: str = None, metadata: Dict[str, str] = None,
+                            part_size: int = None, max_concurrency: int = None) -> Dict[str, Any]:
+        """
+        Upload a chunk stream to S3 as a concurrent multipart upload.
+        
+        Chunks are re-sliced into parts of part_size and up to
+        max_concurrency parts are uploaded at once, so peak memory is about
+        (max_concurrency + 1) * part_size regardless of the stream length.
+        Streams that fit in a single part use one PutObject instead.
+        
+        Args:
+            chunks: Async iterator of file content
+            key: S3 object key
+            content_type: MIME type of the file
+            metadata: Additional metadata for the file
+            part_size: Multipart part size in bytes (defaults to S3_MULTIPART_PART_SIZE)
+            max_concurrency: Parts in flight (defaults to S3_MULTIPART_CONCURRENCY)
+        
+        Returns:
+            Dict with the object key and total size in bytes
+        """
+        part_size = part_size or settings.S3_MULTIPART_PART_SIZE
+        slots = asyncio.Semaphore(max_concurrency or settings.S3_MULTIPART_CONCURRENCY)
+        
+        extra_args = {'CacheControl': 'max-age=31536000'}  # 1 year
+        if content_type:
+            extra_args['ContentType'] = content_type
+        if metadata:
+            extra_args['Metadata'] = metadata
+        
+        buffer = bytearray()
+        size = 0
+        upload_id = None
+        tasks: List[asyncio.Task] = []
+        
+        async def upload_part(part_number: int, body: bytes) -> Dict[str, Any]:
+            try:
+                response = await s3_bulkhead.run(
+                    self.s3_client.upload_part,
+                    Bucket=self.bucket_name,
+                    Key=key,
+                    UploadId=upload_id,
+                    PartNumber=part_number,
+                    Body=body
+                )
+                return {'PartNumber': part_number, 'ETag': response['ETag']}
+            finally:
+                slots.release()
+        
+        async def submit_part(body: bytes) -> None:
+            # Waiting for a free slot is what bounds memory
+            await slots.acquire()
+            tasks.append(asyncio.create_task(upload_part(len(tasks) + 1, body)))
+        
+        try:
+            async for chunk in chunks:
+                buffer += chunk
+                size += len(chunk)
+                # Strictly greater: keeps the final part non-empty
+                while len(buffer) > part_size:
+                    if upload_id is None:
+                        response = await s3_bulkhead.run(
+                            self.s3_client.create_multipart_upload,
+                            Bucket=self.bucket_name,
+                            Key=key,
+                            **extra_args
+                        )
+                        upload_id = response['UploadId']
+                    
+                    body = bytes(buffer[:part_size])
+                    del buffer[:part_size]
+                    await submit_part(body)
+            
+            if upload_id is None:
+                await s3_bulkhead.run(
+                    self.s3_client.put_object,
+                    Bucket=self.bucket_name,
+                    Key=key,
+                    Body=bytes(buffer),
+                    **extra_args
+                )
+                return {'key': key, 'size': size}
+            
+            await submit_part(bytes(buffer))
+            buffer.clear()
+            parts = await asyncio.gather(*tasks)
+            
+            await s3_bulkhead.run(
+                self.s3_client.complete_multipart_upload,
+                Bucket=self.bucket_name,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={'Parts': parts}
+            )
+            return {'key': key, 'size': size}
+        
+        except BaseException as e:
+            for task in tasks:
+                task.cancel()
+            if upload_id is not None:
+                await asyncio.shield(self._abort_multipart_upload(key, upload_id))
+            if isinstance(e, (ClientError, NoCredentialsError)):
+                print(f"Error streaming file to S3: {e}")
+            raise
+    
+    async def _abort_multipart_upload(self, key: str, upload_id: str) -> None:
+        """Abort a multipart upload so its parts stop accruing storage."""
+        try:
+            await s3_bulkhead.run(
+                self.s3_client.abort_multipart_upload,
+                Bucket=self.bucket_name,
+                Key=key,
+                UploadId=upload_id
+            )
+        except ClientError as e:
+            # The bucket lifecycle rule cleans up anything left behind
+            print(f"Error aborting multipart upload {upload_id}: {e}")
+    
     async def download_file(self, key: str) -> bytes:
         """
         Download file from S3.
@@ -75,14 +408,95 @@ class S3Service:
             File content as bytes
         """
         try:
-            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=key)
-            return response['Body'].read()
+            def _read_object() -> bytes:
+                # Body.read() blocks on the network, so keep it in the bulkhead too
+                response = self.s3_client.get_object(Bucket=self.bucket_name, Key=key)
+                return response['Body'].read()
+            
+            return await s3_bulkhead.run(_read_object)
             
         except ClientError as e:
             print(f"Error listing files in S3: {e}")
             raise
-
-
+    
+    async def open_download(self, key: str, range_header: str = None,
+                            if_none_match: str = None, if_modified_since: str = None,
+                            chunk_size: int = None) -> Optional[S3Download]:
+        """
+        Open a streaming download, passing HTTP range and conditional headers to S3.
+        
+        The body is read from the botocore stream one chunk at a time, so
+        memory use does not depend on object size. S3 evaluates the
+        conditions itself and answers 304 without sending the object.
+        
+        Args:
+            key: S3 object key
+            range_header: HTTP Range header value (e.g. 'bytes=0-1023')
+            if_none_match: HTTP If-None-Match header value
+            if_modified_since: HTTP If-Modified-Since header value
+            chunk_size: Bytes per yielded chunk
+            
+        Returns:
+            S3Download with status code, headers and body iterator (None for
+            304), or None if the object does not exist
+            
+        Raises:
+            RangeNotSatisfiableException: If the range lies outside the object
+        """
+        params = {'Bucket': self.bucket_name, 'Key': key}
+        if range_header:
+            params['Range'] = range_header
+        if if_none_match:
+            params['IfNoneMatch'] = if_none_match
+        if if_modified_since:
+            try:
+                params['IfModifiedSince'] = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                pass  # Invalid dates are ignored, as HTTP requires
+        
+        try:
+            response = await s3_bulkhead.run(self.s3_client.get_object, **params)
+        except ClientError as e:
+            error = e.response.get('Error', {})
+            status_code = e.response.get('ResponseMetadata', {}).get('HTTPStatusCode')
+            if status_code == 304:
+                etag = e.response['ResponseMetadata'].get('HTTPHeaders', {}).get('etag')
+                return S3Download(304, {'ETag': etag} if etag else {}, None)
+            if error.get('Code') in ('NoSuchKey', '404'):
+                return None
+            if error.get('Code') == 'InvalidRange':
+                size = error.get('ActualObjectSize')
+                raise RangeNotSatisfiableException(int(size) if size else None)
+            print(f"Error downloading file from S3: {e}")
+            raise
+        
+        headers = {
+            'Accept-Ranges': 'bytes',
+            'Content-Length': str(response['ContentLength']),
+            'ETag': response['ETag'],
+            'Last-Modified': format_datetime(response['LastModified'].astimezone(timezone.utc), usegmt=True),
+        }
+        if response.get('ContentType'):
+            headers['Content-Type'] = response['ContentType']
+        if response.get('ContentRange'):
+            headers['Content-Range'] = response['ContentRange']
+        
+        status_code = 206 if 'Content-Range' in headers else 200
+        body = self._iter_body(response['Body'], chunk_size or settings.S3_DOWNLOAD_CHUNK_SIZE)
+        return S3Download(status_code, headers, body)
+    
+    async def _iter_body(self, body, chunk_size: int) -> AsyncIterator[bytes]:
+        """Yield chunks from a botocore stream, reading off the event loop."""
+        try:
+            while True:
+                chunk = await s3_bulkhead.run(body.read, chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+        finally:
+            # Release the connection even if the client disconnects mid-stream
+            body.close()
+    
     async def delete_file(self, key: str) -> bool:
         """
         Delete file from S3.
@@ -94,14 +508,71 @@ class S3Service:
             True if successful
         """
         try:
-            self.s3_client.delete_object(Bucket=self.bucket_name, Key=key)
+            blob_prefix = f"{settings.S3_BLOB_PREFIX}/"
+            if key.startswith(blob_prefix):
+                # Content-addressed blobs are shared, so only drop this reference
+                await self._release_blob(key[len(blob_prefix):])
+            else:
+                await s3_bulkhead.run(self.s3_client.delete_object, Bucket=self.bucket_name, Key=key)
+            await invalidate_cache_pattern(f":{key}")
             return True
             
         except ClientError as e:
             print(f"Error deleting file from S3: {e}")
             raise
     
-    @lru_ttl_cache(ttl=300)  # Cache for 5 minutes
+    async def delete_files(self, keys: List[str], batch_size: int = None,
+                           max_concurrency: int = None) -> Dict[str, Any]:
+        """
+        Delete many files with batched DeleteObjects calls.
+        
+        Batches run concurrently. DeleteObjects reports failures per key
+        rather than failing the request, so errors are collected and
+        returned instead of raised.
+        
+        Args:
+            keys: S3 object keys
+            batch_size: Keys per DeleteObjects call (S3 caps this at 1000)
+            max_concurrency: DeleteObjects calls in flight
+            
+        Returns:
+            {'deleted': count, 'errors': [{'key', 'code', 'message'}]}
+        """
+        batch_size = batch_size or settings.S3_DELETE_BATCH_SIZE
+        semaphore = asyncio.Semaphore(max_concurrency or settings.S3_DELETE_CONCURRENCY)
+        
+        async def delete_batch(batch: List[str]) -> List[Dict[str, str]]:
+            async with semaphore:
+                try:
+                    response = await s3_bulkhead.run(
+                        self.s3_client.delete_objects,
+                        Bucket=self.bucket_name,
+                        # Quiet mode only reports the keys that failed
+                        Delete={'Objects': [{'Key': key} for key in batch], 'Quiet': True}
+                    )
+                except ClientError as e:
+                    print(f"Error deleting files from S3: {e}")
+                    error = e.response.get('Error', {})
+                    return [
+                        {'key': key, 'code': error.get('Code', ''), 'message': error.get('Message', str(e))}
+                        for key in batch
+                    ]
+                
+                return [
+                    {'key': err['Key'], 'code': err.get('Code', ''), 'message': err.get('Message', '')}
+                    for err in response.get('Errors', [])
+                ]
+        
+        batches = [keys[i:i + batch_size] for i in range(0, len(keys), batch_size)]
+        results = await asyncio.gather(*(delete_batch(batch) for batch in batches))
+        errors = [error for batch_errors in results for error in batch_errors]
+        
+        failed = {error['key'] for error in errors}
+        await invalidate_cache_patterns(f":{key}" for key in keys if key not in failed)
+        
+        return {'deleted': len(keys) - len(failed), 'errors': errors}
+    
+    @lru_ttl_cache(ttl=300, key_func=lambda self, key: f"file_metadata:{key}")  # found by the ":{key}" invalidations
     async def get_file_metadata(self, key: str) -> Optional[Dict[str, Any]]:
         """
         Get file metadata from S3 with caching.
@@ -113,7 +584,7 @@ class S3Service:
             File metadata or None if not found
         """
         try:
-            response = self.s3_client.head_object(Bucket=self.bucket_name, Key=key)
+            response = await s3_bulkhead.run(self.s3_client.head_object, Bucket=self.bucket_name, Key=key)
             return {
                 'size': response['ContentLength'],
                 'last_modified': response['LastModified'],
@@ -141,55 +612,338 @@ class S3Service:
         Returns:
             Presigned URL
         """
+        url, _ = await self.get_presigned_url(key, expiration, method)
+        return url
+    
+    async def get_presigned_url(self, key: str, expiration: int = 3600,
+                                method: str = 'get_object') -> Tuple[str, int]:
+        """
+        Get a presigned URL, reusing a previously signed one when possible.
+        
+        A signed URL is handed out again while at least
+        PRESIGNED_URL_REUSE_FRACTION of its lifetime remains. Identical URLs
+        let browsers and CDNs cache the object instead of refetching it.
+        
+        Args:
+            key: S3 object key
+            expiration: Requested URL lifetime in seconds
+            method: S3 operation (get_object, put_object, etc.)
+            
+        Returns:
+            Tuple of (url, seconds until the URL expires)
+        """
+        cache_key = f"presigned:{method}:{expiration}:{key}"
+        cached = await cache.get(cache_key)
+        if cached is not None:
+            return cached['url'], int(cached['expires_at'] - time.time())
+        
         try:
             params = {'Bucket': self.bucket_name, 'Key': key}
             
+            # Signing is local CPU work, no need to go through the bulkhead
             url = self.s3_client.generate_presigned_url(
                 method,
                 Params=params,
                 ExpiresIn=expiration
             )
             
-            return url
-            
         except ClientError as e:
             print(f"Error generating presigned URL: {e}")
             raise
+        
+        # Evict once less than the reuse fraction of the lifetime is left
+        reuse_ttl = int(expiration * (1 - settings.PRESIGNED_URL_REUSE_FRACTION))
+        if reuse_ttl > 0:
+            await cache.set(
+                cache_key,
+                {'url': url, 'expires_at': time.time() + expiration},
+                ttl=reuse_ttl
+            )
+        
+        return url, expiration
+    
+    async def generate_presigned_post(self, key_prefix: str, content_type: str,
+                                      max_size: int, expiration: int = 900) -> Dict[str, Any]:
+        """
+        Generate a presigned POST policy for direct browser-to-S3 uploads.
+        
+        The policy pins the Content-Type, limits the body with
+        content-length-range and only allows keys under key_prefix; the
+        client fills in the filename via S3's ${filename} substitution.
+        
+        Args:
+            key_prefix: Key prefix the upload must land under (ends with '/')
+            content_type: Exact Content-Type the upload must declare
+            max_size: Maximum object size in bytes
+            expiration: Policy lifetime in seconds
+        
+        Returns:
+            Dict with the form 'url' and the 'fields' to post with the file
+        """
+        try:
+            conditions = [
+                ["content-length-range", 1, max_size],
+                {"Content-Type": content_type},
+                ["starts-with", "$key", key_prefix],
+            ]
+            
+            return self.s3_client.generate_presigned_post(
+                self.bucket_name,
+                f"{key_prefix}${{filename}}",
+                Fields={"Content-Type": content_type},
+                Conditions=conditions,
+                ExpiresIn=expiration
+            )
+        
+        except ClientError as e:
+            print(f"Error generating presigned POST: {e}")
+            raise
     
     async def copy_file(self, source_key: str, destination_key: str, 
-                       metadata: Dict[str, str] = None) -> bool:
+                       metadata: Dict[str, str] = None, part_size: int = None,
+                       max_concurrency: int = None, threshold: int = None,
+                       size: int = None) -> bool:
         """
         Copy file within S3 bucket.
         
+        Objects above threshold are copied with a parallel multipart copy
+        (UploadPartCopy), which is required past 5GB and lets S3 copy
+        ranges concurrently. Smaller objects use a single CopyObject that
+        copies metadata as-is unless new metadata is given.
+        
+        The source is only HEADed when its size is unknown or its headers
+        must be re-sent; those copies are pinned to the HEADed ETag, so a
+        source replaced in between fails the copy instead of mixing versions.
+        
         Args:
             source_key: Source S3 object key
             destination_key: Destination S3 object key
-            metadata: New metadata for the copied file
+            metadata: New metadata for the copied file (source metadata is kept if None)
+            part_size: Multipart copy part size (defaults to S3_COPY_PART_SIZE)
+            max_concurrency: Parts copied at once (defaults to S3_COPY_CONCURRENCY)
+            threshold: Size above which to copy in parts (defaults to S3_COPY_MULTIPART_THRESHOLD)
+            size: Source size in bytes, if already known (e.g. from a listing)
             
         Returns:
             True if successful
         """
         try:
+            threshold = threshold or settings.S3_COPY_MULTIPART_THRESHOLD
             copy_source = {'Bucket': self.bucket_name, 'Key': source_key}
             
-            extra_args = {}
-            if metadata:
-                extra_args['Metadata'] = metadata
-                extra_args['MetadataDirective'] = 'REPLACE'
+            source = None
+            if size is None or size > threshold or metadata is not None:
+                source = await s3_bulkhead.run(
+                    self.s3_client.head_object,
+                    Bucket=self.bucket_name,
+                    Key=source_key
+                )
+                size = source['ContentLength']
             
-            self.s3_client.copy_object(
-                CopySource=copy_source,
-                Bucket=self.bucket_name,
-                Key=destination_key,
-                **extra_args
-            )
+            if metadata is None and size <= threshold:
+                # MetadataDirective defaults to COPY, which keeps headers and metadata
+                await s3_bulkhead.run(
+                    self.s3_client.copy_object,
+                    CopySource=copy_source,
+                    Bucket=self.bucket_name,
+                    Key=destination_key
+                )
+            else:
+                # Carried over explicitly: REPLACE and multipart copies drop them
+                extra_args = {
+                    arg: source[arg] for arg in self.COPIED_HEADERS if source.get(arg)
+                }
+                extra_args['Metadata'] = metadata if metadata is not None else source.get('Metadata', {})
+                
+                if size <= threshold:
+                    await s3_bulkhead.run(
+                        self.s3_client.copy_object,
+                        CopySource=copy_source,
+                        CopySourceIfMatch=source['ETag'],
+                        Bucket=self.bucket_name,
+                        Key=destination_key,
+                        MetadataDirective='REPLACE',
+                        **extra_args
+                    )
+                else:
+                    await self._multipart_copy(
+                        source_key, destination_key, size, source['ETag'], extra_args,
+                        part_size or settings.S3_COPY_PART_SIZE,
+                        max_concurrency or settings.S3_COPY_CONCURRENCY
+                    )
             
+            await invalidate_cache_pattern(f":{destination_key}")
             return True
             
         except ClientError as e:
             print(f"Error copying file in S3: {e}")
             raise
     
+    async def _multipart_copy(self, source_key: str, destination_key: str, size: int,
+                              etag: str, extra_args: Dict[str, Any], part_size: int,
+                              max_concurrency: int) -> None:
+        """Copy an object as concurrent UploadPartCopy ranges, aborting on failure."""
+        # Grow the parts for huge objects so the copy stays within the part limit
+        part_size = max(part_size, -(-size // self.MULTIPART_MAX_PARTS))
+        
+        response = await s3_bulkhead.run(
+            self.s3_client.create_multipart_upload,
+            Bucket=self.bucket_name,
+            Key=destination_key,
+            **extra_args
+        )
+        upload_id = response['UploadId']
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def copy_part(part_number: int, start: int) -> Dict[str, Any]:
+            end = min(start + part_size, size) - 1
+            async with semaphore:
+                response = await s3_bulkhead.run(
+                    self.s3_client.upload_part_copy,
+                    Bucket=self.bucket_name,
+                    Key=destination_key,
+                    UploadId=upload_id,
+                    PartNumber=part_number,
+                    CopySource={'Bucket': self.bucket_name, 'Key': source_key},
+                    CopySourceIfMatch=etag,
+                    CopySourceRange=f"bytes={start}-{end}"
+                )
+            return {'PartNumber': part_number, 'ETag': response['CopyPartResult']['ETag']}
+        
+        try:
+            parts = await run_concurrently(*(
+                copy_part(number, start)
+                for number, start in enumerate(range(0, size, part_size), start=1)
+            ))
+            await s3_bulkhead.run(
+                self.s3_client.complete_multipart_upload,
+                Bucket=self.bucket_name,
+                Key=destination_key,
+                UploadId=upload_id,
+                MultipartUpload={'Parts': parts}
+            )
+        except BaseException:
+            await asyncio.shield(self._abort_multipart_upload(destination_key, upload_id))
+            raise
+    
+    async def _iter_pages(self, prefix: str = "", start_after: str = None,
+                          page_size: int = None, delimiter: str = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield raw list_objects_v2 pages, following continuation tokens.
+        
+        Args:
+            prefix: Key prefix to list
+            start_after: Only list keys sorting after this one
+            page_size: Keys per request (S3 caps this at 1000)
+            delimiter: Group keys sharing a prefix up to this character
+            
+        Yields:
+            list_objects_v2 response pages
+        """
+        params = {
+            'Bucket': self.bucket_name,
+            'Prefix': prefix,
+            'MaxKeys': page_size or settings.S3_LIST_PAGE_SIZE
+        }
+        if start_after:
+            params['StartAfter'] = start_after
+        if delimiter:
+            params['Delimiter'] = delimiter
+        
+        while True:
+            try:
+                page = await s3_bulkhead.run(self.s3_client.list_objects_v2, **params)
+            except ClientError as e:
+                print(f"Error listing files in S3: {e}")
+                raise
+            
+            yield page
+            
+            if not page.get('IsTruncated'):
+                return
+            params['ContinuationToken'] = page['NextContinuationToken']
+    
+    async def iter_files(self, prefix: str = "", start_after: str = None,
+                         page_size: int = None, fan_out: bool = False,
+                         delimiter: str = "/", max_concurrency: int = None) -> AsyncIterator[S3Object]:
+        """
+        Iterate over every object under a prefix without building a full list.
+        
+        Only one page per lister is held in memory at a time. Sequential
+        listings yield keys in lexicographic order, so the last key seen is a
+        valid ``start_after`` for resuming. With ``fan_out`` the prefixes one
+        delimiter level below ``prefix`` are listed in parallel and records
+        arrive in no particular order.
+        
+        Args:
+            prefix: Key prefix to list
+            start_after: Only yield keys sorting after this one
+            page_size: Keys per request
+            fan_out: List delimiter-discovered child prefixes concurrently
+            delimiter: Delimiter used to discover child prefixes
+            max_concurrency: Child prefixes listed at once (defaults to S3_LIST_CONCURRENCY)
+            
+        Yields:
+            S3Object records
+        """
+        if not fan_out:
+            async for page in self._iter_pages(prefix, start_after, page_size):
+                for obj in page.get('Contents', []):
+                    yield S3Object.from_listing(obj)
+            return
+        
+        # A start_after inside a child prefix would hide that prefix from the
+        # delimited listing, so discovery starts just before the child instead
+        discover_after = start_after
+        if start_after and start_after.startswith(prefix):
+            child, sep, _ = start_after[len(prefix):].partition(delimiter)
+            if sep:
+                discover_after = prefix + child
+        
+        # Discover child prefixes, yielding objects that sit directly under prefix
+        child_prefixes = []
+        async for page in self._iter_pages(prefix, discover_after, page_size, delimiter):
+            for obj in page.get('Contents', []):
+                if not start_after or obj['Key'] > start_after:
+                    yield S3Object.from_listing(obj)
+            child_prefixes.extend(p['Prefix'] for p in page.get('CommonPrefixes', []))
+        
+        if not child_prefixes:
+            return
+        
+        semaphore = asyncio.Semaphore(max_concurrency or settings.S3_LIST_CONCURRENCY)
+        # Bounded so fast listers wait for the consumer instead of piling up pages
+        queue: asyncio.Queue = asyncio.Queue(maxsize=page_size or settings.S3_LIST_PAGE_SIZE)
+        done = object()
+        
+        async def list_prefix(child_prefix: str) -> None:
+            try:
+                async with semaphore:
+                    resume = start_after if start_after and start_after.startswith(child_prefix) else None
+                    async for page in self._iter_pages(child_prefix, resume, page_size):
+                        for obj in page.get('Contents', []):
+                            await queue.put(S3Object.from_listing(obj))
+                await queue.put(done)
+            except Exception as e:
+                await queue.put(e)
+        
+        tasks = [asyncio.create_task(list_prefix(p)) for p in child_prefixes]
+        try:
+            remaining = len(tasks)
+            while remaining:
+                item = await queue.get()
+                if item is done:
+                    remaining -= 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    yield item
+        finally:
+            # Stop outstanding listers if the consumer bails out early
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    
     async def list_files(self, prefix: str = "", max_keys: int = 1000) -> List[Dict[str, Any]]:
         """
         List files in S3 bucket.
@@ -201,26 +955,11 @@ class S3Service:
         Returns:
             List of file information
         """
-        try:
-            response = self.s3_client.list_objects_v2(
-                Bucket=self.bucket_name,
-                Prefix=prefix,
-                MaxKeys=max_keys
-            )
-            
-            files = []
-            for obj in response.get('Contents', []):
-                files.append({
-                    'key': obj['Key'],
-                    'size': obj['Size'],
-                    'last_modified': obj['LastModified'],
-                    'etag': obj['ETag'].strip('"')
-                })
-            
-            return files
-            
-        except ClientError as e:
-            print(f"Error listing files in S3: {e}")
-            raise
+        files = []
+        async for obj in self.iter_files(prefix, page_size=min(max_keys, settings.S3_LIST_PAGE_SIZE)):
+            files.append(obj._asdict())
+            if len(files) >= max_keys:
+                break
+        return files
 
 s3_service = S3Service()
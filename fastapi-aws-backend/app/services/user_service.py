@@ -1,17 +1,36 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 from boto3.dynamodb.conditions import Key, Attr
 
-from app.services.dynamodb_service import dynamodb_service
+from app.services.dynamodb_service import decode_cursor, dynamodb_service, encode_cursor
 from app.services.auth_service import auth_service
+from app.services.s3_service import s3_service
 from app.core.config import settings
 from app.core.exceptions import UserNotFoundException
-from app.utils.cache import lru_ttl_cache, invalidate_cache_pattern
+from app.utils.cache import cache, lru_ttl_cache, invalidate_cache_pattern
+from app.utils.orchestration import run_concurrently, Saga
+
+
+def user_cache_key(user_id: str, fields: List[str] = None) -> str:
+    """Cache key for a user; sparse fieldsets get their own suffixed entry."""
+    if fields:
+        return f"user:{user_id}|{','.join(sorted(fields))}"
+    return f"user:{user_id}"
 
 
 class UserService:
     """User service with DynamoDB and Cognito integration."""
     
+    # S3 prefixes holding per-user objects ({prefix}/{user_id}/...)
+    FILE_PREFIXES = ("avatars", "uploads")
+    
+    # Sparse GSI: only active users carry ACTIVE_INDEX_KEY, so only they are indexed.
+    # All of them share one partition key, capping index writes (user creates,
+    # deletes) at one GSI partition's throughput; shard the value before that binds.
+    ACTIVE_INDEX = "ActiveUsersIndex"
+    ACTIVE_INDEX_KEY = "active_pk"
+    ACTIVE_INDEX_VALUE = "ACTIVE"
+    
     def __init__(self):
         self.table_name = settings.USERS_TABLE_NAME
     
@@ -28,26 +47,31 @@ class UserService:
         Returns:
             Created user data
         """
-        # Sign up in Cognito
-        cognito_response = await auth_service.sign_up(email, password, profile_data)
-        
-        # Create user profile in DynamoDB
-        user_data = {
-            'user_id': cognito_response['UserSub'],
-            'email': email,
-            'created_at': datetime.utcnow().isoformat(),
-            'updated_at': datetime.utcnow().isoformat(),
-            'is_active': True,
-            'email_verified': False
-        }
-        
-        if profile_data:
-            user_data.update(profile_data)
-        
-        await dynamodb_service.put_item(self.table_name, user_data)
-        
-        # Invalidate cache
-        await invalidate_cache_pattern(f"user:{cognito_response['UserSub']}")
+        async with Saga() as saga:
+            # Sign up in Cognito
+            cognito_response = await auth_service.sign_up(email, password, profile_data)
+            # Don't leave an orphaned Cognito user if the profile write fails
+            saga.add_compensation(auth_service.admin_delete_user, email)
+            
+            # Create user profile in DynamoDB
+            user_data = {
+                'user_id': cognito_response['UserSub'],
+                'email': email,
+                'created_at': datetime.utcnow().isoformat(),
+                'updated_at': datetime.utcnow().isoformat(),
+                'is_active': True,
+                self.ACTIVE_INDEX_KEY: self.ACTIVE_INDEX_VALUE,
+                'email_verified': False
+            }
+            
+            if profile_data:
+                user_data.update(profile_data)
+            
+            # Write profile and invalidate cache concurrently
+            await run_concurrently(
+                dynamodb_service.put_item(self.table_name, user_data),
+                invalidate_cache_pattern(f"user:{cognito_response['UserSub']}")
+            )
         
         return user_data
     
@@ -62,11 +86,13 @@ class UserService:
         Returns:
             Updated user data
         """
-        # Confirm in Cognito
-        await auth_service.confirm_sign_up(email, confirmation_code)
+        # Confirm in Cognito while looking up the profile
+        _, user = await run_concurrently(
+            auth_service.confirm_sign_up(email, confirmation_code),
+            self.get_user_by_email(email)
+        )
         
         # Update user in DynamoDB
-        user = await self.get_user_by_email(email)
         if user:
             updated_user = await self.update_user(
                 user['user_id'],
@@ -76,22 +102,71 @@ class UserService:
         
         raise UserNotFoundException(email)
     
-    @lru_ttl_cache(ttl=300)  # Cache for 5 minutes
-    async def get_user_by_id(self, user_id: str) -> Optional[Dict[str, Any]]:
+    def _projection(self, fields: List[str] = None) -> Optional[List[str]]:
+        """Attributes to read for a sparse fieldset; the key and version always come along."""
+        if not fields:
+            return None
+        return sorted(set(fields) | {'user_id', 'updated_at'})
+    
+    # Cached under user:{user_id} so invalidate_cache_pattern and batch lookups find it
+    @lru_ttl_cache(ttl=300, key_func=lambda self, user_id, fields=None: user_cache_key(user_id, fields))
+    async def get_user_by_id(self, user_id: str, fields: List[str] = None) -> Optional[Dict[str, Any]]:
         """
         Get user by ID with caching.
         
         Args:
             user_id: User ID
+            fields: Only read these attributes (plus user_id and updated_at)
             
         Returns:
             User data or None if not found
         """
         return await dynamodb_service.get_item(
             self.table_name,
-            {'user_id': user_id}
+            {'user_id': user_id},
+            projection=self._projection(fields)
         )
     
+    async def get_users_by_ids(self, user_ids: List[str],
+                               fields: List[str] = None) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Get many users by ID.
+        
+        Hits come from the same cache entries get_user_by_id uses (a cached
+        full record also serves a projected lookup); the misses are fetched
+        with BatchGetItem and cached for next time.
+        
+        Args:
+            user_ids: User IDs (duplicates are fetched once)
+            fields: Only read these attributes (plus user_id and updated_at)
+            
+        Returns:
+            Mapping of every requested ID to its user data, or None if not found
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        keys = {user_id: user_cache_key(user_id, fields) for user_id in user_ids}
+        lookup = set(keys.values())
+        if fields:
+            lookup.update(user_cache_key(user_id) for user_id in user_ids)
+        cached = await cache.get_many(lookup)
+        users = {
+            user_id: cached.get(key) or cached.get(user_cache_key(user_id))
+            for user_id, key in keys.items()
+        }
+        
+        missing = [user_id for user_id, user in users.items() if user is None]
+        if missing:
+            items = await dynamodb_service.batch_get_items(
+                self.table_name,
+                [{'user_id': user_id} for user_id in missing],
+                projection=self._projection(fields)
+            )
+            fetched = {item['user_id']: item for item in items}
+            users.update(fetched)
+            await cache.set_many({keys[user_id]: item for user_id, item in fetched.items()}, ttl=300)
+        
+        return users
+    
     @lru_ttl_cache(ttl=300)  # Cache for 5 minutes
     async def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
         """
@@ -103,22 +178,24 @@ class UserService:
         Returns:
             User data or None if not found
         """
-        # Query by GSI (assuming email is a GSI)
         users = await dynamodb_service.query_items(
             self.table_name,
             Key('email').eq(email),
-            limit=1
+            limit=1,
+            index_name='EmailIndex'
         )
         
         return users[0] if users else None
     
-    async def update_user(self, user_id: str, updates: Dict[str, Any]) -> Dict[str, Any]:
+    async def update_user(self, user_id: str, updates: Dict[str, Any],
+                          remove: List[str] = None) -> Dict[str, Any]:
         """
         Update user information.
         
         Args:
             user_id: User ID
             updates: Fields to update
+            remove: Attributes to delete from the record
             
         Returns:
             Updated user data
@@ -142,6 +219,14 @@ class UserService:
             expression_attribute_names[attr_name] = key
             expression_attribute_values[attr_value] = value
         
+        if remove:
+            removed = []
+            for i, key in enumerate(remove):
+                attr_name = f"#rm{i}"
+                removed.append(attr_name)
+                expression_attribute_names[attr_name] = key
+            update_expression += " REMOVE " + ", ".join(removed)
+        
         updated_user = await dynamodb_service.update_item(
             self.table_name,
             {'user_id': user_id},
@@ -155,43 +240,185 @@ class UserService:
         
         return updated_user
     
+    async def record_user_upload(self, user_id: str, file_record: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Record a verified upload as its own item in the uploads table.
+        
+        Keyed by user and object key, so the user record stays small and
+        recording the same upload twice overwrites rather than duplicates.
+        
+        Args:
+            user_id: User ID
+            file_record: Upload metadata (key, size, content_type, etag, uploaded_at)
+            
+        Returns:
+            Stored upload record
+        """
+        record = {**file_record, 'user_id': user_id, 'file_key': file_record['key']}
+        await dynamodb_service.put_item(settings.UPLOADS_TABLE_NAME, record)
+        return record
+    
+    async def delete_upload_records(self, user_id: str) -> int:
+        """
+        Delete every upload record of a user.
+        
+        Records pointing at content-addressed blobs also drop the user's
+        reference on the blob. The record goes first: a failure in between
+        leaks one reference rather than releasing it twice on a retry.
+        
+        Args:
+            user_id: User ID
+            
+        Returns:
+            Number of records deleted
+        """
+        blob_prefix = f"{settings.S3_BLOB_PREFIX}/"
+        
+        async def delete_record(file_key: str) -> None:
+            await dynamodb_service.delete_item(
+                settings.UPLOADS_TABLE_NAME, {'user_id': user_id, 'file_key': file_key}
+            )
+            if file_key.startswith(blob_prefix):
+                await s3_service.delete_file(file_key)
+        
+        deleted = 0
+        while True:
+            # Re-query from the start: the previous page is gone by now
+            page = await dynamodb_service.query_page(
+                settings.UPLOADS_TABLE_NAME, Key('user_id').eq(user_id), limit=100
+            )
+            if not page['items']:
+                return deleted
+            await run_concurrently(*(delete_record(record['file_key']) for record in page['items']))
+            deleted += len(page['items'])
+    
     async def delete_user(self, user_id: str) -> bool:
         """
         Delete user (soft delete by marking as inactive).
         
+        The row drops out of the active users index and carries a TTL, so
+        DynamoDB removes it once USER_RETENTION_DAYS have passed.
+        
         Args:
             user_id: User ID
             
         Returns:
             True if successful
         """
+        deleted_at = datetime.utcnow()
         await self.update_user(user_id, {
             'is_active': False,
-            'deleted_at': datetime.utcnow().isoformat()
-        })
+            'deleted_at': deleted_at.isoformat(),
+            'expires_at': int((deleted_at + timedelta(days=settings.USER_RETENTION_DAYS)).timestamp())
+        }, remove=[self.ACTIVE_INDEX_KEY])
         
         return True
     
+    async def purge_user_files(self, user_id: str) -> Dict[str, Any]:
+        """
+        Delete every S3 object a user owns.
+        
+        Prefixes are streamed rather than listed up front, and each window
+        of keys is deleted with concurrent DeleteObjects batches before the
+        next is read, so memory stays bounded for users with many uploads.
+        The user is marked ``purged_at`` once everything is gone.
+        
+        Args:
+            user_id: User ID
+            
+        Returns:
+            {'deleted': count, 'errors': [{'key', 'code', 'message'}]}
+        """
+        window = settings.S3_DELETE_BATCH_SIZE * settings.S3_DELETE_CONCURRENCY
+        
+        async def purge_prefix(prefix: str) -> Dict[str, Any]:
+            deleted, errors, keys = 0, [], []
+            async for obj in s3_service.iter_files(f"{prefix}/{user_id}/"):
+                keys.append(obj.key)
+                if len(keys) >= window:
+                    result = await s3_service.delete_files(keys)
+                    deleted, errors, keys = deleted + result['deleted'], errors + result['errors'], []
+            if keys:
+                result = await s3_service.delete_files(keys)
+                deleted, errors = deleted + result['deleted'], errors + result['errors']
+            return {'deleted': deleted, 'errors': errors}
+        
+        results = await run_concurrently(*(purge_prefix(prefix) for prefix in self.FILE_PREFIXES))
+        summary = {
+            'deleted': sum(result['deleted'] for result in results),
+            'errors': [error for result in results for error in result['errors']]
+        }
+        
+        if summary['errors']:
+            print(f"Purge of user {user_id} left {len(summary['errors'])} objects behind")
+        else:
+            await self.delete_upload_records(user_id)
+            await self.update_user(user_id, {'purged_at': datetime.utcnow().isoformat()})
+        
+        return summary
+    
+    async def purge_deleted_users(self) -> Dict[str, Any]:
+        """
+        Sweep soft-deleted users whose files have not been purged yet.
+        
+        Run by the scheduled purge job; ``delete_user`` only soft-deletes.
+        Pages through the whole table, so no pending user is left behind.
+        
+        Returns:
+            {'users': count purged, 'deleted': objects deleted, 'failed': [user_id]}
+        """
+        pending = dynamodb_service.iter_scan(
+            self.table_name,
+            filter_expression=Attr('is_active').eq(False)
+            & Attr('deleted_at').exists()
+            & Attr('purged_at').not_exists(),
+            projection_expression='user_id'
+        )
+        
+        summary = {'users': 0, 'deleted': 0, 'failed': []}
+        async for user in pending:
+            try:
+                result = await self.purge_user_files(user['user_id'])
+            except Exception as e:
+                print(f"Error purging user {user['user_id']}: {e}")
+                summary['failed'].append(user['user_id'])
+                continue
+            
+            summary['deleted'] += result['deleted']
+            if result['errors']:
+                summary['failed'].append(user['user_id'])
+            else:
+                summary['users'] += 1
+        
+        return summary
+    
     async def list_users(self, limit: int = 50, last_evaluated_key: str = None) -> Dict[str, Any]:
         """
         List users with pagination.
         
         Args:
             limit: Maximum number of users to return
-            last_evaluated_key: Pagination key
+            last_evaluated_key: Cursor returned with the previous page
             
         Returns:
-            List of users and pagination info
+            List of users and the cursor of the next page (None on the last)
+            
+        Raises:
+            InvalidCursorException: If last_evaluated_key is not a cursor we issued
         """
-        users = await dynamodb_service.scan_table(
+        # Reads only active rows, unlike a scan filtered after the read
+        page = await dynamodb_service.query_page(
             self.table_name,
-            filter_expression=Attr('is_active').eq(True),
-            limit=limit
+            Key(self.ACTIVE_INDEX_KEY).eq(self.ACTIVE_INDEX_VALUE),
+            limit=limit,
+            exclusive_start_key=decode_cursor(last_evaluated_key),
+            index_name=self.ACTIVE_INDEX
         )
         
         return {
-            'users': users,
-            'count': len(users)
+            'users': page['items'],
+            'count': len(page['items']),
+            'last_evaluated_key': encode_cursor(page['last_evaluated_key'])
         }
     
     async def authenticate_user(self, email: str, password: str) -> Dict[str, Any]:
@@ -205,11 +432,12 @@ class UserService:
         Returns:
             Authentication tokens and user data
         """
-        # Authenticate with Cognito
-        auth_result = await auth_service.sign_in(email, password)
-        
-        # Get user profile
-        user = await self.get_user_by_email(email)
+        # Authenticate with Cognito and fetch the profile concurrently;
+        # a failed sign-in cancels the lookup
+        auth_result, user = await run_concurrently(
+            auth_service.sign_in(email, password),
+            self.get_user_by_email(email)
+        )
         
         if not user:
             raise UserNotFoundException(email)
@@ -276,22 +504,54 @@ class UserService:
         """
         Get user statistics.
         
+        Active and verified counts come from the active users index; the
+        total is DynamoDB's approximate item count, refreshed about every
+        six hours, so inactive_users is approximate too.
+        
         Returns:
             User statistics
         """
-        # This would typically use more complex aggregation queries
-        # For now, we'll do a simple scan
-        all_users = await dynamodb_service.scan_table(self.table_name)
-        
-        active_users = sum(1 for user in all_users if user.get('is_active', False))
-        verified_users = sum(1 for user in all_users if user.get('email_verified', False))
+        active_key = Key(self.ACTIVE_INDEX_KEY).eq(self.ACTIVE_INDEX_VALUE)
+        total_users, active_users, verified_users = await run_concurrently(
+            dynamodb_service.get_item_count(self.table_name),
+            dynamodb_service.count_items(self.table_name, active_key, index_name=self.ACTIVE_INDEX),
+            dynamodb_service.count_items(
+                self.table_name, active_key,
+                filter_expression=Attr('email_verified').eq(True),
+                index_name=self.ACTIVE_INDEX
+            )
+        )
         
         return {
-            'total_users': len(all_users),
+            'total_users': total_users,
             'active_users': active_users,
             'verified_users': verified_users,
-            'inactive_users': len(all_users) - active_users
+            'inactive_users': max(total_users - active_users, 0)
         }
+    
+    async def backfill_active_index(self) -> Dict[str, int]:
+        """
+        Add the active users index key to active rows written before it existed.
+        
+        Returns:
+            {'updated': count of rows indexed}
+        """
+        updated = 0
+        async for user in dynamodb_service.iter_scan(
+            self.table_name,
+            filter_expression=Attr('is_active').eq(True) & Attr(self.ACTIVE_INDEX_KEY).not_exists(),
+            projection_expression='user_id'
+        ):
+            await dynamodb_service.update_item(
+                self.table_name,
+                {'user_id': user['user_id']},
+                "SET #key = :value",
+                {':value': self.ACTIVE_INDEX_VALUE},
+                {'#key': self.ACTIVE_INDEX_KEY}
+            )
+            updated += 1
+        
+        return {'updated': updated}
 
 
 # Global user service instance
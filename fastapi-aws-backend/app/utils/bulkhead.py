@@ -0,0 +1,185 @@
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+from app.core.exceptions import BulkheadFullException, DeadlineExceededException
+from app.utils.deadline import check_deadline, get_remaining
+
+
+class Bulkhead:
+    """
+    Bounded concurrency compartment for a single downstream dependency.
+
+    Blocking calls run on a dedicated thread pool sized to the concurrency
+    limit, so a saturated dependency cannot starve the others or the
+    event loop's default executor. Callers beyond the limit wait in a
+    bounded queue and are rejected immediately once that queue is full.
+    """
+
+    def __init__(self, name: str, max_concurrent: int, max_queue: int,
+                 queue_timeout: float = None):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout or settings.BULKHEAD_QUEUE_TIMEOUT
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        # Saturation metrics
+        self._active = 0
+        self._waiting = 0
+        self._peak_active = 0
+        self._peak_waiting = 0
+        self._completed = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._deadline_exceeded = 0
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Thread pool dedicated to this dependency (created on first use)."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrent,
+                thread_name_prefix=f"bulkhead-{self.name}"
+            )
+        return self._executor
+
+    async def acquire(self, timeout: float = None) -> None:
+        """
+        Acquire a slot, waiting in the bounded queue if necessary.
+
+        Args:
+            timeout: Longest wait; the queue timeout caps it
+
+        Raises:
+            BulkheadFullException: If the queue is full or the wait times out
+            DeadlineExceededException: If the request deadline ran out while waiting
+        """
+        timeout = self.queue_timeout if timeout is None else min(timeout, self.queue_timeout)
+        if not self._semaphore.locked():
+            # Free slot: acquire() returns without suspending
+            await self._semaphore.acquire()
+        else:
+            if self._waiting >= self.max_queue:
+                self._rejected += 1
+                raise BulkheadFullException(self.name, settings.BULKHEAD_RETRY_AFTER)
+
+            self._waiting += 1
+            self._peak_waiting = max(self._peak_waiting, self._waiting)
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=timeout)
+            except asyncio.TimeoutError:
+                self._timed_out += 1
+                self._rejected += 1
+                remaining = get_remaining()
+                if remaining is not None and remaining <= 0:
+                    self._deadline_exceeded += 1
+                    raise DeadlineExceededException(self.name, settings.BULKHEAD_RETRY_AFTER)
+                raise BulkheadFullException(self.name, settings.BULKHEAD_RETRY_AFTER)
+            finally:
+                self._waiting -= 1
+
+        self._active += 1
+        self._peak_active = max(self._peak_active, self._active)
+
+    def release(self) -> None:
+        """Release a slot acquired with acquire()."""
+        self._active -= 1
+        self._completed += 1
+        self._semaphore.release()
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run a blocking call inside the bulkhead.
+
+        Args:
+            func: Blocking callable (typically a boto3 client method)
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            The callable's return value
+
+        Raises:
+            DeadlineExceededException: If the request deadline passes first;
+                the call is abandoned, not interrupted (see below), and
+                bounded only by its client's timeouts, which
+                AWSClientFactory.within_deadline fits to the deadline
+        """
+        try:
+            remaining = check_deadline(self.name)
+        except DeadlineExceededException:
+            self._deadline_exceeded += 1
+            raise
+        await self.acquire(timeout=remaining)
+        loop = asyncio.get_running_loop()
+        try:
+            # Run in the caller's context, so clients looked up inside the
+            # call see the request deadline too
+            future = self.executor.submit(
+                contextvars.copy_context().run, functools.partial(func, *args, **kwargs)
+            )
+        except BaseException:
+            self.release()
+            raise
+
+        # A cancelled caller cannot stop the worker thread, so the slot is
+        # held until the call itself finishes, not until the caller gives up.
+        def _release(_):
+            try:
+                loop.call_soon_threadsafe(self.release)
+            except RuntimeError:
+                # Event loop already closed
+                pass
+
+        future.add_done_callback(_release)
+        remaining = get_remaining()
+        if remaining is None:
+            return await asyncio.wrap_future(future)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=max(remaining, 0))
+        except asyncio.TimeoutError:
+            self._deadline_exceeded += 1
+            raise DeadlineExceededException(self.name, settings.BULKHEAD_RETRY_AFTER)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return saturation metrics for this bulkhead."""
+        return {
+            'max_concurrent': self.max_concurrent,
+            'max_queue': self.max_queue,
+            'active': self._active,
+            'waiting': self._waiting,
+            'peak_active': self._peak_active,
+            'peak_waiting': self._peak_waiting,
+            'completed': self._completed,
+            'rejected': self._rejected,
+            'timed_out': self._timed_out,
+            'deadline_exceeded': self._deadline_exceeded,
+            'utilization': self._active / self.max_concurrent if self.max_concurrent else 0.0
+        }
+
+
+# Global bulkheads, one per AWS dependency
+cognito_bulkhead = Bulkhead(
+    "cognito", settings.COGNITO_MAX_CONCURRENCY, settings.COGNITO_MAX_QUEUE
+)
+dynamodb_bulkhead = Bulkhead(
+    "dynamodb", settings.DYNAMODB_MAX_CONCURRENCY, settings.DYNAMODB_MAX_QUEUE
+)
+s3_bulkhead = Bulkhead(
+    "s3", settings.S3_MAX_CONCURRENCY, settings.S3_MAX_QUEUE
+)
+
+bulkheads: Dict[str, Bulkhead] = {
+    bulkhead.name: bulkhead
+    for bulkhead in (cognito_bulkhead, dynamodb_bulkhead, s3_bulkhead)
+}
+
+
+def get_bulkhead_stats() -> Dict[str, Dict[str, Any]]:
+    """Return saturation metrics for all bulkheads."""
+    return {name: bulkhead.stats() for name, bulkhead in bulkheads.items()}
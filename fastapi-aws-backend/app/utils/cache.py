@@ -1,7 +1,7 @@
 import asyncio
 import functools
 import time
-from typing import Any, Dict, Callable, Optional
+from typing import Any, Dict, Callable, Iterable, Optional
 from app.core.config import settings
 
 
@@ -34,6 +34,31 @@ class TTLCache:
                 'expires': time.time() + ttl
             }
     
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Get several unexpired values under one lock; misses are omitted."""
+        now = time.time()
+        found = {}
+        async with self._lock:
+            for key in keys:
+                entry = self._cache.get(key)
+                if entry is None:
+                    continue
+                if now < entry['expires']:
+                    found[key] = entry['value']
+                else:
+                    del self._cache[key]
+        return found
+    
+    async def set_many(self, values: Dict[str, Any], ttl: int = None) -> None:
+        """Set several values with the same TTL under one lock."""
+        if ttl is None:
+            ttl = settings.CACHE_TTL
+        
+        expires = time.time() + ttl
+        async with self._lock:
+            for key, value in values.items():
+                self._cache[key] = {'value': value, 'expires': expires}
+    
     async def delete(self, key: str) -> None:
         """Delete key from cache."""
         async with self._lock:
@@ -49,13 +74,16 @@ class TTLCache:
 cache = TTLCache()
 
 
-def lru_ttl_cache(ttl: int = None, maxsize: int = 128):
+def lru_ttl_cache(ttl: int = None, maxsize: int = 128, key_func: Callable[..., str] = None):
     """
     Decorator that combines LRU cache with TTL functionality.
     
     Args:
         ttl: Time to live in seconds
         maxsize: Maximum number of entries to keep in cache
+        key_func: Builds a readable cache key from the call's arguments, so
+            entries can be found by invalidate_cache_pattern and shared with
+            code that reads the cache directly (async functions only)
     """
     def decorator(func: Callable) -> Callable:
         if asyncio.iscoroutinefunction(func):
@@ -63,7 +91,10 @@ def lru_ttl_cache(ttl: int = None, maxsize: int = 128):
             @functools.wraps(func)
             async def async_wrapper(*args, **kwargs):
                 # Create cache key from function name and arguments
-                key = f"{func.__name__}:{hash(str(args) + str(sorted(kwargs.items())))}"
+                if key_func is not None:
+                    key = key_func(*args, **kwargs)
+                else:
+                    key = f"{func.__name__}:{hash(str(args) + str(sorted(kwargs.items())))}"
                 
                 # Try to get from cache
                 cached_result = await cache.get(key)
@@ -98,4 +129,16 @@ async def invalidate_cache_pattern(pattern: str) -> None:
     async with cache._lock:
         keys_to_delete = [key for key in cache._cache.keys() if pattern in key]
         for key in keys_to_delete:
-            del cache._cache[key]
\ No newline at end of file
+            del cache._cache[key]
+
+
+async def invalidate_cache_patterns(patterns: Iterable[str]) -> None:
+    """Invalidate cache entries matching any of several patterns in one pass."""
+    patterns = list(patterns)
+    async with cache._lock:
+        keys_to_delete = [
+            key for key in cache._cache.keys()
+            if any(pattern in key for pattern in patterns)
+        ]
+        for key in keys_to_delete:
+            del cache._cache[key]
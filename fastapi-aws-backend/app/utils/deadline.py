@@ -0,0 +1,71 @@
+import time
+from contextvars import ContextVar, Token
+from typing import Optional
+
+from app.core.exceptions import DeadlineExceededException
+
+
+class _Deadline:
+    """Mutable holder, so clearing it reaches every task that inherited it."""
+    __slots__ = ("at",)
+
+    def __init__(self, at: float):
+        self.at: Optional[float] = at
+
+
+# Monotonic time by which the current request must have answered. Child
+# tasks (asyncio.gather, batch sub-requests, response body and background
+# tasks) inherit the same holder with the context.
+_deadline: ContextVar[Optional[_Deadline]] = ContextVar("request_deadline", default=None)
+
+
+def set_deadline(budget: float) -> Token:
+    """
+    Start a deadline for the current context.
+
+    Args:
+        budget: Seconds from now
+
+    Returns:
+        Token for reset_deadline
+    """
+    return _deadline.set(_Deadline(time.monotonic() + budget))
+
+
+def clear_deadline() -> None:
+    """Lift the current deadline, for this context and every task sharing it."""
+    deadline = _deadline.get()
+    if deadline is not None:
+        deadline.at = None
+
+
+def reset_deadline(token: Token) -> None:
+    """Restore the deadline that was in effect before set_deadline."""
+    _deadline.reset(token)
+
+
+def get_remaining() -> Optional[float]:
+    """Seconds left before the deadline, or None when no deadline is set."""
+    deadline = _deadline.get()
+    if deadline is None or deadline.at is None:
+        return None
+    return deadline.at - time.monotonic()
+
+
+def check_deadline(dependency: str) -> Optional[float]:
+    """
+    Fail fast if the deadline has already passed.
+
+    Args:
+        dependency: What the caller is about to wait on, for the error
+
+    Returns:
+        Seconds left, or None when no deadline is set
+
+    Raises:
+        DeadlineExceededException: If no time is left
+    """
+    remaining = get_remaining()
+    if remaining is not None and remaining <= 0:
+        raise DeadlineExceededException(dependency)
+    return remaining
@@ -0,0 +1,97 @@
+import hashlib
+import json
+from typing import Any, Dict, List, Optional
+from fastapi import Response
+
+# Responses may be cached but must be revalidated with the ETag before reuse
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+
+def compute_etag(*parts: Any) -> str:
+    """
+    Build a weak ETag from values that change whenever the resource does.
+
+    Args:
+        *parts: Version inputs, e.g. an ID and an updated_at timestamp
+
+    Returns:
+        Quoted weak ETag
+    """
+    digest = hashlib.sha256(
+        json.dumps(parts, sort_keys=True, default=str, separators=(",", ":")).encode()
+    ).hexdigest()
+    return f'W/"{digest[:32]}"'
+
+
+def user_etag(user: Dict[str, Any], fields: Optional[List[str]] = None) -> str:
+    """
+    ETag for a user record.
+
+    Every write path stamps updated_at, so it versions the record without
+    hashing the whole document; records without it fall back to content.
+    A sparse fieldset is a different representation, so it gets its own tag.
+
+    Args:
+        user: User record as stored in DynamoDB
+        fields: Sparse fieldset the response is restricted to
+
+    Returns:
+        Quoted weak ETag
+    """
+    if user.get("updated_at"):
+        if fields:
+            return compute_etag(user.get("user_id"), user["updated_at"], fields)
+        return compute_etag(user.get("user_id"), user["updated_at"])
+    if fields:
+        return compute_etag({name: user.get(name) for name in fields}, fields)
+    return compute_etag(user)
+
+
+def file_metadata_etag(metadata: Dict[str, Any]) -> str:
+    """
+    ETag for file metadata returned by get_file_metadata.
+
+    Args:
+        metadata: File metadata dict
+
+    Returns:
+        Quoted weak ETag
+    """
+    return compute_etag(metadata.get("etag"), metadata.get("last_modified"), metadata.get("metadata"))
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Evaluate an If-None-Match header using weak comparison.
+
+    Args:
+        if_none_match: Raw header value, possibly a comma-separated list or '*'
+        etag: Current ETag of the resource
+
+    Returns:
+        True if the client's copy is current
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    def opaque(tag: str) -> str:
+        tag = tag.strip()
+        return tag[2:] if tag.startswith("W/") else tag
+
+    return opaque(etag) in {opaque(tag) for tag in if_none_match.split(",")}
+
+
+def not_modified(etag: str) -> Response:
+    """Build an empty 304 response carrying the current ETag."""
+    return Response(
+        status_code=304,
+        headers={"ETag": etag, "Cache-Control": REVALIDATE_CACHE_CONTROL}
+    )
+
+
+def set_etag(response: Response, etag: str) -> None:
+    """Attach an ETag and revalidation policy to a 200 response."""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = REVALIDATE_CACHE_CONTROL
@@ -0,0 +1,69 @@
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_process_pool: Optional[Executor] = None
+_pool_lock = threading.Lock()
+
+
+def get_process_pool() -> Executor:
+    """
+    Get the shared pool for CPU-bound work, starting it on first use.
+
+    Returns a ProcessPoolExecutor so CPU-heavy calls run outside the GIL.
+    Where multiprocessing primitives are unavailable (AWS Lambda has no
+    /dev/shm), falls back to a thread pool so callers keep working.
+    """
+    global _process_pool
+    if _process_pool is None:
+        with _pool_lock:
+            if _process_pool is None:
+                workers = settings.PROCESS_POOL_WORKERS or os.cpu_count() or 1
+                try:
+                    # spawn avoids forking a process that already runs bulkhead threads
+                    _process_pool = ProcessPoolExecutor(
+                        max_workers=workers,
+                        mp_context=multiprocessing.get_context("spawn")
+                    )
+                except (OSError, NotImplementedError) as e:
+                    logger.warning(f"Process pool unavailable ({e}), using threads")
+                    _process_pool = ThreadPoolExecutor(
+                        max_workers=workers, thread_name_prefix="cpu"
+                    )
+    return _process_pool
+
+
+async def run_in_process(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Run a CPU-bound, picklable callable on the shared process pool.
+
+    Args:
+        func: Module-level function to execute
+        *args: Positional arguments for func
+        **kwargs: Keyword arguments for func
+
+    Returns:
+        The callable's return value
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_process_pool(), functools.partial(func, *args, **kwargs)
+    )
+
+
+def shutdown_process_pool() -> None:
+    """Shut down the shared pool if it was started."""
+    global _process_pool
+    with _pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+            _process_pool = None
@@ -0,0 +1,56 @@
+from typing import AsyncIterator, Optional
+from fastapi import UploadFile
+
+from app.core.config import settings
+from app.core.exceptions import FileTooLargeException
+
+# Leading magic bytes of the image formats we accept
+IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+)
+
+
+def sniff_content_type(header: bytes) -> Optional[str]:
+    """
+    Detect an image MIME type from the first bytes of a file.
+
+    Args:
+        header: At least the first 12 bytes of the file
+
+    Returns:
+        MIME type, or None if the format is not recognised
+    """
+    for signature, content_type in IMAGE_SIGNATURES:
+        if header.startswith(signature):
+            return content_type
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+async def iter_upload(file: UploadFile, max_size: int,
+                      chunk_size: int = None) -> AsyncIterator[bytes]:
+    """
+    Read an upload in chunks, aborting as soon as it exceeds max_size.
+
+    Args:
+        file: Incoming upload
+        max_size: Maximum allowed size in bytes
+        chunk_size: Read size (defaults to UPLOAD_CHUNK_SIZE)
+
+    Yields:
+        File content chunks
+
+    Raises:
+        FileTooLargeException: Once more than max_size bytes were read
+    """
+    chunk_size = chunk_size or settings.UPLOAD_CHUNK_SIZE
+    total = 0
+    while chunk := await file.read(chunk_size):
+        total += len(chunk)
+        if total > max_size:
+            raise FileTooLargeException(max_size)
+        yield chunk
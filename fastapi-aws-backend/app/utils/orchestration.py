@@ -0,0 +1,69 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+async def run_concurrently(*steps: Awaitable[Any]) -> List[Any]:
+    """
+    Run independent steps concurrently with structured cancellation.
+
+    All steps run in one TaskGroup: if any step fails, the others are
+    cancelled and the first failure is re-raised unwrapped, so callers
+    keep handling the same exception types as with sequential awaits.
+
+    Args:
+        *steps: Awaitables to run
+
+    Returns:
+        Step results in argument order
+    """
+    try:
+        async with asyncio.TaskGroup() as group:
+            tasks = [group.create_task(step) for step in steps]
+    except BaseExceptionGroup as eg:
+        raise eg.exceptions[0]
+
+    return [task.result() for task in tasks]
+
+
+class Saga:
+    """
+    Compensating-action tracker for multi-service writes.
+
+    Register an undo action after each step succeeds. If the block exits
+    with an exception, the registered actions run in reverse order and the
+    original exception propagates.
+
+    Example:
+        async with Saga() as saga:
+            created = await create_remote()
+            saga.add_compensation(delete_remote, created["id"])
+            await write_local(created)
+    """
+
+    def __init__(self):
+        self._compensations: List[Tuple[Callable[..., Awaitable[Any]], tuple, dict]] = []
+
+    def add_compensation(self, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> None:
+        """Register an async undo action for the step that just succeeded."""
+        self._compensations.append((func, args, kwargs))
+
+    async def compensate(self) -> None:
+        """Run registered compensations in reverse order, logging failures."""
+        while self._compensations:
+            func, args, kwargs = self._compensations.pop()
+            try:
+                await func(*args, **kwargs)
+            except Exception as e:
+                logger.error(f"Compensation {func.__name__} failed: {e}", exc_info=True)
+
+    async def __aenter__(self) -> "Saga":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> bool:
+        if exc_type is not None:
+            # Shield so a cancelled request still rolls back its side effects
+            await asyncio.shield(self.compensate())
+        return False
@@ -0,0 +1,110 @@
+from functools import lru_cache
+from typing import Any, Dict, List, Mapping, Optional, Type, TypeVar
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+from app.core.exceptions import InvalidFieldsException
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+@lru_cache(maxsize=None)
+def get_type_adapter(tp: Any) -> TypeAdapter:
+    """
+    Get a TypeAdapter for a type, building its serializer only once.
+
+    Args:
+        tp: Model or other type to (de)serialize
+
+    Returns:
+        Cached TypeAdapter
+    """
+    return TypeAdapter(tp)
+
+
+def construct_trusted(model: Type[ModelT], data: Mapping[str, Any]) -> ModelT:
+    """
+    Build a model from data we wrote ourselves, without validating it.
+
+    Only the model's declared fields are copied, so extra attributes on
+    the source record (e.g. internal DynamoDB bookkeeping) never leak.
+
+    Args:
+        model: Response model class
+        data: Trusted source record, e.g. a DynamoDB item from a service
+
+    Returns:
+        Unvalidated model instance
+    """
+    return model.model_construct(**{
+        name: data[name] for name in model.model_fields if name in data
+    })
+
+
+def parse_fields(model: Type[BaseModel], fields: Optional[str]) -> Optional[List[str]]:
+    """
+    Parse a sparse fieldset (?fields=a,b) against a response model.
+
+    Args:
+        model: Response model class the fields must belong to
+        fields: Raw comma-separated query value
+
+    Returns:
+        Sorted field names, or None when every field is wanted
+
+    Raises:
+        InvalidFieldsException: If a name isn't a field of the model
+    """
+    if not fields:
+        return None
+    names = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = names - set(model.model_fields)
+    if unknown:
+        raise InvalidFieldsException(unknown)
+    return sorted(names) or None
+
+
+def trusted_response(model: Type[BaseModel], data: Mapping[str, Any], status_code: int = 200,
+                     headers: Optional[Dict[str, str]] = None,
+                     fields: Optional[List[str]] = None) -> Response:
+    """
+    Serialize trusted data straight to a JSON response.
+
+    Returning a Response skips FastAPI's response_model validation, so
+    the data is never validated at all; pydantic-core encodes it in one
+    pass. Values keep their stored form, e.g. ISO timestamp strings are
+    emitted as-is, which matches what validating them would produce.
+
+    Args:
+        model: Response model class (still declared as response_model for docs)
+        data: Trusted source record
+        status_code: HTTP status code
+        headers: Extra response headers
+        fields: Sparse fieldset from parse_fields; all fields when None
+
+    Returns:
+        JSON response
+    """
+    return model_response(construct_trusted(model, data), status_code=status_code, headers=headers,
+                          include=set(fields) if fields else None)
+
+
+def model_response(instance: BaseModel, status_code: int = 200,
+                   headers: Optional[Dict[str, str]] = None, include: Any = None) -> Response:
+    """
+    Serialize an already-built (e.g. constructed) model to a JSON response.
+
+    Use this for nested responses, building each trusted level with
+    construct_trusted so extra attributes are dropped at every level.
+
+    Args:
+        instance: Model instance
+        status_code: HTTP status code
+        headers: Extra response headers
+        include: pydantic include spec restricting the output fields
+
+    Returns:
+        JSON response
+    """
+    body = get_type_adapter(type(instance)).dump_json(instance, include=include, warnings=False)
+    return Response(body, status_code=status_code, headers=headers, media_type="application/json")
@@ -0,0 +1,73 @@
+"""
+Login throughput benchmark: inline bcrypt vs. the process-pool API.
+
+Simulates N concurrent logins, each verifying one password, and reports
+logins/second for inline verification (blocks the event loop) and for
+verify_password_async with 1..CPU workers.
+
+Usage (from fastapi-aws-backend/):
+    python -m benchmarks.bench_password_hashing --logins 64 --rounds 12
+"""
+import argparse
+import asyncio
+import os
+import time
+
+
+async def _inline_logins(logins: int, hashed: str) -> float:
+    from app.core.security import verify_password
+
+    async def login():
+        # What an un-offloaded handler does: CPU work on the event loop
+        return verify_password("CorrectHorse1", hashed)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    return time.perf_counter() - start
+
+
+async def _pooled_logins(logins: int, hashed: str) -> float:
+    from app.core.security import verify_password_async
+    from app.utils.executors import get_process_pool
+
+    # Warm the pool so worker start-up is not measured
+    await asyncio.gather(*(verify_password_async("warm", hashed)
+                           for _ in range(os.cpu_count() or 1)))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(verify_password_async("CorrectHorse1", hashed)
+                           for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    get_process_pool().shutdown(wait=True)
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    # Must be set before app modules import settings (workers inherit the env)
+    os.environ["PASSWORD_HASH_ROUNDS"] = str(args.rounds)
+
+    from app.core.security import get_password_hash
+    import app.utils.executors as executors
+
+    hashed = get_password_hash("CorrectHorse1")
+
+    elapsed = asyncio.run(_inline_logins(args.logins, hashed))
+    print(f"{'inline':>12}: {args.logins / elapsed:8.1f} logins/s")
+
+    workers = 1
+    while workers <= args.max_workers:
+        executors.settings.PROCESS_POOL_WORKERS = workers
+        executors._process_pool = None
+        elapsed = asyncio.run(_pooled_logins(args.logins, hashed))
+        print(f"{f'pool x{workers}':>12}: {args.logins / elapsed:8.1f} logins/s")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Per-request response serialization cost: validated vs. trusted fast path.
+
+Times what a handler returning a DynamoDB user record costs to turn into
+response bytes:
+
+- validated: UserResponse(**user), FastAPI re-validating the
+  response_model, then jsonable_encoder + json.dumps (the old path)
+- orjson: the same validation passes encoded with ORJSONResponse
+- trusted: construct_trusted + cached TypeAdapter.dump_json
+
+Usage (from fastapi-aws-backend/):
+    python -m benchmarks.bench_serialization --iterations 20000
+"""
+import argparse
+import json
+import time
+from datetime import datetime
+
+
+def _sample_user() -> dict:
+    now = datetime.utcnow().isoformat()
+    return {
+        "user_id": "3f1c9a52-6d1e-4c1b-9a44-1b2f6f0f8e21",
+        "email": "jane.doe@example.com",
+        "first_name": "Jane",
+        "last_name": "Doe",
+        "phone_number": "+15555550123",
+        "is_active": True,
+        "email_verified": True,
+        "avatar_key": "uploads/3f1c9a52/avatar.png",
+        "avatar_variants": {
+            str(size): {"webp": f"avatars/3f1c9a52/abc/{size}.webp",
+                        "jpeg": f"avatars/3f1c9a52/abc/{size}.jpg"}
+            for size in (40, 128, 512)
+        },
+        "created_at": now,
+        "updated_at": now,
+        # Internal attributes the response model drops
+        "uploads": [{"key": f"uploads/3f1c9a52/{i}.pdf", "size": 1024} for i in range(20)],
+    }
+
+
+def _time(label: str, func, iterations: int) -> None:
+    func()  # warm caches
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    per_call = (time.perf_counter() - start) / iterations * 1e6
+    print(f"{label:>10}: {per_call:8.2f} us/request")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    from fastapi._compat import ModelField
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import ORJSONResponse
+    from pydantic.fields import FieldInfo
+    from app.models.user import UserResponse
+    from app.utils.serialization import trusted_response
+
+    user = _sample_user()
+    # What FastAPI does with the handler's return value for response_model
+    response_field = ModelField(
+        name="Response", field_info=FieldInfo(annotation=UserResponse), mode="serialization"
+    )
+
+    def validated():
+        value, _ = response_field.validate(UserResponse(**user), {}, loc=("response",))
+        content = response_field.serialize(value, mode="json")
+        return json.dumps(jsonable_encoder(content)).encode()
+
+    def orjson_validated():
+        value, _ = response_field.validate(UserResponse(**user), {}, loc=("response",))
+        content = response_field.serialize(value, mode="json")
+        return ORJSONResponse(jsonable_encoder(content)).body
+
+    def trusted():
+        return trusted_response(UserResponse, user).body
+
+    # Both paths must produce the same document for the comparison to mean anything
+    assert json.loads(validated()) == json.loads(trusted())
+
+    _time("validated", validated, args.iterations)
+    _time("orjson", orjson_validated, args.iterations)
+    _time("trusted", trusted, args.iterations)
+
+
+if __name__ == "__main__":
+    main()
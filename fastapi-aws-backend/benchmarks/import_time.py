@@ -0,0 +1,86 @@
+"""
+Cold-start import report: what importing the app costs, module by module.
+
+Runs `python -X importtime -c "import app.main"` in a fresh interpreter,
+prints the total and the modules with the largest cumulative import time,
+and lists heavy modules that should stay deferred until a request needs
+them. Exits non-zero when the total exceeds --budget-ms or a deferred
+module was imported, so it can gate CI.
+
+Usage (from fastapi-aws-backend/):
+    python -m benchmarks.import_time --top 20 --budget-ms 2500
+"""
+import argparse
+import os
+import subprocess
+import sys
+from typing import List, NamedTuple, Tuple
+
+# Imported lazily by the app; seeing one at import time is a regression
+DEFERRED_MODULES = ("jwt", "passlib", "requests", "PIL")
+
+
+class ImportRow(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+def measure(module: str = "app.main") -> Tuple[List[ImportRow], List[str]]:
+    """
+    Import a module in a fresh interpreter with -X importtime.
+
+    Args:
+        module: Module to import
+
+    Returns:
+        (import rows, deferred modules that were imported anyway)
+    """
+    code = (
+        f"import sys, {module}; "
+        f"print(','.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, env=os.environ.copy(),
+    )
+    if result.returncode:
+        raise RuntimeError(f"importing {module} failed:\n{result.stderr[-2000:]}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append(ImportRow(name.strip(), int(self_us), int(cumulative_us)))
+
+    leaked = [name for name in result.stdout.strip().split(",") if name]
+    return rows, leaked
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--budget-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    rows, leaked = measure(args.module)
+    total_ms = next(row.cumulative_us for row in rows if row.module == args.module) / 1000
+
+    print(f"import {args.module}: {total_ms:.1f} ms")
+    for row in sorted(rows, key=lambda row: -row.cumulative_us)[:args.top]:
+        print(f"  {row.cumulative_us / 1000:8.1f} ms  (self {row.self_us / 1000:6.1f})  {row.module}")
+
+    failed = False
+    if leaked:
+        print(f"deferred modules imported eagerly: {', '.join(leaked)}")
+        failed = True
+    if args.budget_ms is not None and total_ms > args.budget_ms:
+        print(f"over budget: {total_ms:.1f} ms > {args.budget_ms:.1f} ms")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
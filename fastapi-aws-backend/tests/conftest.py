@@ -7,6 +7,7 @@ from moto import mock_dynamodb, mock_s3, mock_cognitoidp
 import boto3
 from app.main import app
 from app.core.config import settings
+from app.utils.cache import cache
 
 
 @pytest.fixture(scope="session")
@@ -24,9 +25,17 @@ async def client() -> AsyncClient:
         yield ac
 
 
+@pytest.fixture
+def session_secret(monkeypatch):
+    """Configure a real JWT secret so session tokens are enabled."""
+    monkeypatch.setattr(settings, "JWT_SECRET_KEY", "test-session-secret")
+
+
 @pytest.fixture
 def mock_aws():
     """Mock AWS services."""
+    # Cached items from an earlier test's mocked tables would be stale
+    cache._cache.clear()
     with mock_dynamodb(), mock_s3(), mock_cognitoidp():
         yield
 
@@ -43,7 +52,9 @@ def dynamodb_table(mock_aws):
         ],
         AttributeDefinitions=[
             {'AttributeName': 'user_id', 'AttributeType': 'S'},
-            {'AttributeName': 'email', 'AttributeType': 'S'}
+            {'AttributeName': 'email', 'AttributeType': 'S'},
+            {'AttributeName': 'active_pk', 'AttributeType': 'S'},
+            {'AttributeName': 'created_at', 'AttributeType': 'S'}
         ],
         GlobalSecondaryIndexes=[
             {
@@ -56,6 +67,18 @@ def dynamodb_table(mock_aws):
                     'ReadCapacityUnits': 5,
                     'WriteCapacityUnits': 5
                 }
+            },
+            {
+                'IndexName': 'ActiveUsersIndex',
+                'KeySchema': [
+                    {'AttributeName': 'active_pk', 'KeyType': 'HASH'},
+                    {'AttributeName': 'created_at', 'KeyType': 'RANGE'}
+                ],
+                'Projection': {'ProjectionType': 'ALL'},
+                'ProvisionedThroughput': {
+                    'ReadCapacityUnits': 5,
+                    'WriteCapacityUnits': 5
+                }
             }
         ],
         BillingMode='PROVISIONED',
@@ -64,10 +87,50 @@ def dynamodb_table(mock_aws):
             'WriteCapacityUnits': 5
         }
     )
+    dynamodb.meta.client.update_time_to_live(
+        TableName=settings.USERS_TABLE_NAME,
+        TimeToLiveSpecification={'AttributeName': 'expires_at', 'Enabled': True}
+    )
     
     return table
 
 
+@pytest.fixture
+def blobs_table(mock_aws):
+    """Create the content-addressed blob index table for testing."""
+    dynamodb = boto3.resource('dynamodb', region_name=settings.AWS_REGION)
+    
+    return dynamodb.create_table(
+        TableName=settings.BLOBS_TABLE_NAME,
+        KeySchema=[
+            {'AttributeName': 'digest', 'KeyType': 'HASH'}
+        ],
+        AttributeDefinitions=[
+            {'AttributeName': 'digest', 'AttributeType': 'S'}
+        ],
+        BillingMode='PAY_PER_REQUEST'
+    )
+
+
+@pytest.fixture
+def uploads_table(mock_aws):
+    """Create the per-file upload records table for testing."""
+    dynamodb = boto3.resource('dynamodb', region_name=settings.AWS_REGION)
+    
+    return dynamodb.create_table(
+        TableName=settings.UPLOADS_TABLE_NAME,
+        KeySchema=[
+            {'AttributeName': 'user_id', 'KeyType': 'HASH'},
+            {'AttributeName': 'file_key', 'KeyType': 'RANGE'}
+        ],
+        AttributeDefinitions=[
+            {'AttributeName': 'user_id', 'AttributeType': 'S'},
+            {'AttributeName': 'file_key', 'AttributeType': 'S'}
+        ],
+        BillingMode='PAY_PER_REQUEST'
+    )
+
+
 @pytest.fixture
 def s3_bucket(mock_aws):
     """Create S3 bucket for testing."""
@@ -0,0 +1,109 @@
+# tests/test_cloudfront.py
+import base64
+import json
+import pytest
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import padding, rsa
+from app.services.cloudfront_service import CloudFrontCookieService
+
+
+def _from_cloudfront_b64(value: str) -> bytes:
+    return base64.b64decode(value.translate(str.maketrans("-_~", "+=/")))
+
+
+@pytest.fixture
+def rsa_key():
+    """Generate a throwaway RSA key pair."""
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+@pytest.fixture
+def cookie_service(rsa_key):
+    """CloudFront cookie service signing with the generated key."""
+    pem = rsa_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+    return CloudFrontCookieService(
+        domain="files.example.com", key_pair_id="KTESTKEY", private_key_pem=pem
+    )
+
+
+@pytest.mark.asyncio
+class TestCloudFrontCookies:
+    """Test CloudFront signed cookie generation."""
+
+    async def test_user_cookies_scoped_per_prefix(self, cookie_service):
+        """Test one cookie set per user prefix, each scoped to its path."""
+        cookie_sets = await cookie_service.get_user_cookies("user-123", ttl=600)
+
+        assert [c["path"] for c in cookie_sets] == [
+            "/avatars/user-123/",
+            "/uploads/user-123/",
+        ]
+        for cookie_set in cookie_sets:
+            policy = json.loads(
+                _from_cloudfront_b64(cookie_set["cookies"]["CloudFront-Policy"])
+            )
+            statement = policy["Statement"][0]
+            assert (
+                statement["Resource"]
+                == f"https://files.example.com{cookie_set['path']}*"
+            )
+            assert (
+                statement["Condition"]["DateLessThan"]["AWS:EpochTime"]
+                == cookie_set["expires_at"]
+            )
+            assert cookie_set["cookies"]["CloudFront-Key-Pair-Id"] == "KTESTKEY"
+
+    async def test_signature_verifies_with_public_key(self, cookie_service, rsa_key):
+        """Test the signature is RSA-SHA1 over the exact policy bytes."""
+        cookies = cookie_service.get_signed_cookies(
+            "https://files.example.com/avatars/u/*", 2000000000
+        )
+
+        policy = _from_cloudfront_b64(cookies["CloudFront-Policy"])
+        signature = _from_cloudfront_b64(cookies["CloudFront-Signature"])
+        # Raises InvalidSignature on mismatch
+        rsa_key.public_key().verify(
+            signature, policy, padding.PKCS1v15(), hashes.SHA1()
+        )
+
+        for value in cookies.values():
+            assert not set(value) & set("+=/")
+
+    async def test_disabled_without_key(self):
+        """Test the service reports itself disabled when not configured."""
+        assert not CloudFrontCookieService(domain="files.example.com").enabled
+
+    async def test_cookie_endpoint_keeps_values_out_of_body(
+        self, cookie_service, monkeypatch
+    ):
+        """Test signed cookie values are only sent as httponly cookies, never in JSON."""
+        from httpx import AsyncClient
+        from app.main import app
+        from app.api.deps import get_current_user
+        from app.api.v1 import users
+
+        monkeypatch.setattr(users, "cloudfront_service", cookie_service)
+        app.dependency_overrides[get_current_user] = lambda: {"user_id": "user-123"}
+        try:
+            async with AsyncClient(app=app, base_url="https://test") as client:
+                response = await client.post("/api/v1/users/me/file-cookies")
+        finally:
+            app.dependency_overrides.clear()
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["domain"] == "files.example.com"
+        assert all(
+            set(cookie_set) == {"path", "expires_at"}
+            for cookie_set in body["cookie_sets"]
+        )
+        set_cookies = response.headers.get_list("set-cookie")
+        assert set_cookies and all(
+            "httponly" in header.lower() for header in set_cookies
+        )
+        values = [header.split(";")[0].split("=", 1)[1] for header in set_cookies]
+        assert not any(value in response.text for value in values)
@@ -0,0 +1,124 @@
+# tests/test_compression.py
+import base64
+import gzip
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from httpx import AsyncClient
+from mangum import Mangum
+import app.middleware.compression as compression
+from app.middleware.compression import CompressionMiddleware, negotiate_encodings
+
+PAYLOAD = {"items": [{"id": i, "name": f"item-{i}"} for i in range(200)]}
+
+
+def _make_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+    @app.get("/large")
+    async def large():
+        return PAYLOAD
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    @app.get("/stream")
+    async def stream():
+        return StreamingResponse(
+            iter([b"x" * 1000, b"y" * 1000]), media_type="text/plain"
+        )
+
+    return app
+
+
+def _api_gateway_event(path: str, accept_encoding: str) -> dict:
+    return {
+        "resource": "/{proxy+}",
+        "path": path,
+        "httpMethod": "GET",
+        "headers": {"Host": "api.example.com", "Accept-Encoding": accept_encoding},
+        "multiValueHeaders": {
+            "Host": ["api.example.com"],
+            "Accept-Encoding": [accept_encoding],
+        },
+        "queryStringParameters": None,
+        "multiValueQueryStringParameters": None,
+        "pathParameters": {"proxy": path.lstrip("/")},
+        "stageVariables": None,
+        "requestContext": {
+            "resourcePath": "/{proxy+}",
+            "httpMethod": "GET",
+            "path": path,
+            "stage": "dev",
+            "identity": {"sourceIp": "127.0.0.1"},
+        },
+        "body": None,
+        "isBase64Encoded": False,
+    }
+
+
+class TestNegotiation:
+    """Test Accept-Encoding negotiation."""
+
+    def test_prefers_brotli_then_gzip(self):
+        """Test codings are ordered by q-value with brotli first on ties."""
+        assert negotiate_encodings("gzip, deflate, br") == ["br", "gzip"]
+        assert negotiate_encodings("br;q=0.5, gzip") == ["gzip", "br"]
+        assert negotiate_encodings("gzip, br", brotli_available=False) == ["gzip"]
+        assert negotiate_encodings("identity") == []
+        assert negotiate_encodings("*, gzip;q=0") == ["br"]
+
+
+@pytest.mark.asyncio
+class TestCompressionMiddleware:
+    """Test response compression."""
+
+    async def test_compresses_large_json(self):
+        """Test large JSON bodies are gzip-compressed with Vary set."""
+        async with AsyncClient(app=_make_app(), base_url="http://test") as client:
+            response = await client.get("/large", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert response.json() == PAYLOAD
+
+    async def test_skips_small_and_streaming_responses(self):
+        """Test bodies under the threshold and streamed bodies pass through."""
+        async with AsyncClient(app=_make_app(), base_url="http://test") as client:
+            small = await client.get("/small", headers={"Accept-Encoding": "gzip"})
+            stream = await client.get("/stream", headers={"Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in small.headers
+        assert "content-encoding" not in stream.headers
+        assert stream.content == b"x" * 1000 + b"y" * 1000
+
+    async def test_brotli_that_decodes_as_utf8_falls_back(self, monkeypatch):
+        """Test brotli output that is valid UTF-8 is replaced by gzip."""
+        if compression.brotli is None:
+            pytest.skip("brotli not installed")
+        monkeypatch.setattr(
+            compression.brotli, "compress", lambda body, quality: b"plain ascii"
+        )
+
+        async with AsyncClient(app=_make_app(), base_url="http://test") as client:
+            response = await client.get(
+                "/large", headers={"Accept-Encoding": "br, gzip"}
+            )
+
+        assert response.headers["content-encoding"] == "gzip"
+
+
+class TestMangumIntegration:
+    """Test compressed responses through the Lambda adapter."""
+
+    def test_mangum_returns_compressed_body_as_base64(self):
+        """Test Lambda responses carry compressed bytes base64-encoded."""
+        handler = Mangum(_make_app(), lifespan="off")
+
+        result = handler(_api_gateway_event("/large", "gzip"), None)
+
+        assert result["isBase64Encoded"] is True
+        assert result["headers"]["content-encoding"] == "gzip"
+        assert gzip.decompress(base64.b64decode(result["body"])).startswith(b'{"items"')
@@ -0,0 +1,194 @@
+# tests/test_deadline.py
+import json
+import time
+import pytest
+from fastapi import BackgroundTasks, FastAPI
+from fastapi.responses import StreamingResponse
+from httpx import AsyncClient
+from mangum import Mangum
+from app.core.exceptions import setup_exception_handlers
+from app.middleware.deadline import DeadlineMiddleware
+from app.utils.bulkhead import Bulkhead
+from app.utils.deadline import get_remaining
+
+
+def _make_app(background_remaining: list = None, **middleware_options) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(DeadlineMiddleware, **middleware_options)
+    setup_exception_handlers(app)
+    bulkhead = Bulkhead("slow", max_concurrent=1, max_queue=1)
+
+    @app.get("/remaining")
+    async def remaining():
+        return {"remaining": get_remaining()}
+
+    @app.get("/slow")
+    async def slow():
+        await bulkhead.run(time.sleep, 2)
+        return {"ok": True}
+
+    @app.get("/stream")
+    async def stream():
+        async def body():
+            for _ in range(3):
+                await bulkhead.run(time.sleep, 0.2)
+                yield b"chunk"
+
+        return StreamingResponse(body())
+
+    @app.get("/background")
+    async def background(tasks: BackgroundTasks):
+        async def work():
+            await bulkhead.run(time.sleep, 0.5)
+            background_remaining.append(get_remaining())
+
+        tasks.add_task(work)
+        return {"ok": True}
+
+    return app
+
+
+class FakeLambdaContext:
+    """Just enough of the Lambda context object for the middleware."""
+
+    def __init__(self, remaining_ms: int):
+        self.remaining_ms = remaining_ms
+
+    def get_remaining_time_in_millis(self) -> int:
+        return self.remaining_ms
+
+
+def _api_gateway_event(path: str) -> dict:
+    return {
+        "resource": "/{proxy+}",
+        "path": path,
+        "httpMethod": "GET",
+        "headers": {"Host": "api.example.com"},
+        "multiValueHeaders": {"Host": ["api.example.com"]},
+        "queryStringParameters": None,
+        "multiValueQueryStringParameters": None,
+        "pathParameters": {"proxy": path.lstrip("/")},
+        "stageVariables": None,
+        "requestContext": {
+            "resourcePath": "/{proxy+}",
+            "httpMethod": "GET",
+            "path": path,
+            "stage": "dev",
+            "identity": {"sourceIp": "127.0.0.1"},
+        },
+        "body": None,
+        "isBase64Encoded": False,
+    }
+
+
+@pytest.mark.asyncio
+class TestDeadlineMiddleware:
+    """Test per-request deadlines in container mode."""
+
+    async def test_budget_sets_deadline(self):
+        """Test the configured budget minus the safety margin becomes the deadline."""
+        async with AsyncClient(
+            app=_make_app(budget=10, safety_margin=1), base_url="http://test"
+        ) as client:
+            response = await client.get("/remaining")
+
+        assert 8.5 < response.json()["remaining"] <= 9
+        assert get_remaining() is None
+
+    async def test_slow_dependency_returns_503(self):
+        """Test a call outliving the deadline becomes a prompt 503."""
+        async with AsyncClient(
+            app=_make_app(budget=0.3, safety_margin=0.1), base_url="http://test"
+        ) as client:
+            start = time.monotonic()
+            response = await client.get("/slow")
+
+        assert response.status_code == 503
+        assert response.json()["type"] == "DeadlineExceededException"
+        assert time.monotonic() - start < 1.5
+
+    async def test_streamed_body_outlives_deadline(self):
+        """Test the deadline stops at the response start, not mid-download."""
+        async with AsyncClient(
+            app=_make_app(budget=0.3, safety_margin=0.1), base_url="http://test"
+        ) as client:
+            response = await client.get("/stream")
+
+        assert response.status_code == 200
+        assert response.content == b"chunk" * 3
+
+    async def test_background_task_outlives_deadline(self):
+        """Test background tasks run without the request's deadline."""
+        remaining = []
+        app = _make_app(background_remaining=remaining, budget=0.3, safety_margin=0.1)
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            response = await client.get("/background")
+
+        assert response.status_code == 200
+        assert remaining == [None]
+
+
+class TestLambdaDeadline:
+    """Test the deadline follows the Lambda invocation's remaining time."""
+
+    def test_uses_lambda_remaining_time(self):
+        """Test the remaining time comes from the Lambda context, not the budget."""
+        handler = Mangum(_make_app(budget=100, safety_margin=1), lifespan="off")
+
+        result = handler(
+            _api_gateway_event("/remaining"), FakeLambdaContext(remaining_ms=5000)
+        )
+
+        assert 3.5 < json.loads(result["body"])["remaining"] <= 4
+
+
+@pytest.mark.asyncio
+class TestDeadlineBoundCalls:
+    """Test AWS calls are bounded by the deadline, not just awaited with it."""
+
+    async def test_clients_fit_remaining_budget(self, mock_aws):
+        """Test near the deadline callers get a shared client with clamped timeouts."""
+        from app.core.aws import AWSClientFactory
+        from app.core.config import settings
+        from app.utils.deadline import reset_deadline, set_deadline
+
+        factory = AWSClientFactory()
+        default = factory.within_deadline("client", "s3")
+        assert default.meta.config.read_timeout == settings.S3_READ_TIMEOUT
+
+        token = set_deadline(3)
+        try:
+            bounded = factory.within_deadline("client", "s3")
+            assert factory.within_deadline("client", "s3") is bounded
+            # Lookups inside a bulkhead call see the same deadline
+            in_worker = await Bulkhead("test", 1, 1).run(
+                factory.within_deadline, "client", "s3"
+            )
+        finally:
+            reset_deadline(token)
+
+        assert bounded is not default and in_worker is bounded
+        assert bounded.meta.config.read_timeout == 2.0
+        assert bounded.meta.config.connect_timeout <= 2.0
+        assert bounded.meta.config.retries["total_max_attempts"] == 1
+        assert factory.within_deadline("client", "s3") is default
+
+    async def test_jwks_fetch_runs_in_cognito_bulkhead(self, monkeypatch):
+        """Test a cold JWKS fetch runs off the event loop, in the Cognito bulkhead."""
+        import threading
+        import jwt
+        from app.core.exceptions import AuthenticationException
+        from app.services.auth_service import auth_service
+
+        threads = []
+
+        class FakeJWKClient:
+            def get_signing_key_from_jwt(self, token):
+                threads.append(threading.current_thread().name)
+                raise jwt.InvalidTokenError("unknown kid")
+
+        monkeypatch.setattr(auth_service, "jwks_client", FakeJWKClient())
+        with pytest.raises(AuthenticationException):
+            await auth_service.verify_token("jwks-bulkhead-test-token")
+
+        assert len(threads) == 1 and threads[0].startswith("bulkhead-cognito")
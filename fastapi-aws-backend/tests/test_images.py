@@ -0,0 +1,124 @@
+# tests/test_images.py
+import io
+import pytest
+from PIL import Image
+from app.core.config import settings
+from app.core.exceptions import InvalidFileException
+from app.services.image_service import image_service, render_avatar_derivatives
+from app.services.s3_service import s3_service
+
+
+def _camera_jpeg(width: int = 800, height: int = 600) -> bytes:
+    """JPEG with EXIF orientation and a camera tag, like a phone photo."""
+    exif = Image.Exif()
+    exif[0x0112] = 6  # Orientation: rotate 90 CW
+    exif[0x010F] = "TestCam"  # Make
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), "red").save(buffer, format="JPEG", exif=exif)
+    return buffer.getvalue()
+
+
+class TestAvatarRendering:
+    """Test avatar derivative rendering."""
+
+    def test_renders_all_sizes_and_formats(self):
+        """Test each size is rendered as a square in every format."""
+        rendered = render_avatar_derivatives(_camera_jpeg(), [40, 128], quality=80)
+
+        assert set(rendered) == {40, 128}
+        for size, formats in rendered.items():
+            assert set(formats) == {"webp", "jpeg"}
+            for body in formats.values():
+                with Image.open(io.BytesIO(body)) as image:
+                    assert image.size == (size, size)
+
+    def test_strips_exif(self):
+        """Test derivatives carry no EXIF metadata."""
+        rendered = render_avatar_derivatives(_camera_jpeg(), [40], quality=80)
+
+        with Image.open(io.BytesIO(rendered[40]["jpeg"])) as image:
+            assert not image.getexif()
+
+
+@pytest.mark.asyncio
+class TestImageService:
+    """Test the avatar derivative pipeline."""
+
+    async def test_uploads_versioned_derivatives(self, s3_bucket):
+        """Test derivatives are uploaded under a content-versioned prefix."""
+        variants = await image_service.create_avatar_derivatives(
+            "user-123", _camera_jpeg()
+        )
+
+        assert set(variants) == {str(size) for size in settings.AVATAR_SIZES}
+        key = variants["40"]["webp"]
+        assert key.startswith("avatars/user-123/") and key.endswith("/40.webp")
+
+        metadata = await s3_service.get_file_metadata(key)
+        assert metadata["content_type"] == "image/webp"
+
+    async def test_rejects_undecodable_image(self):
+        """Test corrupt images surface as InvalidFileException."""
+        with pytest.raises(InvalidFileException):
+            await image_service.create_avatar_derivatives(
+                "user-123", b"\xff\xd8\xffnot-a-jpeg"
+            )
+
+    async def test_failed_render_removes_original(self, client, s3_bucket, monkeypatch):
+        """Test a failed derivative render leaves no orphaned original in S3."""
+        from app.main import app
+        from app.api.deps import get_current_user
+
+        async def fail(user_id, source, digest):
+            raise InvalidFileException("Could not process image")
+
+        monkeypatch.setattr(image_service, "create_avatar_derivatives", fail)
+        app.dependency_overrides[get_current_user] = lambda: {"user_id": "user-123"}
+        try:
+            response = await client.post(
+                "/api/v1/users/upload-avatar",
+                files={"file": ("me.jpg", _camera_jpeg(), "image/jpeg")},
+            )
+        finally:
+            app.dependency_overrides.clear()
+
+        assert response.status_code == 400
+        assert await s3_service.list_files("avatars/") == []
+
+    async def test_new_avatar_removes_previous_version(
+        self, client, s3_bucket, dynamodb_table
+    ):
+        """Test replacing an avatar deletes the previous version's objects."""
+        from app.main import app
+        from app.api.deps import get_current_user
+
+        async def upload(user, filename, color):
+            buffer = io.BytesIO()
+            Image.new("RGB", (64, 64), color).save(buffer, format="PNG")
+            app.dependency_overrides[get_current_user] = lambda: user
+            try:
+                response = await client.post(
+                    "/api/v1/users/upload-avatar",
+                    files={"file": (filename, buffer.getvalue(), "image/png")},
+                )
+            finally:
+                app.dependency_overrides.clear()
+            assert response.status_code == 200
+            return response.json()
+
+        first = await upload({"user_id": "user-123"}, "old.png", "red")
+        second = await upload(
+            {
+                "user_id": "user-123",
+                "avatar_key": first["file_key"],
+                "avatar_variants": first["variants"],
+            },
+            "new.png",
+            "blue",
+        )
+
+        new_keys = {second["file_key"]} | {
+            key for formats in second["variants"].values() for key in formats.values()
+        }
+        remaining = {obj["key"] for obj in await s3_service.list_files("avatars/")}
+        assert remaining == new_keys
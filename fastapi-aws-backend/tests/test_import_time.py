@@ -0,0 +1,43 @@
+# tests/test_import_time.py
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Generous enough for slow CI machines; cold starts regress by hundreds of ms
+IMPORT_BUDGET_MS = os.environ.get("IMPORT_TIME_BUDGET_MS", "3000")
+
+
+def _run(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args], cwd=PROJECT_ROOT, capture_output=True, text=True
+    )
+
+
+class TestColdStart:
+    """Test importing the app stays cheap."""
+
+    def test_import_within_budget_without_deferred_modules(self):
+        """Test the import report passes its time budget and deferred-module check."""
+        result = _run("-m", "benchmarks.import_time", "--budget-ms", IMPORT_BUDGET_MS)
+
+        assert result.returncode == 0, result.stdout + result.stderr
+
+    def test_services_build_clients_lazily(self):
+        """Test no AWS client or JWKS client exists right after import."""
+        code = (
+            "import app.main\n"
+            "from app.services.auth_service import auth_service\n"
+            "from app.services.dynamodb_service import dynamodb_service\n"
+            "from app.services.s3_service import s3_service\n"
+            "built = [name for service in (auth_service, dynamodb_service, s3_service)\n"
+            "         for name in ('client', 'jwks_client', 'dynamodb', 's3_client', 's3_resource')\n"
+            "         if name in vars(service)]\n"
+            "print(built)\n"
+        )
+        result = _run("-c", code)
+
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip() == "[]"
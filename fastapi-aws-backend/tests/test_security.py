@@ -0,0 +1,141 @@
+# tests/test_security.py
+import time
+import pytest
+from datetime import timedelta
+from fastapi import HTTPException
+from httpx import AsyncClient
+from app.core.config import settings
+from app.core.security import (
+    create_access_token,
+    decode_access_token,
+    create_session_token,
+    is_session_token,
+    session_tokens_enabled,
+    get_password_hash_async,
+    verify_password_async,
+)
+
+
+@pytest.mark.usefixtures("session_secret")
+class TestSessionTokens:
+    """Test locally issued session tokens."""
+
+    def test_session_token_roundtrip(self):
+        """Test a session token carries the principal flags."""
+        user = {
+            "user_id": "user-123",
+            "email": "test@example.com",
+            "is_active": True,
+            "email_verified": True,
+        }
+        token, expires_in = create_session_token({"exp": int(time.time()) + 3600}, user)
+
+        assert is_session_token(token)
+        assert 0 < expires_in <= settings.SESSION_TOKEN_EXPIRE_MINUTES * 60
+
+        payload = decode_access_token(token)
+        assert payload["sub"] == "user-123"
+        assert payload["token_use"] == "session"
+        assert payload["email_verified"] is True
+
+    def test_session_token_capped_by_cognito_expiry(self):
+        """Test the session never outlives the exchanged Cognito token."""
+        user = {"user_id": "user-123", "is_active": True}
+        _, expires_in = create_session_token({"exp": int(time.time()) + 60}, user)
+        assert expires_in <= 60
+
+    def test_rotated_key_still_verifies(self, monkeypatch):
+        """Test tokens signed with a retired kid verify during rotation."""
+        token = create_access_token({"sub": "user-123"})
+        old_kid, old_secret = settings.JWT_KEY_ID, settings.JWT_SECRET_KEY
+
+        monkeypatch.setattr(settings, "JWT_KEY_ID", "next")
+        monkeypatch.setattr(settings, "JWT_SECRET_KEY", "next-secret")
+        monkeypatch.setattr(settings, "JWT_PREVIOUS_SECRET_KEYS", {old_kid: old_secret})
+        assert decode_access_token(token)["sub"] == "user-123"
+
+        monkeypatch.setattr(settings, "JWT_PREVIOUS_SECRET_KEYS", {})
+        with pytest.raises(HTTPException) as exc_info:
+            decode_access_token(token)
+        assert exc_info.value.status_code == 401
+
+    def test_expired_token_rejected(self):
+        """Test expired session tokens are rejected."""
+        token = create_access_token(
+            {"sub": "user-123"}, expires_delta=timedelta(seconds=-1)
+        )
+        with pytest.raises(HTTPException) as exc_info:
+            decode_access_token(token)
+        assert exc_info.value.detail == "Token has expired"
+
+    def test_non_jwt_is_not_session_token(self):
+        """Test garbage bearer values are not treated as session tokens."""
+        assert not is_session_token("invalid-token")
+
+    def test_session_token_at_cognito_expiry_is_expired(self):
+        """Test a Cognito token with no lifetime left yields an expired session."""
+        user = {"user_id": "user-123", "is_active": True}
+        token, expires_in = create_session_token({"exp": int(time.time())}, user)
+
+        assert expires_in == 0
+        with pytest.raises(HTTPException) as exc_info:
+            decode_access_token(token)
+        assert exc_info.value.detail == "Token has expired"
+
+
+class TestSessionTokensDisabled:
+    """Test the session path is closed while the JWT secret is a placeholder."""
+
+    def test_default_secret_disables_session_tokens(self):
+        """Test no session token is minted with the default secret."""
+        assert not session_tokens_enabled()
+        with pytest.raises(RuntimeError):
+            create_session_token({}, {"user_id": "user-123"})
+
+
+@pytest.mark.asyncio
+class TestSessionTokenAuth:
+    """Test session tokens at the API boundary."""
+
+    async def test_forged_default_secret_token_rejected(self, client: AsyncClient):
+        """Test a token signed with the public default secret is refused."""
+        token = create_access_token({"sub": "victim", "token_use": "session"})
+        response = await client.get(
+            "/api/v1/users/me", headers={"Authorization": f"Bearer {token}"}
+        )
+        assert response.status_code == 401
+
+    async def test_hmac_token_without_session_use_rejected(
+        self, client: AsyncClient, session_secret
+    ):
+        """Test HMAC tokens not minted as session tokens are refused."""
+        token = create_access_token({"sub": "victim"})
+        response = await client.get(
+            "/api/v1/users/me", headers={"Authorization": f"Bearer {token}"}
+        )
+        assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+class TestPasswordHashing:
+    """Test process-pool password hashing."""
+
+    async def test_hash_and_verify(self):
+        """Test async hashing round-trips without requesting a rehash."""
+        hashed = await get_password_hash_async("CorrectHorse1")
+
+        assert await verify_password_async("CorrectHorse1", hashed) == (True, None)
+        valid, _ = await verify_password_async("wrong", hashed)
+        assert valid is False
+
+    async def test_rehash_on_cost_change(self):
+        """Test hashes made with another cost are transparently upgraded."""
+        from passlib.context import CryptContext
+
+        old_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash(
+            "CorrectHorse1"
+        )
+        valid, new_hash = await verify_password_async("CorrectHorse1", old_hash)
+
+        assert valid is True
+        assert new_hash.startswith(f"$2b${settings.PASSWORD_HASH_ROUNDS:02d}$")
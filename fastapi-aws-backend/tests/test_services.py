@@ -2,7 +2,13 @@
 import pytest
 from app.services.dynamodb_service import dynamodb_service
 from app.services.s3_service import s3_service
+from app.services.user_service import user_service
 from app.utils.cache import cache, lru_ttl_cache
+from app.utils.bulkhead import Bulkhead
+from app.utils.orchestration import run_concurrently, Saga
+from app.core.exceptions import (
+    BulkheadFullException, AuthenticationException, DeadlineExceededException, RangeNotSatisfiableException
+)
 
 
 @pytest.mark.asyncio
@@ -98,6 +104,368 @@ class TestS3Service:
         assert metadata is not None
         assert metadata["size"] == len(file_content)
         assert metadata["content_type"] == "text/plain"
+    
+    async def test_upload_stream_single_part(self, s3_bucket):
+        """Test small streams are stored with a single PutObject."""
+        async def chunks():
+            yield b"small "
+            yield b"file"
+        
+        result = await s3_service.upload_stream(
+            chunks(), key="test-files/small.txt", content_type="text/plain"
+        )
+        
+        assert result == {"key": "test-files/small.txt", "size": 10}
+        assert await s3_service.download_file("test-files/small.txt") == b"small file"
+    
+    async def test_upload_stream_multipart(self, s3_bucket):
+        """Test large streams are uploaded as concurrent multipart parts."""
+        part_size = 5 * 1024 * 1024  # S3 minimum part size
+        chunk = b"x" * (1024 * 1024)
+        
+        async def chunks():
+            for _ in range(11):
+                yield chunk
+        
+        result = await s3_service.upload_stream(
+            chunks(), key="test-files/large.bin", part_size=part_size, max_concurrency=2
+        )
+        
+        assert result["size"] == 11 * len(chunk)
+        metadata = await s3_service.get_file_metadata("test-files/large.bin")
+        assert metadata["size"] == 11 * len(chunk)
+        assert metadata["etag"].endswith("-3")  # three parts
+    
+    async def test_presigned_post_policy(self, s3_bucket):
+        """Test presigned POST policies constrain size, type and key prefix."""
+        import base64
+        import json
+        
+        post = await s3_service.generate_presigned_post(
+            "uploads/user-123/abc/", content_type="image/png", max_size=1024
+        )
+        
+        assert post["fields"]["key"] == "uploads/user-123/abc/${filename}"
+        policy = json.loads(base64.b64decode(post["fields"]["policy"]))
+        assert ["content-length-range", 1, 1024] in policy["conditions"]
+        assert {"Content-Type": "image/png"} in policy["conditions"]
+        assert ["starts-with", "$key", "uploads/user-123/abc/"] in policy["conditions"]
+    
+    async def test_presigned_url_reuse(self, s3_bucket):
+        """Test presigned URLs are reused while enough lifetime remains."""
+        first, expires_in = await s3_service.get_presigned_url("uploads/u1/a.png", expiration=600)
+        second, remaining = await s3_service.get_presigned_url("uploads/u1/a.png", expiration=600)
+        other, _ = await s3_service.get_presigned_url("uploads/u1/b.png", expiration=600)
+        
+        assert first == second
+        assert expires_in == 600
+        assert 0 < remaining <= 600
+        assert other != first
+    
+    async def _put_objects(self, keys):
+        from io import BytesIO
+        for key in keys:
+            await s3_service.upload_file(BytesIO(b"x"), key=key, content_type="text/plain")
+    
+    async def test_iter_files_follows_continuation_tokens(self, s3_bucket):
+        """Test listing pages past the first response and resumes with start_after."""
+        keys = [f"uploads/u1/file-{i:02d}.txt" for i in range(7)]
+        await self._put_objects(keys)
+        
+        listed = [obj.key async for obj in s3_service.iter_files("uploads/u1/", page_size=2)]
+        assert listed == keys
+        
+        resumed = [obj.key async for obj in s3_service.iter_files(
+            "uploads/u1/", start_after=keys[3], page_size=2
+        )]
+        assert resumed == keys[4:]
+        
+        assert len(await s3_service.list_files("uploads/u1/", max_keys=5)) == 5
+    
+    async def test_iter_files_fan_out(self, s3_bucket):
+        """Test fanning out across child prefixes yields every object once."""
+        keys = ["uploads/root.txt"] + [
+            f"uploads/{user}/file-{i}.txt" for user in ("a", "b", "c") for i in range(3)
+        ]
+        await self._put_objects(keys)
+        
+        listed = [obj.key async for obj in s3_service.iter_files(
+            "uploads/", page_size=2, fan_out=True, max_concurrency=2
+        )]
+        assert sorted(listed) == sorted(keys)
+        
+        resumed = [obj.key async for obj in s3_service.iter_files(
+            "uploads/", start_after="uploads/b/file-0.txt", fan_out=True
+        )]
+        assert sorted(resumed) == [k for k in sorted(keys) if k > "uploads/b/file-0.txt"]
+    
+    async def test_delete_files_in_batches(self, s3_bucket):
+        """Test bulk deletion spans several DeleteObjects batches."""
+        keys = [f"uploads/u1/file-{i}.txt" for i in range(5)]
+        await self._put_objects(keys + ["uploads/u2/keep.txt"])
+        
+        result = await s3_service.delete_files(keys, batch_size=2, max_concurrency=2)
+        
+        assert result == {'deleted': 5, 'errors': []}
+        remaining = [obj.key async for obj in s3_service.iter_files("uploads/")]
+        assert remaining == ["uploads/u2/keep.txt"]
+    
+    async def test_open_download_streams_ranges_and_conditions(self, s3_bucket):
+        """Test streamed downloads honour Range, If-None-Match and missing keys."""
+        from io import BytesIO
+        key = "uploads/u1/data.bin"
+        await s3_service.upload_file(BytesIO(b"0123456789"), key=key, content_type="application/octet-stream")
+        
+        full = await s3_service.open_download(key, chunk_size=4)
+        chunks = [chunk async for chunk in full.body]
+        assert full.status_code == 200
+        assert chunks == [b"0123", b"4567", b"89"]
+        assert full.headers["Content-Length"] == "10"
+        
+        partial = await s3_service.open_download(key, range_header="bytes=2-4")
+        assert partial.status_code == 206
+        assert partial.headers["Content-Range"] == "bytes 2-4/10"
+        assert b"".join([chunk async for chunk in partial.body]) == b"234"
+        
+        not_modified = await s3_service.open_download(key, if_none_match=full.headers["ETag"])
+        assert not_modified.status_code == 304
+        assert not_modified.body is None
+        
+        with pytest.raises(RangeNotSatisfiableException):
+            await s3_service.open_download(key, range_header="bytes=50-60")
+        
+        assert await s3_service.open_download("uploads/u1/missing.bin") is None
+    
+    async def test_deduplicated_upload_reference_counting(self, s3_bucket, blobs_table):
+        """Test identical content is stored once and deleted with its last reference."""
+        from io import BytesIO
+        
+        class NonSeekable(BytesIO):
+            def seekable(self):
+                return False
+        
+        content = b"same avatar bytes" * 100
+        first = await s3_service.upload_file(BytesIO(content), content_type="image/png", deduplicate=True)
+        second = await s3_service.upload_file(NonSeekable(content), content_type="image/png", deduplicate=True)
+        
+        assert first == second
+        assert first.startswith("blobs/sha256/")
+        assert await s3_service.download_file(first) == content
+        
+        stats = await s3_service.get_dedup_stats()
+        assert stats['references'] == 2
+        assert stats['bytes_saved'] == len(content)
+        
+        await s3_service.delete_file(first)
+        assert await s3_service.download_file(first) == content
+        assert (await s3_service.get_dedup_stats())['references'] == 1
+        
+        await s3_service.delete_file(second)
+        assert await s3_service.get_file_metadata(second) is None
+    
+    async def test_release_blob_twice_is_a_no_op(self, s3_bucket, blobs_table):
+        """Test releasing an already-released blob returns instead of failing."""
+        from io import BytesIO
+        key = await s3_service.upload_file(BytesIO(b"blob"), deduplicate=True)
+        digest = key.rsplit("/", 1)[-1]
+        blobs_table.put_item(Item={'digest': digest, 'ref_count': 0, 'size': 4})
+        
+        await s3_service._release_blob(digest)
+        
+        assert blobs_table.get_item(Key={'digest': digest})['Item']['ref_count'] == 0
+    
+    async def test_copy_file_multipart(self, s3_bucket):
+        """Test large copies use UploadPartCopy and keep or replace metadata."""
+        from io import BytesIO
+        content = b"x" * (11 * 1024 * 1024)
+        await s3_service.upload_file(
+            BytesIO(content), key="uploads/u1/big.bin",
+            content_type="application/pdf", metadata={"user_id": "u1"}
+        )
+        
+        await s3_service.copy_file(
+            "uploads/u1/big.bin", "uploads/u1/kept.bin",
+            part_size=5 * 1024 * 1024, threshold=6 * 1024 * 1024
+        )
+        await s3_service.copy_file(
+            "uploads/u1/big.bin", "uploads/u1/replaced.bin", metadata={"user_id": "u2"},
+            part_size=5 * 1024 * 1024, threshold=6 * 1024 * 1024
+        )
+        
+        kept = s3_bucket.head_object(Bucket=s3_service.bucket_name, Key="uploads/u1/kept.bin")
+        assert kept["ETag"].strip('"').endswith("-3")
+        assert kept["ContentLength"] == len(content)
+        assert kept["ContentType"] == "application/pdf"
+        assert kept["Metadata"] == {"user_id": "u1"}
+        
+        replaced = s3_bucket.head_object(Bucket=s3_service.bucket_name, Key="uploads/u1/replaced.bin")
+        assert replaced["Metadata"] == {"user_id": "u2"}
+        assert replaced["ContentType"] == "application/pdf"
+    
+    async def test_copy_file_keeps_encryption_and_storage_class(self, s3_bucket, monkeypatch):
+        """Test small copies skip the HEAD and re-sent headers keep SSE and storage class."""
+        s3_bucket.put_object(
+            Bucket=s3_service.bucket_name, Key="uploads/u1/a.txt", Body=b"x" * 1024,
+            ServerSideEncryption="AES256", StorageClass="STANDARD_IA",
+            WebsiteRedirectLocation="/elsewhere", Metadata={"user_id": "u1"}
+        )
+        heads = []
+        head_object = s3_service.s3_client.head_object
+        
+        def counting_head(**kwargs):
+            heads.append(kwargs['Key'])
+            return head_object(**kwargs)
+        
+        monkeypatch.setattr(s3_service.s3_client, "head_object", counting_head)
+        
+        await s3_service.copy_file("uploads/u1/a.txt", "uploads/u1/copied.txt", size=1024)
+        assert heads == []
+        await s3_service.copy_file("uploads/u1/a.txt", "uploads/u1/replaced.txt", metadata={"user_id": "u2"})
+        await s3_service.copy_file("uploads/u1/a.txt", "uploads/u1/parts.txt", threshold=512)
+        assert len(heads) == 2
+        
+        copied = head_object(Bucket=s3_service.bucket_name, Key="uploads/u1/copied.txt")
+        assert copied["WebsiteRedirectLocation"] == "/elsewhere"
+        assert copied["Metadata"] == {"user_id": "u1"}
+        
+        for key, metadata in (("replaced", "u2"), ("parts", "u1")):
+            copied = head_object(Bucket=s3_service.bucket_name, Key=f"uploads/u1/{key}.txt")
+            assert copied["ServerSideEncryption"] == "AES256"
+            assert copied["StorageClass"] == "STANDARD_IA"
+            assert copied["WebsiteRedirectLocation"] == "/elsewhere"
+            assert copied["Metadata"] == {"user_id": metadata}
+    
+    async def test_copy_file_multipart_respects_part_limit(self, s3_bucket, monkeypatch):
+        """Test the part size grows so a copy never exceeds S3's part count limit."""
+        from io import BytesIO
+        content = b"x" * (11 * 1024 * 1024)
+        await s3_service.upload_file(BytesIO(content), key="uploads/u1/big.bin")
+        monkeypatch.setattr(s3_service, "MULTIPART_MAX_PARTS", 2)
+        
+        await s3_service.copy_file(
+            "uploads/u1/big.bin", "uploads/u1/copy.bin",
+            part_size=5 * 1024 * 1024, threshold=6 * 1024 * 1024
+        )
+        
+        copied = s3_bucket.head_object(Bucket=s3_service.bucket_name, Key="uploads/u1/copy.bin")
+        assert copied["ETag"].strip('"').endswith("-2")
+        assert copied["ContentLength"] == len(content)
+    
+    async def test_copy_file_multipart_aborts_on_failure(self, s3_bucket, monkeypatch):
+        """Test a failed part copy aborts the multipart upload."""
+        from io import BytesIO
+        from botocore.exceptions import ClientError
+        await s3_service.upload_file(BytesIO(b"x" * (11 * 1024 * 1024)), key="uploads/u1/big.bin")
+        
+        original = s3_service.s3_client.upload_part_copy
+        
+        def flaky_part_copy(**kwargs):
+            if kwargs["PartNumber"] == 2:
+                raise ClientError({"Error": {"Code": "InternalError", "Message": "boom"}}, "UploadPartCopy")
+            return original(**kwargs)
+        
+        monkeypatch.setattr(s3_service.s3_client, "upload_part_copy", flaky_part_copy)
+        
+        with pytest.raises(ClientError):
+            await s3_service.copy_file(
+                "uploads/u1/big.bin", "uploads/u1/copy.bin",
+                part_size=5 * 1024 * 1024, threshold=6 * 1024 * 1024
+            )
+        
+        uploads = s3_bucket.list_multipart_uploads(Bucket=s3_service.bucket_name)
+        assert not uploads.get("Uploads")
+
+
+@pytest.mark.asyncio
+class TestUserPurge:
+    """Test purging soft-deleted users' files."""
+    
+    async def test_purge_deleted_users(self, dynamodb_table, uploads_table, s3_bucket):
+        """Test the sweep deletes only soft-deleted users' objects and marks them purged."""
+        from io import BytesIO
+        for user_id, active in (("gone", False), ("kept", True)):
+            await dynamodb_service.put_item(user_service.table_name, {
+                'user_id': user_id,
+                'email': f"{user_id}@example.com",
+                'is_active': active,
+                **({} if active else {'deleted_at': "2024-01-01T00:00:00"})
+            })
+            for key in (f"avatars/{user_id}/v1/40.webp", f"uploads/{user_id}/a.txt"):
+                await s3_service.upload_file(BytesIO(b"x"), key=key, content_type="text/plain")
+            await user_service.record_user_upload(user_id, {'key': f"uploads/{user_id}/a.txt", 'size': 1})
+        
+        summary = await user_service.purge_deleted_users()
+        
+        assert summary == {'users': 1, 'deleted': 2, 'failed': []}
+        remaining = sorted([obj.key async for obj in s3_service.iter_files()])
+        assert remaining == ["avatars/kept/v1/40.webp", "uploads/kept/a.txt"]
+        purged = await dynamodb_service.get_item(user_service.table_name, {'user_id': "gone"})
+        assert 'purged_at' in purged
+        assert uploads_table.get_item(Key={'user_id': "gone", 'file_key': "uploads/gone/a.txt"}).get('Item') is None
+        assert uploads_table.get_item(Key={'user_id': "kept", 'file_key': "uploads/kept/a.txt"})['Item']
+        
+        # Already purged users are skipped on the next sweep
+        assert (await user_service.purge_deleted_users())['users'] == 0
+    
+    async def test_purge_releases_deduplicated_uploads(self, dynamodb_table, uploads_table, s3_bucket,
+                                                       blobs_table):
+        """Test purging a user drops their references on shared blobs."""
+        from io import BytesIO
+        await dynamodb_service.put_item(user_service.table_name, {'user_id': "gone", 'is_active': False})
+        for user_id in ("gone", "kept"):
+            key = await s3_service.upload_file(BytesIO(b"shared"), deduplicate=True)
+            await user_service.record_user_upload(user_id, {'key': key, 'size': 6})
+        
+        await user_service.purge_user_files("gone")
+        
+        assert (await s3_service.get_dedup_stats())['references'] == 1
+        assert await s3_service.download_file(key) == b"shared"
+        
+        await user_service.delete_upload_records("kept")
+        assert await s3_service.get_file_metadata(key) is None
+    
+    async def test_purge_deleted_users_pages_through_table(self, dynamodb_table, uploads_table, s3_bucket,
+                                                           monkeypatch):
+        """Test the sweep reaches pending users beyond the first scan page."""
+        for index in range(3):
+            await dynamodb_service.put_item(user_service.table_name, {
+                'user_id': f"gone-{index}",
+                'is_active': False,
+                'deleted_at': "2024-01-01T00:00:00"
+            })
+        
+        get_table = dynamodb_service.get_table
+        
+        class OneItemPages:
+            def __init__(self, table):
+                self.table = table
+            
+            def scan(self, **kwargs):
+                return self.table.scan(Limit=1, **kwargs)
+            
+            def __getattr__(self, name):
+                return getattr(self.table, name)
+        
+        monkeypatch.setattr(dynamodb_service, "get_table", lambda name: OneItemPages(get_table(name)))
+        
+        summary = await user_service.purge_deleted_users()
+        assert summary['users'] == 3
+    
+    async def test_upload_records_live_outside_the_user_item(self, dynamodb_table, uploads_table):
+        """Test uploads are one item each, idempotent, and never grow the user record."""
+        await dynamodb_service.put_item(user_service.table_name, {'user_id': "user-1"})
+        record = {'key': "uploads/user-1/a.pdf", 'size': 10, 'content_type': "application/pdf"}
+        
+        await user_service.record_user_upload("user-1", record)
+        await user_service.record_user_upload("user-1", record)
+        
+        items = uploads_table.scan()['Items']
+        assert [(item['user_id'], item['file_key']) for item in items] == [("user-1", "uploads/user-1/a.pdf")]
+        user = await dynamodb_service.get_item(user_service.table_name, {'user_id': "user-1"})
+        assert 'uploads' not in user
+        
+        assert await user_service.delete_upload_records("user-1") == 1
+        assert uploads_table.scan()['Items'] == []
 
 
 @pytest.mark.asyncio
@@ -149,4 +517,333 @@ class TestCache:
         # Third call with different parameter
         result3 = await cached_function("different")
         assert result3 == "result_different"
-        assert call_count == 2
\ No newline at end of file
+        assert call_count == 2
+
+
+@pytest.mark.asyncio
+class TestActiveUsersIndex:
+    """Test the sparse active users index and soft-delete expiry."""
+    
+    async def test_soft_delete_leaves_index_and_sets_ttl(self, dynamodb_table):
+        """Test deleted users drop out of list_users/stats and get expires_at."""
+        import time
+        from app.core.config import settings
+        
+        for i in range(3):
+            await dynamodb_service.put_item(user_service.table_name, {
+                'user_id': f"user-{i}",
+                'email': f"user-{i}@example.com",
+                'created_at': f"2024-01-0{i + 1}T00:00:00",
+                'is_active': True,
+                'email_verified': i == 0,
+                'active_pk': user_service.ACTIVE_INDEX_VALUE
+            })
+        
+        await user_service.delete_user("user-1")
+        
+        listed = await user_service.list_users()
+        assert [user['user_id'] for user in listed['users']] == ["user-0", "user-2"]
+        
+        deleted = await dynamodb_service.get_item(user_service.table_name, {'user_id': "user-1"})
+        assert 'active_pk' not in deleted
+        expected_expiry = time.time() + settings.USER_RETENTION_DAYS * 86400
+        assert abs(deleted['expires_at'] - expected_expiry) < 60
+        
+        stats = await user_service.get_user_stats()
+        assert stats['active_users'] == 2
+        assert stats['verified_users'] == 1
+    
+    async def test_backfill_indexes_existing_active_users(self, dynamodb_table):
+        """Test rows written before the index existed are backfilled."""
+        await dynamodb_service.put_item(user_service.table_name, {
+            'user_id': "legacy",
+            'email': "legacy@example.com",
+            'created_at': "2023-01-01T00:00:00",
+            'is_active': True
+        })
+        
+        assert (await user_service.list_users())['count'] == 0
+        assert await user_service.backfill_active_index() == {'updated': 1}
+        assert (await user_service.list_users())['count'] == 1
+    
+    async def test_list_users_paginates_with_cursor(self, dynamodb_table):
+        """Test list_users pages with an opaque cursor until the index is exhausted."""
+        from app.core.exceptions import InvalidCursorException
+        
+        for i in range(3):
+            await dynamodb_service.put_item(user_service.table_name, {
+                'user_id': f"user-{i}",
+                'created_at': f"2024-01-0{i + 1}T00:00:00",
+                'is_active': True,
+                'active_pk': user_service.ACTIVE_INDEX_VALUE
+            })
+        
+        first = await user_service.list_users(limit=2)
+        assert first['count'] == 2
+        assert first['last_evaluated_key']
+        
+        second = await user_service.list_users(limit=2, last_evaluated_key=first['last_evaluated_key'])
+        listed = [user['user_id'] for user in first['users'] + second['users']]
+        assert listed == ["user-0", "user-1", "user-2"]
+        assert second['last_evaluated_key'] is None
+        
+        with pytest.raises(InvalidCursorException):
+            await user_service.list_users(last_evaluated_key="not-a-cursor")
+
+
+@pytest.mark.asyncio
+class TestBatchUserLookup:
+    """Test batch user lookup and the per-user cache entries it shares."""
+    
+    async def test_batch_lookup_mixes_cache_and_batch_get(self, dynamodb_table, monkeypatch):
+        """Test cache hits skip DynamoDB, misses are batch-fetched and unknown IDs map to None."""
+        for i in range(3):
+            await dynamodb_service.put_item(user_service.table_name, {
+                'user_id': f"user-{i}",
+                'email': f"user-{i}@example.com"
+            })
+        
+        await user_service.get_user_by_id("user-0")
+        
+        requested = []
+        original = dynamodb_service.batch_get_items
+        
+        async def spy(table_name, keys, **kwargs):
+            requested.extend(key['user_id'] for key in keys)
+            return await original(table_name, keys, **kwargs)
+        
+        monkeypatch.setattr(dynamodb_service, "batch_get_items", spy)
+        
+        users = await user_service.get_users_by_ids(["user-2", "missing", "user-0", "user-1", "user-2"])
+        
+        assert list(users) == ["user-2", "missing", "user-0", "user-1"]
+        assert users["missing"] is None
+        assert users["user-1"]["email"] == "user-1@example.com"
+        assert sorted(requested) == ["missing", "user-1", "user-2"]
+        
+        # Fetched users are now cached for get_user_by_id too
+        requested.clear()
+        await user_service.get_users_by_ids(["user-1", "user-2"])
+        assert requested == []
+    
+    async def test_update_invalidates_cached_user(self, dynamodb_table):
+        """Test updates are visible through the cached lookups."""
+        await dynamodb_service.put_item(user_service.table_name, {
+            'user_id': "user-1",
+            'email': "user-1@example.com",
+            'first_name': "Old"
+        })
+        assert (await user_service.get_user_by_id("user-1"))['first_name'] == "Old"
+        
+        await user_service.update_user("user-1", {'first_name': "New"})
+        
+        assert (await user_service.get_user_by_id("user-1"))['first_name'] == "New"
+        assert (await user_service.get_users_by_ids(["user-1"]))["user-1"]['first_name'] == "New"
+    
+    async def test_projected_lookups_use_separate_cache_entries(self, dynamodb_table):
+        """Test sparse fieldsets are pushed down and never served to full lookups."""
+        await dynamodb_service.put_item(user_service.table_name, {
+            'user_id': "user-1",
+            'email': "user-1@example.com",
+            'first_name': "Old",
+            'updated_at': "2024-01-01T00:00:00"
+        })
+        
+        partial = await user_service.get_user_by_id("user-1", fields=['first_name'])
+        assert set(partial) == {'user_id', 'first_name', 'updated_at'}
+        
+        full = await user_service.get_user_by_id("user-1")
+        assert full['email'] == "user-1@example.com"
+        
+        # A cached full record also answers projected batch lookups
+        batch = await user_service.get_users_by_ids(["user-1"], fields=['email'])
+        assert batch["user-1"]['email'] == "user-1@example.com"
+        
+        await user_service.update_user("user-1", {'first_name': "New"})
+        partial = await user_service.get_user_by_id("user-1", fields=['first_name'])
+        assert partial['first_name'] == "New"
+
+
+class TestSerialization:
+    """Test the trusted response serialization path."""
+    
+    def test_trusted_response_matches_validated_model(self):
+        """Test trusted encoding equals validated encoding and drops internal fields."""
+        import json
+        from app.models.user import UserResponse
+        from app.utils.serialization import trusted_response
+        
+        user = {
+            "user_id": "user-123",
+            "email": "test@example.com",
+            "is_active": True,
+            "created_at": "2024-01-01T10:00:00.123456",
+            "uploads": [{"key": "uploads/user-123/a.pdf"}]
+        }
+        
+        response = trusted_response(UserResponse, user)
+        
+        assert response.media_type == "application/json"
+        assert json.loads(response.body) == json.loads(UserResponse(**user).model_dump_json())
+        assert "uploads" not in json.loads(response.body)
+
+
+class TestAWSClientFactory:
+    """Test the shared AWS client factory."""
+    
+    def test_clients_share_session_and_use_tuned_config(self, mock_aws):
+        """Test clients get per-service pool sizes, timeouts, retries and keepalive."""
+        from app.core.aws import AWSClientFactory
+        from app.core.config import settings
+        
+        factory = AWSClientFactory()
+        s3 = factory.client('s3')
+        dynamodb = factory.resource('dynamodb')
+        
+        config = s3.meta.config
+        assert config.max_pool_connections == settings.S3_MAX_POOL_CONNECTIONS
+        assert config.read_timeout == settings.S3_READ_TIMEOUT
+        assert config.connect_timeout == settings.AWS_CONNECT_TIMEOUT
+        assert config.retries['mode'] == settings.AWS_RETRY_MODE
+        assert config.tcp_keepalive is True
+        assert dynamodb.meta.client.meta.config.max_pool_connections == settings.DYNAMODB_MAX_POOL_CONNECTIONS
+        
+        stats = factory.get_pool_stats()
+        assert stats['s3'][0]['max_pool_connections'] == settings.S3_MAX_POOL_CONNECTIONS
+        assert set(stats) == {'s3', 'dynamodb'}
+    
+    def test_pool_stats_tolerate_changed_internals(self, mock_aws):
+        """Test unexpected urllib3/botocore internals report no pools instead of failing."""
+        from types import SimpleNamespace
+        from app.core.aws import AWSClientFactory
+        
+        factory = AWSClientFactory()
+        s3 = factory.client('s3')
+        s3._endpoint.http_session._manager = SimpleNamespace(pools={'key': SimpleNamespace()})
+        
+        stats = factory.get_pool_stats()
+        assert stats['s3'][0]['pools'] == [{
+            'host': None, 'connections_opened': None, 'requests': None,
+            'in_use': None, 'utilization': None
+        }]
+
+
+@pytest.mark.asyncio
+class TestBulkhead:
+    """Test per-dependency bulkheads."""
+    
+    async def test_runs_blocking_call(self):
+        """Test calls run on the bulkhead executor and are counted."""
+        bulkhead = Bulkhead("test", max_concurrent=2, max_queue=2)
+        
+        result = await bulkhead.run(lambda x: x * 2, 21)
+        assert result == 42
+        assert bulkhead.stats()["completed"] == 1
+        assert bulkhead.stats()["active"] == 0
+    
+    async def test_rejects_when_queue_full(self):
+        """Test fast rejection once concurrency and queue are exhausted."""
+        import asyncio
+        import threading
+        
+        bulkhead = Bulkhead("test", max_concurrent=1, max_queue=1, queue_timeout=5)
+        gate = threading.Event()
+        
+        running = asyncio.ensure_future(bulkhead.run(gate.wait))
+        queued = asyncio.ensure_future(bulkhead.run(lambda: "queued"))
+        await asyncio.sleep(0.05)
+        
+        with pytest.raises(BulkheadFullException) as exc_info:
+            await bulkhead.run(lambda: "rejected")
+        assert exc_info.value.status_code == 503
+        assert exc_info.value.headers["Retry-After"]
+        
+        gate.set()
+        await running
+        assert await queued == "queued"
+        
+        stats = bulkhead.stats()
+        assert stats["rejected"] == 1
+        assert stats["peak_waiting"] == 1
+    
+    async def test_deadline_bounds_calls(self):
+        """Test calls fail fast with a 503 once the request deadline passes."""
+        import threading
+        import time
+        from app.utils.deadline import reset_deadline, set_deadline
+        
+        bulkhead = Bulkhead("test", max_concurrent=1, max_queue=1)
+        gate = threading.Event()
+        ran = []
+        
+        token = set_deadline(0.1)
+        try:
+            start = time.monotonic()
+            with pytest.raises(DeadlineExceededException) as exc_info:
+                await bulkhead.run(gate.wait, 5)
+            assert time.monotonic() - start < 1
+            assert exc_info.value.status_code == 503
+            
+            with pytest.raises(DeadlineExceededException):
+                await bulkhead.run(lambda: ran.append(True))
+            assert ran == []
+        finally:
+            reset_deadline(token)
+            gate.set()
+        
+        assert bulkhead.stats()["deadline_exceeded"] == 2
+
+
+@pytest.mark.asyncio
+class TestOrchestration:
+    """Test concurrent step orchestration."""
+    
+    async def test_run_concurrently_preserves_order(self):
+        """Test results come back in argument order and steps overlap."""
+        import asyncio
+        import time
+        
+        async def step(value, delay):
+            await asyncio.sleep(delay)
+            return value
+        
+        start = time.perf_counter()
+        results = await run_concurrently(step("a", 0.2), step("b", 0.1))
+        
+        assert results == ["a", "b"]
+        assert time.perf_counter() - start < 0.3  # max, not sum
+    
+    async def test_failure_cancels_siblings(self):
+        """Test the first failure is re-raised and other steps are cancelled."""
+        import asyncio
+        cancelled = False
+        
+        async def slow():
+            nonlocal cancelled
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled = True
+                raise
+        
+        async def failing():
+            raise AuthenticationException("bad credentials")
+        
+        with pytest.raises(AuthenticationException):
+            await run_concurrently(slow(), failing())
+        assert cancelled
+    
+    async def test_saga_compensates_in_reverse(self):
+        """Test compensations run in reverse order when a step fails."""
+        undone = []
+        
+        async def undo(name):
+            undone.append(name)
+        
+        with pytest.raises(RuntimeError):
+            async with Saga() as saga:
+                saga.add_compensation(undo, "first")
+                saga.add_compensation(undo, "second")
+                raise RuntimeError("profile write failed")
+        
+        assert undone == ["second", "first"]
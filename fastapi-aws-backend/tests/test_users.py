@@ -17,6 +17,19 @@ class TestUserAPI:
             "version": settings.VERSION
         }
     
+    async def test_health_diagnostics_disabled_by_default(self, client: AsyncClient, monkeypatch):
+        """Test saturation metrics are only served when explicitly enabled."""
+        from app.main import create_app
+        
+        response = await client.get("/health/bulkheads")
+        assert response.status_code == 404
+        
+        monkeypatch.setattr(settings, "HEALTH_DIAGNOSTICS_ENABLED", True)
+        async with AsyncClient(app=create_app(), base_url="http://test") as internal:
+            response = await internal.get("/health/bulkheads")
+        assert response.status_code == 200
+        assert "dynamodb" in response.json()
+    
     async def test_signup_success(self, client: AsyncClient, sample_user_data, 
                                  dynamodb_table, cognito_user_pool):
         """Test successful user signup."""
@@ -88,4 +101,210 @@ class TestFileUpload:
             files=files, 
             headers=headers
         )
-        assert response.status_code == 401  # Will fail on auth first
\ No newline at end of file
+        assert response.status_code == 401  # Will fail on auth first
+
+
+@pytest.mark.asyncio
+class TestUserProfileCaching:
+    """Test conditional requests on the user profile."""
+    
+    async def test_get_current_user_etag(self, client: AsyncClient):
+        """Test the profile carries an ETag and revalidates to 304."""
+        from app.main import app
+        from app.api.deps import get_current_user
+        
+        user = {
+            "user_id": "user-123",
+            "email": "test@example.com",
+            "is_active": True,
+            "updated_at": "2024-01-01T00:00:00"
+        }
+        app.dependency_overrides[get_current_user] = lambda: user
+        try:
+            response = await client.get("/api/v1/users/me")
+            assert response.status_code == 200
+            etag = response.headers["etag"]
+            
+            cached = await client.get("/api/v1/users/me", headers={"If-None-Match": etag})
+            assert cached.status_code == 304
+            assert cached.content == b""
+            assert cached.headers["etag"] == etag
+            
+            user["updated_at"] = "2024-01-02T00:00:00"
+            changed = await client.get("/api/v1/users/me", headers={"If-None-Match": etag})
+            assert changed.status_code == 200
+            assert changed.headers["etag"] != etag
+        finally:
+            app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+class TestBatchUserLookupAPI:
+    """Test batch user lookups by ID."""
+    
+    async def test_batch_user_lookup(self, client: AsyncClient, dynamodb_table):
+        """Test batch lookups keep request order and mark unknown IDs."""
+        from app.main import app
+        from app.api.deps import get_current_verified_user
+        from app.services.dynamodb_service import dynamodb_service
+        from app.services.user_service import user_service
+        
+        await dynamodb_service.put_item(user_service.table_name, {
+            "user_id": "user-1",
+            "email": "user-1@example.com",
+            "internal_note": "not part of the response model"
+        })
+        app.dependency_overrides[get_current_verified_user] = lambda: {"user_id": "caller"}
+        try:
+            response = await client.get("/api/v1/users", params={"ids": "missing,user-1"})
+            assert response.status_code == 200
+            users = response.json()["users"]
+            assert [(item["user_id"], item["found"]) for item in users] == [("missing", False), ("user-1", True)]
+            assert users[1]["user"]["email"] == "user-1@example.com"
+            assert "internal_note" not in users[1]["user"]
+            
+            response = await client.get("/api/v1/users", params={"ids": "user-1", "fields": "first_name,email"})
+            assert response.json()["users"][0]["user"] == {"email": "user-1@example.com", "first_name": None}
+            
+            response = await client.get("/api/v1/users", params={"ids": "user-1", "fields": "password"})
+            assert response.status_code == 400
+            
+            too_many = ",".join(f"user-{i}" for i in range(101))
+            response = await client.get("/api/v1/users", params={"ids": too_many})
+            assert response.status_code == 400
+        finally:
+            app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+class TestBatchAPI:
+    """Test the multi-operation batch endpoint."""
+    
+    async def test_batch_runs_operations_as_one_principal(self, client: AsyncClient, dynamodb_table,
+                                                          session_secret, monkeypatch):
+        """Test sub-requests share one auth check and see earlier writes."""
+        import time
+        from app.api import deps
+        from app.core.security import create_session_token
+        from app.services.dynamodb_service import dynamodb_service
+        from app.services.user_service import user_service
+        
+        user = {
+            "user_id": "user-1",
+            "email": "user-1@example.com",
+            "first_name": "Old",
+            "is_active": True,
+            "email_verified": True
+        }
+        await dynamodb_service.put_item(user_service.table_name, user)
+        token, _ = create_session_token({"sub": "user-1", "exp": int(time.time()) + 3600}, user)
+        
+        decoded = []
+        original = deps.decode_access_token
+        monkeypatch.setattr(deps, "decode_access_token", lambda t: decoded.append(t) or original(t))
+        
+        response = await client.post(
+            "/api/v1/batch",
+            json={"operations": [
+                {"method": "GET", "path": "/api/v1/users/me"},
+                {"method": "PUT", "path": "/api/v1/users/me", "body": {"first_name": "New"}},
+                {"method": "GET", "path": "/api/v1/users/me"},
+                {"method": "GET", "path": "/api/v1/users?ids=user-1,missing"},
+                {"method": "GET", "path": "/api/v1/users/missing"}
+            ]},
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert [result["status_code"] for result in results] == [200, 200, 200, 200, 404]
+        assert results[0]["body"]["first_name"] == "Old"
+        assert results[2]["body"]["first_name"] == "New"
+        assert [item["found"] for item in results[3]["body"]["users"]] == [True, False]
+        assert len(decoded) == 1
+    
+    async def test_batch_stops_after_account_deletion(self, client: AsyncClient, dynamodb_table,
+                                                      session_secret):
+        """Test operations after DELETE /users/me do not run as the deleted user."""
+        import time
+        from app.core.security import create_session_token
+        from app.services.dynamodb_service import dynamodb_service
+        from app.services.user_service import user_service
+        
+        user = {"user_id": "user-1", "is_active": True, "email_verified": True}
+        await dynamodb_service.put_item(user_service.table_name, user)
+        token, _ = create_session_token({"exp": int(time.time()) + 3600}, user)
+        
+        response = await client.post(
+            "/api/v1/batch",
+            json={"operations": [
+                {"method": "DELETE", "path": "/api/v1/users/me"},
+                {"method": "PUT", "path": "/api/v1/users/me", "body": {"first_name": "Ghost"}},
+                {"method": "GET", "path": "/api/v1/users/me"}
+            ]},
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        
+        assert [result["status_code"] for result in response.json()["results"]] == [200, 401, 401]
+        stored = await dynamodb_service.get_item(user_service.table_name, {"user_id": "user-1"})
+        assert "first_name" not in stored
+    
+    async def test_batch_payload_limit_checked_before_parsing(self, client: AsyncClient, monkeypatch):
+        """Test oversized bodies get 413 without being decoded or authenticated."""
+        from app.core.config import settings
+        
+        monkeypatch.setattr(settings, "BATCH_MAX_PAYLOAD_BYTES", 64)
+        response = await client.post(
+            "/api/v1/batch", content=b"{" * 65, headers={"Content-Type": "application/json"}
+        )
+        assert response.status_code == 413
+    
+    async def test_batch_response_budget_aborts_while_streaming(self):
+        """Test a sub-response is cut off once it overruns the shared byte budget."""
+        from app.api.v1.batch import _dispatch, _ResponseBudget
+        
+        sent = []
+        
+        async def streaming_app(scope, receive, send):
+            await send({"type": "http.response.start", "status": 200,
+                        "headers": [(b"content-type", b"text/plain")]})
+            for _ in range(10):
+                sent.append(b"x" * 10)
+                await send({"type": "http.response.body", "body": b"x" * 10, "more_body": True})
+            await send({"type": "http.response.body", "body": b""})
+        
+        scope = {"method": "GET", "path": "/api/v1/files/big"}
+        budget = _ResponseBudget(25)
+        result = await _dispatch(streaming_app, scope, b"", budget)
+        
+        assert result.status_code == 413
+        assert len(sent) == 3
+        assert budget.remaining == 25
+        
+        budget.remaining = 200
+        result = await _dispatch(streaming_app, scope, b"", budget)
+        assert result.status_code == 200
+        assert result.body == "x" * 100
+        assert budget.remaining == 100
+    
+    async def test_batch_limits(self, client: AsyncClient):
+        """Test operation count and path limits are enforced."""
+        from app.main import app
+        from app.api.deps import get_current_user_token, get_current_verified_user
+        
+        app.dependency_overrides[get_current_user_token] = lambda: {"sub": "caller"}
+        app.dependency_overrides[get_current_verified_user] = lambda: {"user_id": "caller"}
+        try:
+            too_many = [{"method": "GET", "path": "/health"}] * 21
+            response = await client.post("/api/v1/batch", json={"operations": too_many})
+            assert response.status_code == 400
+            
+            nested = [{"method": "POST", "path": "/api/v1/batch", "body": {"operations": []}}]
+            response = await client.post("/api/v1/batch", json={"operations": nested})
+            assert response.status_code == 400
+            
+            outside = [{"method": "GET", "path": "/health"}]
+            response = await client.post("/api/v1/batch", json={"operations": outside})
+            assert response.status_code == 400
+        finally:
+            app.dependency_overrides.clear()
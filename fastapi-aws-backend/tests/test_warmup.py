@@ -0,0 +1,53 @@
+# tests/test_warmup.py
+import pytest
+import app.main as main
+from app.core.warmup import is_warmup_event, warm_up
+from app.services.auth_service import auth_service
+from app.services.dynamodb_service import dynamodb_service
+from app.services.user_service import user_service
+from app.utils.cache import cache
+
+
+@pytest.mark.asyncio
+class TestWarmUp:
+    """Test the init-time warm-up."""
+
+    async def test_warm_up_primes_and_reports_failures(
+        self, dynamodb_table, blobs_table, s3_bucket, monkeypatch
+    ):
+        """Test hot users are cached and a failing step is reported, not raised."""
+
+        async def cognito_down(connections):
+            raise ConnectionError("cognito unreachable")
+
+        monkeypatch.setattr(auth_service, "warm_up", cognito_down)
+        await dynamodb_service.put_item(
+            user_service.table_name, {"user_id": "hot-user", "email": "hot@example.com"}
+        )
+
+        report = await warm_up(hot_user_ids=["hot-user"], connections=2, timeout=5)
+
+        assert report["dynamodb"] == "ok"
+        assert report["s3"] == "ok"
+        assert report["hot_users"] == "ok"
+        assert "cognito unreachable" in report["cognito"]
+        assert (await cache.get("user:hot-user"))["email"] == "hot@example.com"
+
+
+class TestLambdaWarmupEvents:
+    """Test keep-warm pings skip the API stack."""
+
+    def test_warmup_event_short_circuits(self, monkeypatch):
+        """Test scheduled warm-up pings return without invoking Mangum."""
+
+        def fail(event, context):
+            raise AssertionError("API stack should not run")
+
+        monkeypatch.setattr(main, "asgi_handler", fail)
+
+        assert main.lambda_handler({"warmup": True}, None) == {"warm": True}
+        assert main.lambda_handler({"source": "serverless-plugin-warmup"}, None) == {
+            "warm": True
+        }
+        assert not is_warmup_event({"job": "purge_deleted_users"})
+        assert not is_warmup_event({"httpMethod": "GET", "path": "/health"})